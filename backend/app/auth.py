@@ -1,10 +1,22 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import hashlib
+import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from backend.app.config import settings
+from backend.app import schemas
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt is CPU-bound (~250ms at cost 12) but releases the GIL, so async routes hand it to
+# this bounded pool instead of blocking the event loop or starving the default threadpool.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,12 +24,49 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+async def verify_and_update_password_async(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """
+    Verify off the event loop. If the stored hash uses an outdated cost factor,
+    also return a replacement hash at the configured BCRYPT_ROUNDS (else None).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # jti/iat let a single token, or all of a user's earlier tokens, be revoked. iat keeps
+    # sub-second precision so a login right after a revocation isn't caught by it.
+    issued_at = now.replace(tzinfo=timezone.utc).timestamp()
+    to_encode.update({"exp": expire, "iat": issued_at, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def create_principal_token(principal: schemas.UserPrincipal, expires_delta: Optional[timedelta] = None):
+    """Access token carrying the principal as claims, so routes can authorize without a DB lookup."""
+    return create_access_token(
+        data={"sub": principal.email, "uid": principal.id, "role": principal.role, "tenant_id": principal.tenant_id},
+        expires_delta=expires_delta,
+    )
+
+
+def create_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are high-entropy random strings, so a fast hash is enough (unlike passwords)
+    return hashlib.sha256(token.encode()).hexdigest()
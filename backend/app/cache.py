@@ -0,0 +1,106 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Small key/value caches with per-entry TTL. Values are JSON-serializable dicts so the
+# in-process and Redis backends are interchangeable.
+
+
+# How often MemoryCache sweeps out expired entries, in seconds
+PRUNE_INTERVAL = 60
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with per-entry expiry. Local to one worker process.
+    maxsize=None disables LRU eviction (entries then leave only by expiry or delete).
+    """
+
+    def __init__(self, maxsize: Optional[int] = 10000, ttl: int = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[int] = None):
+        now = time.monotonic()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if now >= self._next_prune:
+                self._prune(now)
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _prune(self, now: float):
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        self._next_prune = now + PRUNE_INTERVAL
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Redis-backed cache shared by every uvicorn worker, so invalidations are seen by all of them."""
+
+    def __init__(self, url: str, ttl: int = 60, prefix: str = "pgms:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL points at Redis but the 'redis' package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value, ttl: Optional[int] = None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl if ttl is not None else self.ttl)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def is_shared(url: str) -> bool:
+    """Whether caches built from this URL are seen by every worker process."""
+    return url.startswith(("redis://", "rediss://", "unix://"))
+
+
+def create_cache(url: str, maxsize: Optional[int] = 10000, ttl: int = 60):
+    """Build a cache from a URL: memory:// (default) or redis://host:port/db."""
+    if is_shared(url):
+        return RedisCache(url, ttl=ttl)
+    if url.startswith("memory://") or not url:
+        return MemoryCache(maxsize=maxsize, ttl=ttl)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
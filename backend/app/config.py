@@ -17,9 +17,37 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super-secret-key")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Rotating refresh tokens, so expired access tokens are renewed without a password (bcrypt) login
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+    # bcrypt cost factor; stored hashes with a different cost are rehashed on the next login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Threads dedicated to password hashing/verification (bcrypt releases the GIL)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+    # Cache: memory:// (per worker) or redis://host:port/0 (shared by all workers)
+    CACHE_URL: str = os.getenv("CACHE_URL", "memory://")
+    # Server worker processes; uvicorn and gunicorn take their default worker count from it.
+    # Token revocation and report invalidation live in the cache, so more than one worker needs
+    # a shared CACHE_URL.
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Authenticated-user principals cached by token subject
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL: int = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+    # Report results, keyed by report, parameters and the versions of the tables they read.
+    # The TTL also bounds how long a report (or its 304s) can miss a write made elsewhere.
+    REPORT_CACHE_SIZE: int = int(os.getenv("REPORT_CACHE_SIZE", "256"))
+    REPORT_CACHE_TTL: int = int(os.getenv("REPORT_CACHE_TTL", "300"))
+
+    # Seconds between refreshes of today's daily snapshot (trend reports); 0 disables the job
+    SNAPSHOT_INTERVAL_SECONDS: int = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "3600"))
     
     # File Upload
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", os.path.join(BASE_DIR, "uploads"))
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", 5242880))
+    # Where uploaded files are kept: "local" (filesystem, relative to the working directory)
+    # or "s3" (any S3-compatible store; needs boto3 and the usual AWS credentials)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "pg-management-uploads")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL") or None
 
 settings = Settings()
@@ -1,17 +1,47 @@
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from backend.app.config import settings
 
+# Async drivers selectable through DATABASE_URL, mapped to the sync driver used for
+# the threadpool routers, create_all and the maintenance scripts.
+ASYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql",
+}
+
+def is_async_url(url: str) -> bool:
+    return make_url(url).drivername in ASYNC_DRIVERS
+
+def to_sync_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+ASYNC_MODE = is_async_url(settings.DATABASE_URL)
+SYNC_DATABASE_URL = to_sync_url(settings.DATABASE_URL)
+
 # Create database engine
 # connect_args={"check_same_thread": False} is needed only for SQLite
 engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+    SYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False} if SYNC_DATABASE_URL.startswith("sqlite") else {}
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine/session, only when DATABASE_URL names an async driver
+async_engine = create_async_engine(settings.DATABASE_URL) if ASYNC_MODE else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if ASYNC_MODE else None
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -21,4 +51,48 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for `async def` routes and dependencies: an AsyncSession in async mode,
+# otherwise the request's sync Session (so get_db overrides still apply).
+# Either way, use it only through run_db so the event loop never blocks on the database.
+async def get_async_db(sync_db: Session = Depends(get_db)):
+    if not ASYNC_MODE:
+        yield sync_db
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run fn(session, *args, **kwargs), plain sync SQLAlchemy code, without blocking the event loop:
+    on the AsyncSession's greenlet bridge in async mode, in the threadpool otherwise.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+# Dialect INSERT constructs supporting ON CONFLICT, by dialect name
+CONFLICT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+def conflict_insert(db: Session, model):
+    """The session dialect's INSERT construct, with on_conflict_do_nothing / on_conflict_do_update."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in CONFLICT_INSERTS:
+        raise ValueError(f"Unsupported dialect for ON CONFLICT inserts: {dialect}")
+    return CONFLICT_INSERTS[dialect](model)
+
+def insert_on_conflict_do_nothing(db: Session, model, index_elements):
+    """
+    INSERT ... ON CONFLICT (index_elements) DO NOTHING for the session's dialect: a row that
+    would violate that unique index is skipped by the database instead of raising, so
+    duplicates are detected in the same statement, race-free. Add .values() and .returning().
+    """
+    return conflict_insert(db, model).on_conflict_do_nothing(index_elements=index_elements)
+
+# Committed writes through any session bump the versions of the tables they touched, so every
+# user of these sessions (the app, the maintenance scripts) invalidates the reports it affects
+from backend.app import report_cache  # noqa: E402,F401 registers the session listeners
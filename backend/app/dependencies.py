@@ -1,38 +1,72 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from backend.app import database, models, schemas, auth
+from sqlalchemy.orm import Session, joinedload
+from backend.app import database, models, schemas, auth, principals, revocation
 from backend.app.config import settings
-from backend.app.database import get_db
+from backend.app.database import get_db, get_async_db, run_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+def get_user_by_email(db: Session, email: str):
+    # Tenant is loaded eagerly: UserResponse serializes user.tenant after the session is gone
+    return (
+        db.query(models.User)
+        .options(joinedload(models.User.tenant))
+        .filter(models.User.email == email)
+        .first()
     )
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def decode_access_token(token: str) -> dict:
+    """Validate the token and return its claims; expired, malformed or revoked tokens raise 401."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
-    if user is None:
+    if payload.get("sub") is None:
         raise credentials_exception
-    return user
+    if revocation.is_revoked(payload.get("jti"), payload.get("uid"), payload.get("iat")):
+        raise credentials_exception
+    return payload
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get_async_db)):
+    payload = decode_access_token(token)
+    token_data = schemas.TokenData(email=payload["sub"])
+    # Principal (id, role, is_active, tenant_id) from the cache; the users table only on a miss
+    principal = principals.get_cached_principal(token_data.email)
+    if principal is None:
+        principal = await run_db(db, principals.load_principal, token_data.email)
+        if principal is None:
+            raise credentials_exception
+        principals.cache_principal(principal)
+    return principal
+
+async def get_claims_user(token: str = Depends(oauth2_scheme), db = Depends(get_async_db)):
+    """
+    Fast path for hot read endpoints: the principal straight from the token's claims, no query.
+    Claims tokens are only issued to active users, and deactivation or a role change revokes
+    them, so is_active is implied. Tokens without claims fall back to the cached lookup.
+    """
+    payload = decode_access_token(token)
+    if payload.get("uid") is None or payload.get("role") is None:
+        return await get_current_active_user(await get_current_user(token, db))
+    return schemas.UserPrincipal(
+        id=payload["uid"], email=payload["sub"], role=payload["role"],
+        is_active=True, tenant_id=payload.get("tenant_id"),
+    )
+
+async def get_current_active_user(current_user: schemas.UserPrincipal = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def get_current_admin_user(current_user: models.User = Depends(get_current_active_user)):
+async def get_current_admin_user(current_user: schemas.UserPrincipal = Depends(get_current_active_user)):
     if current_user.role != models.UserRole.ADMIN.value:
          raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -40,7 +74,10 @@ async def get_current_admin_user(current_user: models.User = Depends(get_current
         )
     return current_user
 
-async def get_current_tenant_user(current_user: models.User = Depends(get_current_active_user)):
+async def get_claims_admin_user(current_user: schemas.UserPrincipal = Depends(get_claims_user)):
+    return await get_current_admin_user(current_user)
+
+async def get_current_tenant_user(current_user: schemas.UserPrincipal = Depends(get_current_active_user)):
     # Both tenants and admins should probably be able to access tenant routes, or maybe just tenants.
     # For now, let's assume this role check enforces that the user is a tenant or admin acting as tenant.
     # But strictly speaking, if it's "get_current_tenant_user", it might imply ONLY tenants.
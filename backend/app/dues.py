@@ -0,0 +1,165 @@
+from datetime import date
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, case, cast
+from sqlalchemy.orm import Session
+
+from backend.app import models
+
+# Rent dues: what each tenant owes, month by month, against what they have paid.
+# A tenant owes their room's monthly_rent for every month from the check-in month through
+# the check-out month (or the as-of month); a started month is owed in full, due on the 1st.
+# The schedule is expanded and joined to the payments set-wise in pandas: two queries and
+# vectorized arithmetic for the whole property, however many tenant-months that is.
+
+# (upper bound in days overdue, label); the last bucket is open-ended
+AGING_BUCKETS = [(30, "0-30"), (60, "31-60"), (None, "60+")]
+
+
+def _month_index(dates: pd.Series) -> np.ndarray:
+    dates = pd.to_datetime(dates)
+    return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.int64)
+
+
+def _month_start(month_index: np.ndarray) -> pd.DatetimeIndex:
+    return pd.to_datetime(pd.DataFrame({"year": month_index // 12, "month": month_index % 12 + 1, "day": 1}))
+
+
+def load_tenancies(db: Session, tenant_id: Optional[int] = None) -> pd.DataFrame:
+    """Tenants with a room and a check-in date, with the rent they owe per month."""
+    query = (
+        db.query(
+            models.Tenant.id, models.Tenant.full_name, models.Room.room_number, models.Room.monthly_rent,
+            models.Tenant.check_in_date, models.Tenant.check_out_date,
+        )
+        .join(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(models.Tenant.check_in_date.isnot(None))
+    )
+    if tenant_id is not None:
+        query = query.filter(models.Tenant.id == tenant_id)
+    return pd.DataFrame.from_records(
+        db.execute(query.statement).all(),
+        columns=["tenant_id", "full_name", "room_number", "monthly_rent", "check_in_date", "check_out_date"],
+    )
+
+
+def load_monthly_payments(db: Session, tenant_id: Optional[int] = None) -> pd.DataFrame:
+    """Verified and pending amounts per tenant and payment month (one payment per month, by the unique index)."""
+    amount_if = lambda status: case((models.RentPayment.status == status.value, models.RentPayment.amount), else_=0.0)
+    query = db.query(
+        # The month as ISO text, parsed by pandas in one go rather than a date object per row
+        models.RentPayment.tenant_id, cast(models.RentPayment.payment_month, String),
+        amount_if(models.PaymentStatus.VERIFIED), amount_if(models.PaymentStatus.PENDING),
+    ).filter(
+        models.RentPayment.payment_month.isnot(None),
+        models.RentPayment.status.in_([models.PaymentStatus.VERIFIED.value, models.PaymentStatus.PENDING.value]),
+    )
+    if tenant_id is not None:
+        query = query.filter(models.RentPayment.tenant_id == tenant_id)
+    payments = pd.DataFrame.from_records(
+        db.execute(query.statement).all(), columns=["tenant_id", "payment_month", "paid", "pending"]
+    )
+    payments["payment_month"] = pd.to_datetime(payments["payment_month"], format="%Y-%m-%d")
+    return payments
+
+
+def expected_schedule(tenancies: pd.DataFrame, as_of: date) -> pd.DataFrame:
+    """One row per tenant-month owed: tenant_id, month_index, expected."""
+    if tenancies.empty:
+        return pd.DataFrame({"tenant_id": [], "month_index": [], "expected": []})
+    as_of_index = as_of.year * 12 + as_of.month - 1
+    start = _month_index(tenancies["check_in_date"])
+    check_out = tenancies["check_out_date"].where(tenancies["check_out_date"].notna(), as_of)
+    end = np.minimum(_month_index(check_out), as_of_index)
+    months = np.clip(end - start + 1, 0, None)
+
+    # Expand each tenancy to its months without a Python loop: repeat the row, then add 0..n-1
+    rows = np.repeat(np.arange(len(tenancies)), months)
+    offsets = np.arange(months.sum()) - np.repeat(np.cumsum(months) - months, months)
+    return pd.DataFrame({
+        "tenant_id": tenancies["tenant_id"].to_numpy()[rows],
+        "month_index": start[rows] + offsets,
+        "expected": tenancies["monthly_rent"].fillna(0.0).to_numpy(dtype=float)[rows],
+    })
+
+
+def _aging_bucket(days_overdue: np.ndarray) -> np.ndarray:
+    conditions = [days_overdue <= limit for limit, _ in AGING_BUCKETS if limit is not None]
+    labels = [label for limit, label in AGING_BUCKETS if limit is not None]
+    return np.select(conditions, labels, default=AGING_BUCKETS[-1][1])
+
+
+def compute_dues(tenancies: pd.DataFrame, payments: pd.DataFrame, as_of: date) -> pd.DataFrame:
+    """
+    Per tenant-month: expected, paid (verified), pending, outstanding and its aging bucket.
+    Payments for months outside a tenancy (before check-in, prepaid) are not counted.
+    """
+    schedule = expected_schedule(tenancies, as_of)
+    if not payments.empty:
+        payments = payments.assign(month_index=_month_index(payments["payment_month"]))
+        payments = payments.groupby(["tenant_id", "month_index"], as_index=False)[["paid", "pending"]].sum()
+        schedule = schedule.merge(payments, on=["tenant_id", "month_index"], how="left")
+    else:
+        schedule = schedule.assign(paid=0.0, pending=0.0)
+    schedule[["paid", "pending"]] = schedule[["paid", "pending"]].fillna(0.0)
+    schedule["outstanding"] = (schedule["expected"] - schedule["paid"]).clip(lower=0.0)
+
+    due = _month_start(schedule["month_index"].to_numpy(dtype=np.int64))
+    schedule["month"] = due
+    schedule["days_overdue"] = (pd.Timestamp(as_of) - due).dt.days.to_numpy()
+    schedule["bucket"] = _aging_bucket(schedule["days_overdue"].to_numpy())
+    return schedule
+
+
+def _aging(frame: pd.DataFrame) -> Dict[str, float]:
+    totals = frame.groupby("bucket")["outstanding"].sum()
+    return {label: round(float(totals.get(label, 0.0)), 2) for _, label in AGING_BUCKETS}
+
+
+def dues_report(db: Session, as_of: Optional[date] = None, tenant_id: Optional[int] = None,
+                only_outstanding: bool = False) -> Dict[str, Any]:
+    """Outstanding balances per tenant and the property-wide aging summary, in one pass."""
+    as_of = as_of or date.today()
+    tenancies = load_tenancies(db, tenant_id)
+    dues = compute_dues(tenancies, load_monthly_payments(db, tenant_id), as_of)
+    owing = dues[dues["outstanding"] > 0]
+
+    # Per-tenant totals and aging, joined back onto the tenancies (tenants owing nothing get zeros)
+    labels = [label for _, label in AGING_BUCKETS]
+    per_tenant = tenancies[["tenant_id", "full_name", "room_number"]].set_index("tenant_id").join([
+        dues.groupby("tenant_id")[["expected", "paid", "pending", "outstanding"]].sum(),
+        owing.pivot_table(index="tenant_id", columns="bucket", values="outstanding", aggfunc="sum")
+        .reindex(columns=labels),
+        owing.groupby("tenant_id")["month"].min().rename("oldest_unpaid_month"),
+    ])
+    amounts = ["expected", "paid", "pending", "outstanding"] + labels
+    per_tenant[amounts] = per_tenant[amounts].astype(float).fillna(0.0).round(2)
+    if only_outstanding:
+        per_tenant = per_tenant[per_tenant["outstanding"] > 0]
+    tenants = [
+        {
+            "tenant_id": int(tenant_id),
+            "full_name": row["full_name"],
+            "room_number": row["room_number"],
+            **{column: float(row[column]) for column in ["expected", "paid", "pending", "outstanding"]},
+            "oldest_unpaid_month": row["oldest_unpaid_month"].date() if pd.notna(row["oldest_unpaid_month"]) else None,
+            "aging": {label: float(row[label]) for label in labels},
+        }
+        for tenant_id, row in zip(per_tenant.index, per_tenant.to_dict("records"))
+    ]
+
+    return {
+        "as_of": as_of,
+        "totals": {
+            "tenant_months": int(len(dues)),
+            "expected": round(float(dues["expected"].sum()), 2),
+            "paid": round(float(dues["paid"].sum()), 2),
+            "pending": round(float(dues["pending"].sum()), 2),
+            "outstanding": round(float(dues["outstanding"].sum()), 2),
+            "tenants_with_dues": int(owing["tenant_id"].nunique()),
+        },
+        "aging": _aging(owing),
+        "tenants": tenants,
+    }
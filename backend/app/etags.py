@@ -0,0 +1,13 @@
+from typing import Optional
+
+# Conditional request helpers shared by the file endpoint and the cached reports.
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
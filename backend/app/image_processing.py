@@ -0,0 +1,98 @@
+import io
+import os
+import queue
+import logging
+import threading
+
+from PIL import Image, ImageOps
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import models
+from backend.app.storage import storage
+
+# Background worker deriving display variants of uploaded images, so list pages load a small
+# thumbnail instead of a full-resolution phone photo. Uploads are queued by id and processed
+# one at a time on a daemon thread, off the request path. Variants are re-encoded from the
+# decoded pixels, so EXIF (GPS position, device details) is not carried over; the EXIF
+# orientation is applied to the pixels first so the result still displays upright.
+
+THUMBNAIL_SIZE = (320, 320)
+DISPLAY_SIZE = (1600, 1600)
+THUMBNAIL_QUALITY = 80
+DISPLAY_QUALITY = 82
+
+logger = logging.getLogger(__name__)
+
+_jobs = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def variant_path(path: str, suffix: str, extension: str) -> str:
+    stem, _ = os.path.splitext(path)
+    return f"{stem}_{suffix}.{extension}"
+
+
+def _encode(image, size, image_format: str, quality: int) -> bytes:
+    variant = image.copy()
+    variant.thumbnail(size)
+    buffer = io.BytesIO()
+    variant.save(buffer, image_format, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def make_variants(path: str):
+    """Store the thumbnail (JPEG) and display (WebP) variants next to the original; returns their keys."""
+    with storage.open(path) as source, Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        thumbnail_path = variant_path(path, "thumb", "jpg")
+        storage.put_bytes(thumbnail_path, _encode(image, THUMBNAIL_SIZE, "JPEG", THUMBNAIL_QUALITY))
+        display_path = variant_path(path, "display", "webp")
+        storage.put_bytes(display_path, _encode(image, DISPLAY_SIZE, "WEBP", DISPLAY_QUALITY))
+    return thumbnail_path, display_path
+
+
+def process_upload(db, upload_id: int):
+    upload = db.get(models.UploadedFile, upload_id)
+    if upload is None:
+        return
+    try:
+        upload.thumbnail_path, upload.display_path = make_variants(upload.path)
+        upload.status = models.ImageStatus.READY.value
+    except Exception as e:
+        # Corrupt or truncated image: keep the original, list pages fall back to it
+        logger.warning("Image processing failed for %s: %s", upload.path, e)
+        upload.status = models.ImageStatus.FAILED.value
+    db.commit()
+
+
+def _run():
+    while True:
+        upload_id, bind = _jobs.get()
+        try:
+            db = sessionmaker(bind=bind)()
+            try:
+                process_upload(db, upload_id)
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("Image worker failed on upload %s", upload_id)
+        finally:
+            _jobs.task_done()
+
+
+def enqueue(upload_id: int, bind):
+    """Queue an UploadedFile for processing; bind is the engine its row was committed through."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name="image-worker", daemon=True)
+            _worker.start()
+    _jobs.put((upload_id, bind))
+
+
+def wait_until_idle():
+    """Block until every queued upload has been processed (tests, scripts)."""
+    _jobs.join()
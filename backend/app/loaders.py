@@ -0,0 +1,77 @@
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy.orm import joinedload, selectinload, raiseload
+
+from backend.app import models
+
+# Loader options matching exactly what each response schema serializes.
+# Each list/detail query passes these to .options() so serialization never lazy-loads per row:
+# collections are fetched with one SELECT ... IN per relationship, many-to-ones are joined.
+
+
+def room_response_options():
+    # RoomResponse -> tenants (TenantResponseWithoutRelations)
+    return (selectinload(models.Room.tenants),)
+
+
+def tenant_response_options():
+    # TenantResponse -> user (UserResponse -> tenant), room (RoomResponse -> tenants),
+    # payments and maintenance_requests (flat)
+    return (
+        joinedload(models.Tenant.user).selectinload(models.User.tenant),
+        joinedload(models.Tenant.room).selectinload(models.Room.tenants),
+        selectinload(models.Tenant.payments),
+        selectinload(models.Tenant.maintenance_requests),
+    )
+
+
+def payment_response_options():
+    # RentPaymentResponse -> tenant (TenantResponseWithoutRelations)
+    return (joinedload(models.RentPayment.tenant),)
+
+
+def maintenance_response_options():
+    # MaintenanceRequestResponse -> tenant (TenantResponseWithoutRelations)
+    return (joinedload(models.MaintenanceRequest.tenant),)
+
+
+# Relations a summary view may `include`, with the loader used for each.
+ROOM_SUMMARY_RELATIONS = {
+    # Only active tenants; checked-out history is not embedded in room summaries
+    "tenants": lambda: selectinload(models.Room.tenants.and_(models.Tenant.is_active == True)),
+}
+
+TENANT_SUMMARY_RELATIONS = {
+    "user": lambda: joinedload(models.Tenant.user),
+    "room": lambda: joinedload(models.Tenant.room),
+    "payments": lambda: selectinload(models.Tenant.payments),
+    "maintenance_requests": lambda: selectinload(models.Tenant.maintenance_requests),
+}
+
+PAYMENT_SUMMARY_RELATIONS = {
+    "tenant": lambda: joinedload(models.RentPayment.tenant),
+}
+
+MAINTENANCE_SUMMARY_RELATIONS = {
+    "tenant": lambda: joinedload(models.MaintenanceRequest.tenant),
+}
+
+
+def parse_include(include: Optional[str], relations: Dict) -> Set[str]:
+    """Parse a comma-separated `include` parameter, rejecting unknown relation names."""
+    if not include:
+        return set()
+    names = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = names - set(relations)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}. Allowed: {', '.join(relations)}",
+        )
+    return names
+
+
+def summary_options(relations: Dict, include: Set[str]):
+    # Load the requested relations; any other relationship access raises instead of lazy-loading
+    return (*[relations[name]() for name in include], raiseload("*"))
@@ -1,11 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from backend.app.routers import auth, rooms, tenants, payments, maintenance, reports
+from backend.app.routers import auth, rooms, tenants, payments, maintenance, reports, files
+from backend.app.cache import is_shared
+from backend.app.config import settings
 from backend.app.database import engine, Base
+from backend.app.migrations import upgrade_schema
+from backend.app.snapshots import SnapshotScheduler
+from backend.app.uploads import UploadSizeLimitMiddleware
 
-# Create tables
+# Create tables, then bring tables from earlier versions up to date
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Revoked tokens and report invalidations are only seen by every worker through a shared cache
+    if settings.WEB_CONCURRENCY > 1 and not is_shared(settings.CACHE_URL):
+        raise RuntimeError("WEB_CONCURRENCY > 1 needs a shared CACHE_URL (redis://...), not " + settings.CACHE_URL)
+    # Keep today's daily snapshot current; each worker runs it, the upsert makes that harmless
+    scheduler = None
+    if settings.SNAPSHOT_INTERVAL_SECONDS > 0:
+        scheduler = SnapshotScheduler(engine, settings.SNAPSHOT_INTERVAL_SECONDS)
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        scheduler.stop()
 
-app = FastAPI(title="PG Management System")
+app = FastAPI(title="PG Management System", lifespan=lifespan)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 app.include_router(auth.router)
 app.include_router(rooms.router)
@@ -13,6 +36,7 @@ app.include_router(tenants.router)
 app.include_router(payments.router)
 app.include_router(maintenance.router)
 app.include_router(reports.router)
+app.include_router(files.router)
 
 @app.get("/")
 def read_root():
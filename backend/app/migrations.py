@@ -0,0 +1,111 @@
+import logging
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import func, inspect, update
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from backend.app import models
+from backend.app.database import Base
+
+# Brings a database created by an earlier version up to the current models. create_all only
+# creates missing tables, so the columns and indexes added to existing tables are applied here,
+# each new column followed by the step that fills it in, and each index that existing rows must
+# fit preceded by the step that fixes them. Safe to run on every startup: anything already present
+# is left alone. Run from main.py and backend/create_tables.py.
+
+logger = logging.getLogger(__name__)
+
+
+def _rebuild_room_occupancy(db: Session):
+    # The maintenance helpers live with their routers; imported here so this module stays importable from them
+    from backend.app.routers.rooms import rebuild_room_occupancy
+    rebuild_room_occupancy(db)
+
+
+def _backfill_resolution_seconds(db: Session):
+    from backend.app.routers.maintenance import backfill_resolution_seconds
+    backfill_resolution_seconds(db)
+
+
+# (table, column) -> fills the column in for the rows that existed before it
+ADDED_COLUMNS: Dict[Tuple[str, str], Callable[[Session], object]] = {
+    ("rooms", "active_occupancy"): _rebuild_room_occupancy,
+    ("maintenance_requests", "resolution_seconds"): _backfill_resolution_seconds,
+}
+
+
+def _first_of_month_payments(db: Session):
+    # Rows stored before payment_month was normalized would slip past the unique index
+    Payment = models.RentPayment
+    rows = db.query(Payment.id, Payment.payment_month).filter(Payment.payment_month.isnot(None)).all()
+    updates = [{"id": id, "payment_month": month.replace(day=1)} for id, month in rows if month.day != 1]
+    if updates:
+        db.execute(update(Payment), updates)
+    duplicates = (
+        db.query(Payment.tenant_id, Payment.payment_month)
+        .group_by(Payment.tenant_id, Payment.payment_month)
+        .having(func.count(Payment.id) > 1)
+        .order_by(Payment.tenant_id, Payment.payment_month)
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot enforce one payment per tenant per month; merge or delete the extra payments of "
+            + ", ".join(f"tenant {tenant_id} for {month:%Y-%m}" for tenant_id, month in duplicates)
+        )
+
+
+# index name -> makes the existing rows fit the index before it is created
+BEFORE_INDEXES: Dict[str, Callable[[Session], object]] = {
+    "uq_rent_payments_tenant_payment_month": _first_of_month_payments,
+}
+
+
+def _add_missing_columns(bind) -> list:
+    added = []
+    existing_tables = set(inspect(bind).get_table_names())
+    for (table_name, column_name), _ in ADDED_COLUMNS.items():
+        if table_name not in existing_tables:
+            continue  # Created whole by create_all
+        if column_name in {c["name"] for c in inspect(bind).get_columns(table_name)}:
+            continue
+        column = Base.metadata.tables[table_name].c[column_name]
+        with bind.begin() as conn:
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {ddl}")
+        logger.info("Added column %s.%s", table_name, column_name)
+        added.append((table_name, column_name))
+    return added
+
+
+def _create_missing_indexes(bind, db: Session):
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspect(bind).get_indexes(table.name)}
+        columns = {c["name"] for c in inspect(bind).get_columns(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            missing = [c.name for c in index.columns if c.name not in columns]
+            if missing:
+                # A column this module doesn't know how to add; leave the index to a manual migration
+                logger.warning("Skipping index %s: %s.%s missing", index.name, table.name, ", ".join(missing))
+                continue
+            if index.name in BEFORE_INDEXES:
+                BEFORE_INDEXES[index.name](db)
+                db.commit()
+            index.create(bind)
+            logger.info("Created index %s", index.name)
+
+
+def upgrade_schema(bind) -> None:
+    """Add the columns and indexes the models declare but the database lacks, filling new columns in."""
+    added = _add_missing_columns(bind)
+    db = Session(bind=bind)
+    try:
+        for key in added:
+            ADDED_COLUMNS[key](db)
+        db.commit()
+        _create_missing_indexes(bind, db)
+    finally:
+        db.close()
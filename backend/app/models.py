@@ -1,5 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Date, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Date, Enum, Index, select
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.sql import func
 from backend.app.database import Base
 import enum
@@ -37,6 +37,11 @@ class MaintenanceCategory(str, enum.Enum):
     FURNITURE = "Furniture"
     OTHER = "Other"
 
+class ImageStatus(str, enum.Enum):
+    PENDING = "Pending"
+    READY = "Ready"
+    FAILED = "Failed"
+
 
 class User(Base):
     __tablename__ = "users"
@@ -61,11 +66,17 @@ class Room(Base):
     capacity = Column(Integer)
     monthly_rent = Column(Float)
     is_active = Column(Boolean, default=True)
+    # Denormalized count of active tenants, maintained by the tenant write paths
+    active_occupancy = Column(Integer, default=0, server_default="0", nullable=False)
 
     tenants = relationship("Tenant", back_populates="room")
 
 class Tenant(Base):
     __tablename__ = "tenants"
+    __table_args__ = (
+        # Keyset paging of active tenants
+        Index("ix_tenants_is_active_id", "is_active", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
@@ -83,8 +94,38 @@ class Tenant(Base):
     payments = relationship("RentPayment", back_populates="tenant")
     maintenance_requests = relationship("MaintenanceRequest", back_populates="tenant")
 
+class UploadedFile(Base):
+    """A stored (deduplicated) uploaded image and the derived variants produced by the background worker."""
+    __tablename__ = "uploaded_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, unique=True, index=True, nullable=False) # Storage key of the original, content-addressed
+    sha256 = Column(String, index=True, nullable=False)
+    size = Column(Integer)
+    status = Column(String, default=ImageStatus.PENDING.value, nullable=False)
+    thumbnail_path = Column(String, nullable=True) # Small JPEG for lists
+    display_path = Column(String, nullable=True) # Bounded-resolution WebP, EXIF stripped
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every upload of this content (see uploads._record_upload), so the orphan
+    # collector's grace period also covers content re-uploaded after it was first stored
+    last_uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+def _variant_of(path_column, variant_column):
+    # Correlated subquery, loaded with the row itself: no extra query and safe under raiseload
+    return column_property(
+        select(variant_column).where(UploadedFile.path == path_column).correlate_except(UploadedFile).scalar_subquery()
+    )
+
 class RentPayment(Base):
     __tablename__ = "rent_payments"
+    __table_args__ = (
+        # Keyset paging on (payment_date, id), unfiltered and per tenant / status
+        Index("ix_rent_payments_payment_date_id", "payment_date", "id"),
+        Index("ix_rent_payments_tenant_payment_date_id", "tenant_id", "payment_date", "id"),
+        Index("ix_rent_payments_status_payment_date_id", "status", "payment_date", "id"),
+        # At most one payment per tenant per month; create_payment inserts ON CONFLICT against it
+        Index("uq_rent_payments_tenant_payment_month", "tenant_id", "payment_month", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"))
@@ -96,11 +137,56 @@ class RentPayment(Base):
     status = Column(String, default=PaymentStatus.PENDING.value)
     proof_image_path = Column(String, nullable=True)
     remarks = Column(String, nullable=True)
+    proof_thumbnail_path = _variant_of(proof_image_path, UploadedFile.thumbnail_path)
+    proof_display_path = _variant_of(proof_image_path, UploadedFile.display_path)
 
     tenant = relationship("Tenant", back_populates="payments")
 
+class RevenueMonthly(Base):
+    """
+    Rollup of rent_payments by payment_month and status, kept in step by the payment write
+    paths (see revenue.py) so revenue reports read O(months) rows. Rebuild with backend/rebuild_revenue.py.
+    """
+    __tablename__ = "revenue_monthly"
+
+    month = Column(Date, primary_key=True) # First day of the month being paid, as payment_month
+    status = Column(String, primary_key=True)
+    payment_count = Column(Integer, default=0, server_default="0", nullable=False)
+    total_amount = Column(Float, default=0.0, server_default="0", nullable=False)
+
+class DailySnapshot(Base):
+    """
+    End-of-day figures for the whole property, appended by the snapshot job (see snapshots.py)
+    so trend reports are a range scan. Backfill history with backend/backfill_snapshots.py.
+    """
+    __tablename__ = "daily_snapshots"
+
+    day = Column(Date, primary_key=True)
+    occupied_beds = Column(Integer, default=0, server_default="0", nullable=False)
+    capacity = Column(Integer, default=0, server_default="0", nullable=False)
+    verified_revenue = Column(Float, default=0.0, server_default="0", nullable=False) # Cumulative, to date
+    open_maintenance = Column(Integer, default=0, server_default="0", nullable=False)
+
+class DailyFloorSnapshot(Base):
+    """The DailySnapshot figures per floor, attributed through each tenant's room."""
+    __tablename__ = "daily_floor_snapshots"
+
+    day = Column(Date, primary_key=True)
+    floor = Column(Integer, primary_key=True)
+    occupied_beds = Column(Integer, default=0, server_default="0", nullable=False)
+    capacity = Column(Integer, default=0, server_default="0", nullable=False)
+    verified_revenue = Column(Float, default=0.0, server_default="0", nullable=False)
+    open_maintenance = Column(Integer, default=0, server_default="0", nullable=False)
+
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_requests"
+    __table_args__ = (
+        # Keyset paging on id, per tenant / status
+        Index("ix_maintenance_requests_tenant_id_id", "tenant_id", "id"),
+        Index("ix_maintenance_requests_status_id", "status", "id"),
+        # Ordered walk for the resolution-time percentiles
+        Index("ix_maintenance_requests_resolution_seconds", "resolution_seconds"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"))
@@ -110,7 +196,26 @@ class MaintenanceRequest(Base):
     status = Column(String, default=MaintenanceStatus.OPEN.value)
     request_date = Column(DateTime(timezone=True), server_default=func.now())
     resolved_date = Column(DateTime(timezone=True), nullable=True)
+    # resolved_date - request_date, set when the request is resolved or closed (NULL while open)
+    resolution_seconds = Column(Float, nullable=True)
     image_path = Column(String, nullable=True)
     resolution_notes = Column(String, nullable=True)
+    image_thumbnail_path = _variant_of(image_path, UploadedFile.thumbnail_path)
+    image_display_path = _variant_of(image_path, UploadedFile.display_path)
 
     tenant = relationship("Tenant", back_populates="maintenance_requests")
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    # Tokens from one login share a family; reusing a rotated token revokes the whole family
+    family_id = Column(String, index=True, nullable=False)
+    # sha256 of the token; the token itself is never stored
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # naive UTC
+    revoked = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User")
@@ -0,0 +1,118 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, false, or_, true, tuple_
+from sqlalchemy.orm import Query
+
+# Keyset (cursor) pagination shared by the list endpoints.
+# A cursor is the opaque, url-safe encoding of the last row's (sort_key, id) values.
+# Offset paging (skip/limit) keeps working; both modes report the next cursor
+# in the X-Next-Cursor response header so list bodies stay plain JSON arrays.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into typed values for the given order columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and hasattr(python_type, "fromisoformat"):
+                value = python_type.fromisoformat(value)
+            elif value is not None:
+                value = python_type(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _nullable(column) -> bool:
+    return getattr(column, "nullable", False) and not getattr(column, "primary_key", False)
+
+
+def _order_by(column, descending: bool):
+    # Nullable keys sort NULL first ascending and last descending, on every backend, so that
+    # the cursor predicate below knows where the NULL rows are
+    if not _nullable(column):
+        return column.desc() if descending else column.asc()
+    return column.desc().nulls_last() if descending else column.asc().nulls_first()
+
+
+def _after(column, value, descending: bool):
+    """Rows strictly after `value` in the _order_by order of a nullable column."""
+    if descending:
+        # ..., 2, 1, NULL: after NULL comes nothing, after a value come smaller ones and NULLs
+        return false() if value is None else or_(column < value, column.is_(None))
+    # NULL, 1, 2, ...: after NULL come all values, after a value the larger ones
+    return column.isnot(None) if value is None else column > value
+
+
+def _seek(order_columns: Sequence[Any], values: List[Any], descending: bool):
+    """Keyset predicate: rows strictly after the cursor row."""
+    if not any(_nullable(c) for c in order_columns):
+        # Row-value comparison, which the composite indexes serve directly
+        key = tuple_(*order_columns) if len(order_columns) > 1 else order_columns[0]
+        bound = tuple_(*values) if len(order_columns) > 1 else values[0]
+        return key < bound if descending else key > bound
+    # Expanded lexicographic comparison, since a row value with a NULL compares as unknown:
+    # (c1 after v1) OR (c1 = v1 AND c2 after v2) OR ...
+    clauses = []
+    equal = []
+    for column, value in zip(order_columns, values):
+        if _nullable(column):
+            after = _after(column, value, descending)
+        else:
+            after = column < value if descending else column > value
+        clauses.append(and_(true(), *equal, after))
+        equal.append(column.is_(None) if value is None else column == value)
+    return or_(*clauses)
+
+
+def paginate(
+    query: Query,
+    order_columns: Sequence[Any],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Order `query` by `order_columns` (sort key first, unique id last) and return one page
+    plus the cursor for the next page (None on the last page). Rows with a NULL sort key are
+    paged too: first ascending, last descending.
+    With a cursor the page starts strictly after it (keyset seek) and `skip` is ignored.
+    """
+    if limit < 1:
+        return [], None
+    query = query.order_by(None).order_by(*[_order_by(c, descending) for c in order_columns])
+
+    if cursor:
+        query = query.filter(_seek(order_columns, decode_cursor(cursor, order_columns), descending))
+    elif skip:
+        query = query.offset(skip)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in order_columns])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
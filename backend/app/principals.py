@@ -0,0 +1,84 @@
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from backend.app import models, schemas, revocation
+from backend.app.cache import create_cache
+from backend.app.config import settings
+
+# Cache of authenticated-user principals keyed by token subject (email), so
+# get_current_user doesn't query the users table on every request.
+principal_cache = create_cache(
+    settings.CACHE_URL, maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+# User columns a principal is built from; changing any of them invalidates it
+PRINCIPAL_FIELDS = ("email", "role", "is_active")
+
+
+def principal_key(email: str) -> str:
+    return f"principal:{email}"
+
+
+def load_principal(db: Session, email: str) -> Optional[schemas.UserPrincipal]:
+    row = (
+        db.query(models.User.id, models.User.email, models.User.role, models.User.is_active,
+                 models.Tenant.id.label("tenant_id"))
+        .outerjoin(models.Tenant, models.Tenant.user_id == models.User.id)
+        .filter(models.User.email == email)
+        .first()
+    )
+    if row is None:
+        return None
+    return schemas.UserPrincipal(id=row.id, email=row.email, role=row.role,
+                                 is_active=row.is_active, tenant_id=row.tenant_id)
+
+
+def principal_from_user(user: models.User) -> schemas.UserPrincipal:
+    return schemas.UserPrincipal(id=user.id, email=user.email, role=user.role, is_active=user.is_active,
+                                 tenant_id=user.tenant.id if user.tenant else None)
+
+
+def get_cached_principal(email: str) -> Optional[schemas.UserPrincipal]:
+    cached = principal_cache.get(principal_key(email))
+    return schemas.UserPrincipal(**cached) if cached is not None else None
+
+
+def cache_principal(principal: schemas.UserPrincipal):
+    principal_cache.set(principal_key(principal.email), principal.model_dump())
+
+
+def invalidate_principal(*emails: str):
+    principal_cache.delete(*[principal_key(email) for email in emails if email])
+
+
+# Any committed change to a user's email, role or is_active (deactivation) drops the
+# cached principal and revokes the user's outstanding access tokens, whose claims are now
+# stale, whichever code path made it. Changes are collected at flush and applied only
+# after commit, so a concurrent request can't re-cache the old row.
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_principals(session, flush_context):
+    stale = session.info.setdefault("stale_principals", {})
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, models.User):
+            continue
+        state = inspect(obj)
+        if obj in session.deleted or any(state.attrs[f].history.has_changes() for f in PRINCIPAL_FIELDS):
+            emails = stale.setdefault(obj.id, set())
+            emails.add(obj.email)
+            # An email change also orphans the entry under the old address
+            emails.update(state.attrs.email.history.deleted)
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_principals(session):
+    stale = session.info.pop("stale_principals", None)
+    for user_id, emails in (stale or {}).items():
+        invalidate_principal(*emails)
+        revocation.revoke_user_tokens(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_principals(session):
+    session.info.pop("stale_principals", None)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.app.cache import create_cache
+from backend.app.config import settings
+from backend.app.etags import etag_matches
+
+# Cache of report results, invalidated by per-table versions. Every committed write through a
+# Session gives each table it touched a new version, whichever code path made it (ORM flushes
+# and bulk INSERT/UPDATE/DELETE statements alike). A report's ETag hashes its name, parameters
+# and the versions of the tables it reads, so an unchanged report is answered with 304, or from
+# the cache, before any query runs; a write changes the ETag and the next call recomputes.
+# Versions are random tokens rather than counters: a lost or expired entry only costs a
+# recomputation, never a false match. They expire after REPORT_CACHE_TTL like the results, so
+# writes this process can't see (another process with a memory:// cache, such as a maintenance
+# script) change every ETag within REPORT_CACHE_TTL at most. With a Redis CACHE_URL, required
+# for several workers (see main.py), every bump is seen at once. The listeners below are on the
+# Session class and registered by database.py, so the scripts' sessions bump tables like the app's.
+
+REPORT_CACHE_CONTROL = "private, no-cache"
+
+report_cache = create_cache(settings.CACHE_URL, maxsize=settings.REPORT_CACHE_SIZE, ttl=settings.REPORT_CACHE_TTL)
+# Never LRU-evicted; an expired version is replaced by a fresh one
+table_versions = create_cache(settings.CACHE_URL, maxsize=None, ttl=settings.REPORT_CACHE_TTL)
+
+
+def version_key(table: str) -> str:
+    return f"table_version:{table}"
+
+
+def bump_tables(*tables: str):
+    for table in tables:
+        table_versions.set(version_key(table), uuid.uuid4().hex)
+
+
+def current_versions(tables: Iterable[str]) -> Dict[str, str]:
+    versions = {}
+    for table in sorted(tables):
+        version = table_versions.get(version_key(table))
+        if version is None:
+            version = uuid.uuid4().hex
+            table_versions.set(version_key(table), version)
+        versions[table] = version
+    return versions
+
+
+def report_etag(name: str, params: Dict[str, Any], tables: Iterable[str]) -> str:
+    key = json.dumps([name, jsonable_encoder(params), current_versions(tables)], sort_keys=True)
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def cached_report(
+    request: Request,
+    response: Response,
+    name: str,
+    params: Dict[str, Any],
+    tables: Iterable[str],
+    compute: Callable[[], Any],
+):
+    """
+    The report `name` for `params`, which reads `tables`: 304 if the client's If-None-Match is
+    current, else the cached result, else compute() (cached). `params` must include everything
+    the result depends on besides the tables, e.g. the caller's tenant scope or a defaulted date.
+    """
+    etag = report_etag(name, params, tables)
+    headers = {"ETag": etag, "Cache-Control": REPORT_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    result = report_cache.get(f"report:{etag}")
+    if result is None:
+        result = jsonable_encoder(compute())
+        report_cache.set(f"report:{etag}", result)
+    return result
+
+
+# Tables written in a transaction are collected at flush / statement execution and bumped only
+# after commit, so a concurrent request can't cache a result under the new versions early.
+
+def _written_tables(session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    written = _written_tables(session)
+    for obj in list(session.new) + list(session.deleted):
+        written.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            written.add(obj.__table__.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _written_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_written_tables(session):
+    written = session.info.pop("written_tables", None)
+    if written:
+        bump_tables(*written)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_tables(session):
+    session.info.pop("written_tables", None)
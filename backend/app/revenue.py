@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.app import models
+from backend.app.database import conflict_insert
+
+# Maintenance of the revenue_monthly rollup. Every path that inserts a payment or changes its
+# status passes the change here in its own transaction, so the rollup commits (or rolls back)
+# with the payments it describes. Increments are applied as one upsert, atomic in the database,
+# which keeps concurrent writers from losing updates.
+
+# (month, status) -> (payment count delta, amount delta)
+Deltas = Dict[Tuple[date, str], Tuple[int, float]]
+
+
+def payment_deltas(changes: Iterable[Tuple[date, Optional[str], Optional[str], float]]) -> Deltas:
+    """Deltas for (payment_month, old_status, new_status, amount) changes; None is "no row"."""
+    deltas = defaultdict(lambda: (0, 0.0))
+    for month, old_status, new_status, amount in changes:
+        if old_status == new_status:
+            continue
+        month = month.replace(day=1)
+        if old_status is not None:
+            count, total = deltas[(month, old_status)]
+            deltas[(month, old_status)] = (count - 1, total - amount)
+        if new_status is not None:
+            count, total = deltas[(month, new_status)]
+            deltas[(month, new_status)] = (count + 1, total + amount)
+    return dict(deltas)
+
+
+def apply_revenue_deltas(db: Session, deltas: Deltas) -> None:
+    """Add deltas to the rollup in one INSERT ... ON CONFLICT DO UPDATE, in the caller's transaction."""
+    if not deltas:
+        return
+    insert = conflict_insert(db, models.RevenueMonthly)
+    db.execute(
+        insert.on_conflict_do_update(
+            index_elements=["month", "status"],
+            set_={
+                "payment_count": models.RevenueMonthly.payment_count + insert.excluded.payment_count,
+                "total_amount": models.RevenueMonthly.total_amount + insert.excluded.total_amount,
+            },
+        ),
+        [
+            {"month": month, "status": status, "payment_count": count, "total_amount": amount}
+            for (month, status), (count, amount) in deltas.items()
+        ],
+    )
+
+
+def record_payment_changes(db: Session, changes: Iterable[Tuple[date, Optional[str], Optional[str], float]]) -> None:
+    apply_revenue_deltas(db, payment_deltas(changes))
+
+
+def rebuild_revenue_monthly(db: Session) -> None:
+    """Recompute the whole rollup from rent_payments: one grouped scan, then one upsert."""
+    db.query(models.RevenueMonthly).delete(synchronize_session=False)
+    grouped = (
+        db.query(
+            models.RentPayment.payment_month, models.RentPayment.status,
+            func.count(models.RentPayment.id), func.coalesce(func.sum(models.RentPayment.amount), 0.0),
+        )
+        .filter(models.RentPayment.payment_month.isnot(None), models.RentPayment.status.isnot(None))
+        .group_by(models.RentPayment.payment_month, models.RentPayment.status)
+    )
+    # Grouped by the stored date; months are folded here so every dialect gets the same keys
+    deltas = defaultdict(lambda: (0, 0.0))
+    for payment_month, status, count, amount in grouped:
+        month_count, month_amount = deltas[(payment_month.replace(day=1), status)]
+        deltas[(payment_month.replace(day=1), status)] = (month_count + count, month_amount + amount)
+    apply_revenue_deltas(db, dict(deltas))
+    db.commit()
@@ -0,0 +1,34 @@
+import time
+from typing import Optional
+
+from backend.app.cache import create_cache
+from backend.app.config import settings
+
+# Denylist for access tokens, so tokens that authorize from their claims alone can still be
+# revoked. Two kinds of entries, each kept only until the tokens it covers have expired:
+#   jti:<jti>      one token (logout)
+#   user:<id>      every token of that user issued at or before the stored time
+#                  (deactivation, role or email change)
+# Never LRU-evicted: dropping an entry early would un-revoke a token.
+denylist = create_cache(settings.CACHE_URL, maxsize=None, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def revoke_token(jti: str, expires_at: int):
+    ttl = int(expires_at - time.time()) + 1
+    if ttl > 0:
+        denylist.set(f"jti:{jti}", 1, ttl=ttl)
+
+
+def revoke_user_tokens(user_id: int):
+    # Access tokens live at most ACCESS_TOKEN_EXPIRE_MINUTES, the default TTL
+    denylist.set(f"user:{user_id}", time.time())
+
+
+def is_revoked(jti: Optional[str], user_id: Optional[int], issued_at: Optional[float]) -> bool:
+    if jti and denylist.get(f"jti:{jti}") is not None:
+        return True
+    if user_id is not None:
+        revoked_before = denylist.get(f"user:{user_id}")
+        if revoked_before is not None and (issued_at is None or issued_at <= revoked_before):
+            return True
+    return False
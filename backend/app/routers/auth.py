@@ -1,54 +1,182 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timedelta
+import uuid
 
-from backend.app import database, models, schemas, auth, dependencies
+from backend.app import database, models, schemas, auth, dependencies, principals, revocation
 from backend.app.config import settings
+from backend.app.database import get_async_db, run_db
 
 router = APIRouter(
     prefix="/api/auth",
     tags=["auth"]
 )
 
-@router.post("/register-admin", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register_admin(
-    user_create: schemas.UserCreate,
-    db: Session = Depends(dependencies.get_db)
-):
-    if db.query(models.User).filter(models.User.email == user_create.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    hashed_password = auth.get_password_hash(user_create.password)
+# Database work for the async routes below, run through database.run_db
+
+def _create_admin(db: Session, email: str, hashed_password: str):
+    if db.query(models.User).filter(models.User.email == email).first():
+        return None
     new_user = models.User(
-        email=user_create.email,
+        email=email,
         hashed_password=hashed_password,
         role=models.UserRole.ADMIN,
         is_active=True
     )
     db.add(new_user)
     db.commit()
-    db.refresh(new_user)
+    # Reload with the tenant relation so serializing UserResponse needs no further queries
+    return dependencies.get_user_by_email(db, email)
+
+def _get_login_user(db: Session, email: str):
+    user = dependencies.get_user_by_email(db, email)
+    if user is None:
+        return None, None
+    login_user = (user.hashed_password, principals.principal_from_user(user))
+    # End the read transaction so the pooled connection isn't held while bcrypt runs
+    db.rollback()
+    return login_user
+
+def _update_password_hash(db: Session, email: str, new_hash: str):
+    db.query(models.User).filter(models.User.email == email).update({"hashed_password": new_hash})
+    db.commit()
+
+def _add_refresh_token(db: Session, user_id: int, family_id: str) -> str:
+    token = auth.create_refresh_token()
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        family_id=family_id,
+        token_hash=auth.hash_refresh_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+def _start_refresh_family(db: Session, user_id: int) -> str:
+    # Housekeeping: drop this user's expired refresh tokens
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    token = _add_refresh_token(db, user_id, uuid.uuid4().hex)
+    db.commit()
+    return token
+
+def _rotate_refresh_token(db: Session, token: str):
+    """
+    Exchange a refresh token for a new one in the same family.
+    Returns (principal, new_token), or None if the token is unknown, expired, revoked or its user inactive.
+    """
+    stored = (
+        db.query(models.RefreshToken)
+        .options(joinedload(models.RefreshToken.user).joinedload(models.User.tenant))
+        .filter(models.RefreshToken.token_hash == auth.hash_refresh_token(token))
+        .first()
+    )
+    if stored is None:
+        return None
+    # Conditional update so only one request can ever rotate a given token
+    rotated = db.query(models.RefreshToken).filter(
+        models.RefreshToken.id == stored.id,
+        models.RefreshToken.revoked == False
+    ).update({"revoked": True}, synchronize_session=False)
+    if not rotated:
+        # Already rotated: the token was replayed (stolen or leaked), so revoke the whole family
+        _revoke_refresh_family(db, stored.family_id)
+        return None
+    if stored.expires_at < datetime.utcnow() or not stored.user.is_active:
+        db.commit()
+        return None
+    new_token = _add_refresh_token(db, stored.user_id, stored.family_id)
+    db.commit()
+    return principals.principal_from_user(stored.user), new_token
+
+def _revoke_refresh_family(db: Session, family_id: str):
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id
+    ).update({"revoked": True}, synchronize_session=False)
+    db.commit()
+
+def _revoke_refresh_token_family(db: Session, token: str):
+    stored = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == auth.hash_refresh_token(token)
+    ).first()
+    if stored:
+        _revoke_refresh_family(db, stored.family_id)
+
+def _token_response(principal: schemas.UserPrincipal, refresh_token: str):
+    principals.cache_principal(principal)
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = auth.create_principal_token(principal, expires_delta=access_token_expires)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/register-admin", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
+async def register_admin(
+    user_create: schemas.UserCreate,
+    db = Depends(get_async_db)
+):
+    hashed_password = await auth.get_password_hash_async(user_create.password)
+    new_user = await run_db(db, _create_admin, user_create.email, hashed_password)
+    if new_user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return new_user
 
 @router.post("/login", response_model=schemas.Token)
-async def login(login_data: schemas.UserLogin, db: Session = Depends(dependencies.get_db)):
-    user = db.query(models.User).filter(models.User.email == login_data.email).first()
-    if not user or not auth.verify_password(login_data.password, user.hashed_password):
+async def login(login_data: schemas.UserLogin, db = Depends(get_async_db)):
+    stored_hash, principal = await run_db(db, _get_login_user, login_data.email)
+
+    verified, new_hash = (False, None)
+    if stored_hash:
+        verified, new_hash = await auth.verify_and_update_password_async(login_data.password, stored_hash)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    if new_hash:
+        # Stored hash used an old cost factor; upgrade it transparently
+        await run_db(db, _update_password_hash, login_data.email, new_hash)
+    if not principal.is_active:
+        # Claims tokens imply an active user, so inactive users don't get one
+        raise HTTPException(status_code=400, detail="Inactive user")
+    refresh_token = await run_db(db, _start_refresh_family, principal.id)
+    return _token_response(principal, refresh_token)
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(refresh_data: schemas.RefreshRequest, db = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access token and a new refresh token (rotation).
+    No password check, so no bcrypt: clients call this when their access token expires.
+    """
+    result = await run_db(db, _rotate_refresh_token, refresh_data.refresh_token)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal, refresh_token = result
+    return _token_response(principal, refresh_token)
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    refresh_data: Optional[schemas.RefreshRequest] = None,
+    token: str = Depends(dependencies.oauth2_scheme),
+    db = Depends(get_async_db)
+):
+    # Revoke this access token for the rest of its lifetime, and the login's refresh tokens
+    payload = dependencies.decode_access_token(token)
+    if payload.get("jti"):
+        revocation.revoke_token(payload["jti"], payload["exp"])
+    if refresh_data:
+        await run_db(db, _revoke_refresh_token_family, refresh_data.refresh_token)
     return {"message": "Logout successful"}
 
 @router.get("/me", response_model=schemas.UserResponse)
-async def read_users_me(current_user: models.User = Depends(dependencies.get_current_active_user)):
-    return current_user
+async def read_users_me(
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_active_user),
+    db = Depends(get_async_db)
+):
+    # The principal carries no relations; load the full user for the response
+    return await run_db(db, dependencies.get_user_by_email, current_user.email)
@@ -0,0 +1,109 @@
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from backend.app import schemas
+from backend.app.dependencies import get_claims_user
+from backend.app.etags import etag_matches
+from backend.app.storage import storage
+
+router = APIRouter(
+    prefix="/api/files",
+    tags=["files"]
+)
+
+# Serves stored uploads (the proof_image_path / image_path values and their variants) to
+# authenticated users. Content-addressed keys (see storage.py) never change content, so their
+# ETag is the SHA-256 from the name and they are cacheable forever; a matching If-None-Match
+# is answered with 304 before touching storage. The keys are unguessable hashes handed out only
+# through authorized API responses, so any signed-in user may fetch them: no query per image.
+# Files stored before content addressing keep a stat-based ETag and are always revalidated.
+
+SERVED_PREFIX = "uploads/"
+STAGING_PREFIX = "uploads/.staging/"
+
+# <namespace>/<h[:2]>/<h[2:4]>/<sha256>[_<variant>].<ext>
+CONTENT_ADDRESSED = re.compile(r"(?:.+/)?([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})(?:_([a-z]+))?\.[a-z0-9]+")
+
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def content_etag(key: str) -> Optional[str]:
+    """Strong ETag for a content-addressed key: the content hash, plus the variant name for derived images."""
+    match = CONTENT_ADDRESSED.fullmatch(key)
+    if not match:
+        return None
+    _, _, sha256, variant = match.groups()
+    return f'"{sha256}-{variant}"' if variant else f'"{sha256}"'
+
+
+def validate_key(key: str) -> str:
+    if (not key.startswith(SERVED_PREFIX) or key.startswith(STAGING_PREFIX)
+            or os.path.normpath(key) != key or key.endswith(".tmp")):
+        raise HTTPException(status_code=404, detail="File not found")
+    return key
+
+
+def parse_single_range(range_header: Optional[str], size: int):
+    """(start, end) for a single "bytes=a-b" range within size, or None to send the whole body."""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (range_header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start == "":
+        start, end = max(size - int(end), 0), size
+    else:
+        start, end = int(start), min(int(end) + 1, size) if end else size
+    if start >= size or start >= end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+@router.get("/{key:path}")
+async def read_file(
+    key: str,
+    request: Request,
+    current_user: schemas.UserPrincipal = Depends(get_claims_user)
+):
+    key = validate_key(key)
+    etag = content_etag(key)
+    cache_control = IMMUTABLE_CACHE_CONTROL if etag else REVALIDATE_CACHE_CONTROL
+
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    local_path = storage.local_path(key)
+    if local_path is not None:
+        try:
+            stat_result = await run_in_threadpool(os.stat, local_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+        # Without a content hash, FileResponse derives the ETag from mtime and size
+        headers = {"Cache-Control": cache_control, **({"ETag": etag} if etag else {})}
+        response = FileResponse(local_path, headers=headers, stat_result=stat_result)
+        if not etag and etag_matches(request.headers.get("if-none-match"), response.headers["etag"]):
+            return Response(status_code=304, headers={"ETag": response.headers["etag"], "Cache-Control": cache_control})
+        # Streamed with sendfile (http.response.pathsend) on servers that support it;
+        # Range and If-Range requests are answered with 206 partial content
+        return response
+
+    # Object storage: no local file to hand to the server, so the body is relayed
+    if not await run_in_threadpool(storage.exists, key):
+        raise HTTPException(status_code=404, detail="File not found")
+    with await run_in_threadpool(storage.open, key) as f:
+        body = await run_in_threadpool(f.read)
+    headers = {"Cache-Control": cache_control, "Accept-Ranges": "bytes", **({"ETag": etag} if etag else {})}
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    if_range = request.headers.get("if-range")
+    byte_range = None if if_range not in (None, etag) else parse_single_range(request.headers.get("range"), len(body))
+    if byte_range is None:
+        return Response(body, media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(body)}"
+    return Response(body[start:end], status_code=206, media_type=media_type, headers=headers)
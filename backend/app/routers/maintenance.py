@@ -1,14 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
-import shutil
-import os
-import uuid
+from sqlalchemy import func, update
+from typing import Dict, List, Optional, Union
+from datetime import datetime, timezone
 
-from backend.app import database, models, schemas
-from backend.app.dependencies import get_current_active_user, get_current_admin_user, get_db
+from backend.app import database, models, schemas, loaders, uploads
+from backend.app.dependencies import get_current_active_user, get_current_admin_user, get_claims_user, get_claims_admin_user, get_db
+from backend.app.pagination import paginate, set_next_cursor
+from backend.app.report_cache import cached_report
 
 router = APIRouter(
     prefix="/api/maintenance",
@@ -20,38 +19,29 @@ UPLOAD_DIR = "uploads/maintenance"
 @router.post("/upload-image", response_model=dict)
 async def upload_maintenance_image(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_user)
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user)
 ):
-    if not os.path.exists(UPLOAD_DIR):
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    return {"filename": unique_filename, "path": file_path}
+    return await uploads.save_upload(file, UPLOAD_DIR, db)
 
 @router.post("/", response_model=schemas.MaintenanceRequestResponse)
 def create_maintenance_request(
     request: schemas.MaintenanceBase,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user)
 ):
     if current_user.role != models.UserRole.TENANT.value:
          raise HTTPException(status_code=403, detail="Only tenants can submit maintenance requests")
     
-    if not current_user.tenant:
+    tenant = db.get(models.Tenant, current_user.tenant_id) if current_user.tenant_id else None
+    if not tenant:
          raise HTTPException(status_code=400, detail="User is not associated with a tenant record")
     
-    if not current_user.tenant.room_id:
+    if not tenant.room_id:
         raise HTTPException(status_code=400, detail="You must be assigned to a room to create a maintenance request")
 
     db_request = models.MaintenanceRequest(
-        tenant_id=current_user.tenant.id,
+        tenant_id=tenant.id,
         **request.model_dump()
     )
     db.add(db_request)
@@ -59,23 +49,39 @@ def create_maintenance_request(
     db.refresh(db_request)
     return db_request
 
-@router.get("/", response_model=List[schemas.MaintenanceRequestResponse])
+@router.get(
+    "/",
+    response_model=Union[List[schemas.MaintenanceRequestResponse], List[schemas.MaintenanceSummaryResponse]],
+    response_model_exclude_unset=True,
+)
 def read_maintenance_requests(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     status: Optional[models.MaintenanceStatus] = None,
     priority: Optional[models.MaintenancePriority] = None,
     category: Optional[models.MaintenanceCategory] = None,
+    view: schemas.ResponseView = schemas.ResponseView.FULL,
+    include: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_claims_user)
 ):
-    query = db.query(models.MaintenanceRequest)
+    # view=summary returns request columns only; include=tenant adds the flat tenant
+    summary = view == schemas.ResponseView.SUMMARY or include is not None
+    relations = loaders.parse_include(include, loaders.MAINTENANCE_SUMMARY_RELATIONS)
+    if summary:
+        options = loaders.summary_options(loaders.MAINTENANCE_SUMMARY_RELATIONS, relations)
+    else:
+        options = loaders.maintenance_response_options()
+
+    query = db.query(models.MaintenanceRequest).options(*options)
     
     if current_user.role == models.UserRole.TENANT.value:
         # Tenant can only see their own
-        if not current_user.tenant:
+        if not current_user.tenant_id:
             return []
-        query = query.filter(models.MaintenanceRequest.tenant_id == current_user.tenant.id)
+        query = query.filter(models.MaintenanceRequest.tenant_id == current_user.tenant_id)
         
     if status:
         query = query.filter(models.MaintenanceRequest.status == status.value)
@@ -84,65 +90,146 @@ def read_maintenance_requests(
     if category:
         query = query.filter(models.MaintenanceRequest.category == category.value)
         
-    requests = query.offset(skip).limit(limit).all()
-    return requests
-
-@router.get("/stats", dependencies=[Depends(get_current_admin_user)])
-def get_maintenance_stats(db: Session = Depends(get_db)):
-    # Count by status
-    status_counts = db.query(
-        models.MaintenanceRequest.status, func.count(models.MaintenanceRequest.id)
-    ).group_by(models.MaintenanceRequest.status).all()
-    
-    # Count by category
-    category_counts = db.query(
-        models.MaintenanceRequest.category, func.count(models.MaintenanceRequest.id)
-    ).group_by(models.MaintenanceRequest.category).all()
-    
-    # Calculate average resolution time (for resolved requests)
-    # This might differ between DBs (SQLite vs Postgres). 
-    # For SQLite, calculating date diffs in SQL is tricky. 
-    # Since we are likely using SQLite for dev, let's do it in python for simplicity if dataset is small, 
-    # or try a compatible SQL query.
-    # Given this is a prototype/MVP, Python calculation for avg time is acceptable for now.
-    
-    resolved_requests = db.query(models.MaintenanceRequest).filter(
-        models.MaintenanceRequest.status.in_([models.MaintenanceStatus.RESOLVED.value, models.MaintenanceStatus.CLOSED.value]),
-        models.MaintenanceRequest.resolved_date.isnot(None)
+    # Newest first. Ids follow request_date (set on insert), so id alone is the keyset
+    # and avoids comparing SQLite timestamp strings of differing precision.
+    requests, next_cursor = paginate(
+        query, [models.MaintenanceRequest.id], skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    set_next_cursor(response, next_cursor)
+    if summary:
+        return [schemas.build_summary(schemas.MaintenanceSummaryResponse, r, relations) for r in requests]
+    return [schemas.MaintenanceRequestResponse.model_validate(r) for r in requests]
+
+RESOLVED_STATUSES = [models.MaintenanceStatus.RESOLVED, models.MaintenanceStatus.CLOSED]
+RESOLUTION_PERCENTILES = {"p50": 0.5, "p90": 0.9}
+
+def resolution_seconds(request_date: Optional[datetime], resolved_date: datetime) -> Optional[float]:
+    # request_date comes from the database clock, which SQLite stores as naive UTC
+    if request_date is None:
+        return None
+    if request_date.tzinfo is None:
+        request_date = request_date.replace(tzinfo=timezone.utc)
+    if resolved_date.tzinfo is None:
+        resolved_date = resolved_date.replace(tzinfo=timezone.utc)
+    return (resolved_date - request_date).total_seconds()
+
+def backfill_resolution_seconds(db: Session) -> int:
+    """Fill resolution_seconds for resolved/closed requests stored before the column existed."""
+    rows = db.query(
+        models.MaintenanceRequest.id, models.MaintenanceRequest.request_date, models.MaintenanceRequest.resolved_date
+    ).filter(
+        models.MaintenanceRequest.status.in_([s.value for s in RESOLVED_STATUSES]),
+        models.MaintenanceRequest.resolved_date.isnot(None),
+        models.MaintenanceRequest.resolution_seconds.is_(None),
     ).all()
-    
-    total_resolution_time = 0
-    resolved_count = 0
-    for req in resolved_requests:
-        if req.request_date and req.resolved_date:
-            # request_date might be timezone aware, resolved_date too.
-            # Ensure compatibility.
-            diff = req.resolved_date - req.request_date
-            total_resolution_time += diff.total_seconds()
-            resolved_count += 1
-            
-    avg_resolution_hours = 0
-    if resolved_count > 0:
-        avg_resolution_hours = (total_resolution_time / resolved_count) / 3600
+    updates = [
+        {"id": id, "resolution_seconds": resolution_seconds(request_date, resolved_date)}
+        for id, request_date, resolved_date in rows
+    ]
+    if updates:
+        db.execute(update(models.MaintenanceRequest), updates)
+    db.commit()
+    return len(updates)
+
+def resolution_percentile(db: Session, resolved_count: int, quantile: float) -> Optional[float]:
+    """
+    Linear-interpolated percentile of resolution_seconds: the one or two values around the rank,
+    read from the ordered index instead of loading every resolved request. None if requests were
+    reopened or deleted since resolved_count was read and the rank is now past the end.
+    """
+    if not resolved_count:
+        return None
+    position = quantile * (resolved_count - 1)
+    lower = int(position)
+    column = models.MaintenanceRequest.resolution_seconds
+    values = [
+        value for (value,) in
+        db.query(column).filter(column.isnot(None)).order_by(column).offset(lower).limit(2)
+    ]
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return values[0] + (values[1] - values[0]) * (position - lower)
+
+def to_hours(seconds: Optional[float]) -> float:
+    return round(seconds / 3600, 2) if seconds else 0
+
+def fold_maintenance_groups(groups, key: str) -> List[Dict]:
+    """Sum the (status, priority, category) groups over one key: request count, resolved count, average resolution."""
+    folded = {}
+    for group in groups:
+        totals = folded.setdefault(getattr(group, key), [0, 0, 0.0])
+        totals[0] += group.requests
+        totals[1] += group.resolved
+        totals[2] += group.resolution_total or 0.0
+    return [
+        {
+            key: k,
+            "total_requests": requests,
+            "resolved_count": resolved,
+            "avg_resolution_time_hours": to_hours(total / resolved if resolved else None),
+        }
+        for k, (requests, resolved, total) in sorted(folded.items(), key=lambda kv: (kv[0] is None, kv[0]))
+    ]
+
+def maintenance_stats(db: Session) -> dict:
+    groups = db.query(
+        models.MaintenanceRequest.status,
+        models.MaintenanceRequest.priority,
+        models.MaintenanceRequest.category,
+        func.count(models.MaintenanceRequest.id).label("requests"),
+        func.count(models.MaintenanceRequest.resolution_seconds).label("resolved"),
+        func.sum(models.MaintenanceRequest.resolution_seconds).label("resolution_total"),
+    ).group_by(
+        models.MaintenanceRequest.status, models.MaintenanceRequest.priority, models.MaintenanceRequest.category
+    ).all()
+
+    by_status = fold_maintenance_groups(groups, "status")
+    by_category = fold_maintenance_groups(groups, "category")
+    resolved_count = sum(g.resolved for g in groups)
+    resolution_total = sum(g.resolution_total or 0.0 for g in groups)
 
     return {
-        "status_counts": {s: c for s, c in status_counts},
-        "category_counts": {c: count for c, count in category_counts},
-        "avg_resolution_time_hours": round(avg_resolution_hours, 2)
+        "status_counts": {s["status"]: s["total_requests"] for s in by_status},
+        "category_counts": {c["category"]: c["total_requests"] for c in by_category},
+        "resolved_count": resolved_count,
+        "avg_resolution_time_hours": to_hours(resolution_total / resolved_count if resolved_count else None),
+        **{
+            f"{name}_resolution_time_hours": to_hours(resolution_percentile(db, resolved_count, quantile))
+            for name, quantile in RESOLUTION_PERCENTILES.items()
+        },
+        "by_priority": fold_maintenance_groups(groups, "priority"),
+        "by_category": by_category,
     }
 
+@router.get("/stats", dependencies=[Depends(get_claims_admin_user)])
+def get_maintenance_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Request counts by status and category, and resolution times overall and by priority and
+    category, from one query grouped by (status, priority, category) over the stored
+    resolution_seconds. The p50/p90 resolution times are read from its index.
+    """
+    return cached_report(request, response, "maintenance_stats", {}, ["maintenance_requests"],
+                         lambda: maintenance_stats(db))
+
 @router.get("/{request_id}", response_model=schemas.MaintenanceRequestResponse)
 def read_maintenance_request(
     request_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_claims_user)
 ):
-    request = db.query(models.MaintenanceRequest).filter(models.MaintenanceRequest.id == request_id).first()
+    request = (
+        db.query(models.MaintenanceRequest)
+        .options(*loaders.maintenance_response_options())
+        .filter(models.MaintenanceRequest.id == request_id)
+        .first()
+    )
     if request is None:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
         
     if current_user.role == models.UserRole.TENANT.value:
-        if not current_user.tenant or request.tenant_id != current_user.tenant.id:
+        if not current_user.tenant_id or request.tenant_id != current_user.tenant_id:
             raise HTTPException(status_code=403, detail="Not authorized to view this request")
             
     return request
@@ -152,19 +239,23 @@ def update_maintenance_request(
     request_id: int,
     update_data: schemas.MaintenanceUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(get_current_admin_user)
 ):
     request = db.query(models.MaintenanceRequest).filter(models.MaintenanceRequest.id == request_id).first()
     if request is None:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
     
     if update_data.status:
+        was_resolved = request.status in [s.value for s in RESOLVED_STATUSES]
         request.status = update_data.status.value
-        # If status is changing to RESOLVED or CLOSED, set resolved_date
-        if update_data.status in [models.MaintenanceStatus.RESOLVED, models.MaintenanceStatus.CLOSED]:
-             request.resolved_date = datetime.now()
-        # If status is changing back to OPEN/IN_PROGRESS from resolved, maybe clear resolved_date?
-        # Let's keep it simple for now.
+        # Moving to RESOLVED or CLOSED stamps resolved_date and the stored resolution time;
+        # Resolved -> Closed keeps the original resolution
+        if update_data.status in RESOLVED_STATUSES and not was_resolved:
+            request.resolved_date = datetime.now(timezone.utc)
+            request.resolution_seconds = resolution_seconds(request.request_date, request.resolved_date)
+        # Reopened: no longer counted in the resolution stats until resolved again
+        elif update_data.status not in RESOLVED_STATUSES:
+            request.resolution_seconds = None
         
     if update_data.resolution_notes:
         request.resolution_notes = update_data.resolution_notes
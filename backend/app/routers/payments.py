@@ -1,44 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Query, Response
+from pydantic import ValidationError
+from sqlalchemy import case
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import date
-import shutil
-import os
-import uuid
 
-from backend.app import database, models, schemas
-from backend.app.dependencies import get_current_active_user, get_current_admin_user, get_db
+from backend.app import database, models, schemas, loaders, uploads, revenue
+from backend.app.dependencies import get_current_active_user, get_current_admin_user, get_claims_user, get_claims_admin_user, get_db
+from backend.app.pagination import paginate, set_next_cursor
 
 router = APIRouter(
     prefix="/api/payments",
     tags=["payments"]
 )
 
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = "uploads/payments"
+
+# Columns of the rent_payments unique index: one payment per tenant per month
+PAYMENT_MONTH_KEY = ["tenant_id", "payment_month"]
+
+# Largest verify-batch request accepted (bounds the IN list and CASE expressions)
+MAX_VERIFY_BATCH = 500
+
+# Largest bulk payment submission accepted
+MAX_BULK_PAYMENTS = 1000
 
 @router.post("/upload-proof", response_model=dict)
 async def upload_payment_proof(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_user)
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user)
 ):
-    if not os.path.exists(UPLOAD_DIR):
-        os.makedirs(UPLOAD_DIR)
-    
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    return {"filename": unique_filename, "path": file_path}
+    return await uploads.save_upload(file, UPLOAD_DIR, db)
 
 @router.post("/", response_model=schemas.RentPaymentResponse)
 def create_payment(
     payment: schemas.PaymentBase,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user)
 ):
     # If user is admin, they might be submitting for a tenant, but the current Schema assumes
     # PaymentBase + logic. 
@@ -46,9 +48,9 @@ def create_payment(
     
     tenant_id = None
     if current_user.role == models.UserRole.TENANT.value:
-        if not current_user.tenant:
+        if not current_user.tenant_id:
              raise HTTPException(status_code=400, detail="User is not associated with a tenant record")
-        tenant_id = current_user.tenant.id
+        tenant_id = current_user.tenant_id
     else:
         # Admin is submitting? 
         # Ideally, admin should provide tenant_id. 
@@ -58,44 +60,164 @@ def create_payment(
         # (which isn't in PaymentBase).
         # Let's enforce: Only tenants can submit via this generic endpoint for now, OR admin must have a way to specify tenant.
         # Given the plan "Implement POST /api/payments (submit payment - tenant)", we'll focus on tenant.
-        if not current_user.tenant:
+        if not current_user.tenant_id:
              raise HTTPException(status_code=400, detail="Admin submission requires specifying tenant (not yet implemented in this simplified endpoint)")
-        tenant_id = current_user.tenant.id
+        tenant_id = current_user.tenant_id
 
-    # Check for duplicate payment for the same month
-    existing_payment = db.query(models.RentPayment).filter(
-        models.RentPayment.tenant_id == tenant_id,
-        models.RentPayment.payment_month == payment.payment_month
-    ).first()
-    
-    if existing_payment:
+    # The unique index is on the stored month, so any day of a month is stored as its first day
+    values = payment.model_dump()
+    values["payment_month"] = payment.payment_month.replace(day=1)
+    # One statement, no check-then-insert race: the (tenant_id, payment_month) unique index
+    # skips a duplicate, and RETURNING comes back empty
+    payment_id = db.execute(
+        database.insert_on_conflict_do_nothing(db, models.RentPayment, PAYMENT_MONTH_KEY)
+        .values(tenant_id=tenant_id, **values)
+        .returning(models.RentPayment.id)
+    ).scalar()
+    if payment_id is None:
         raise HTTPException(status_code=400, detail="Payment for this month already exists")
-
-    db_payment = models.RentPayment(
-        tenant_id=tenant_id,
-        **payment.model_dump()
-    )
-    db.add(db_payment)
+    revenue.record_payment_changes(db, [(values["payment_month"], None, models.PaymentStatus.PENDING.value, payment.amount)])
     db.commit()
-    db.refresh(db_payment)
-    return db_payment
 
-@router.get("/", response_model=List[schemas.RentPaymentResponse])
+    return db.query(models.RentPayment).options(*loaders.payment_response_options()).filter(
+        models.RentPayment.id == payment_id
+    ).one()
+
+def _parse_bulk_rows(body: bytes, content_type: str) -> list:
+    """Raw rows from a JSON list, or from CSV with a header row (tenant_id,amount,month,method,txn[,payment_date])."""
+    if content_type.startswith("text/csv"):
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        # Blank cells fall back to the field defaults
+        return [{key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()} for row in reader]
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("expected a list")
+    return rows
+
+def _bulk_result(number: int, detail: str) -> schemas.BulkPaymentResult:
+    return schemas.BulkPaymentResult(row=number, success=False, detail=detail)
+
+def _record_bulk_payments(db: Session, raw_rows: list) -> List[schemas.BulkPaymentResult]:
+    results = {}
+    rows = {}
+    for number, raw in enumerate(raw_rows, start=1):
+        try:
+            rows[number] = schemas.BulkPaymentRow.model_validate(raw)
+        except ValidationError as e:
+            results[number] = _bulk_result(number, "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in e.errors()
+            ))
+
+    # Two set-based lookups for the whole batch: which tenants exist, which months are already paid
+    tenant_ids = {row.tenant_id for row in rows.values()}
+    known_tenants = {tenant_id for (tenant_id,) in db.query(models.Tenant.id).filter(models.Tenant.id.in_(tenant_ids))}
+    paid_months = {
+        tuple(key) for key in db.query(models.RentPayment.tenant_id, models.RentPayment.payment_month).filter(
+            models.RentPayment.tenant_id.in_(tenant_ids),
+            models.RentPayment.payment_month.in_({row.month for row in rows.values()}),
+        )
+    }
+
+    to_insert = {}
+    for number, row in rows.items():
+        key = (row.tenant_id, row.month)
+        if row.tenant_id not in known_tenants:
+            results[number] = _bulk_result(number, "Tenant not found")
+        elif key in paid_months:
+            results[number] = _bulk_result(number, "Payment for this month already exists")
+        elif key in to_insert:
+            results[number] = _bulk_result(number, "Tenant and month repeated in this batch")
+        else:
+            to_insert[key] = number
+
+    if to_insert:
+        today = date.today()
+        # executemany; ON CONFLICT still guards months paid concurrently since the lookup
+        inserted = db.execute(
+            database.insert_on_conflict_do_nothing(db, models.RentPayment, PAYMENT_MONTH_KEY).returning(
+                models.RentPayment.id, models.RentPayment.tenant_id, models.RentPayment.payment_month
+            # Send NULLs rather than splitting the batch by which columns are None
+            ).execution_options(render_nulls=True),
+            [
+                {
+                    "tenant_id": rows[number].tenant_id,
+                    "amount": rows[number].amount,
+                    "payment_date": rows[number].payment_date or today,
+                    "payment_method": rows[number].method,
+                    "transaction_id": rows[number].txn,
+                    "payment_month": rows[number].month,
+                    # Collected by the admin recording it
+                    "status": models.PaymentStatus.VERIFIED.value,
+                }
+                for number in to_insert.values()
+            ],
+        ).all()
+        created = {(tenant_id, month): payment_id for payment_id, tenant_id, month in inserted}
+        revenue.record_payment_changes(db, [
+            (month, None, models.PaymentStatus.VERIFIED.value, rows[to_insert[(tenant_id, month)]].amount)
+            for tenant_id, month in created
+        ])
+        db.commit()
+        for key, number in to_insert.items():
+            if key in created:
+                results[number] = schemas.BulkPaymentResult(row=number, success=True, payment_id=created[key])
+            else:
+                results[number] = _bulk_result(number, "Payment for this month already exists")
+
+    return [results[number] for number in sorted(results)]
+
+@router.post("/bulk", response_model=List[schemas.BulkPaymentResult])
+async def create_payments_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(get_current_admin_user)
+):
+    """
+    Record payments collected by an admin (e.g. cash on collection day) for many tenants at once,
+    as Verified. The body is a JSON list of BulkPaymentRow objects or a text/csv document with the
+    same column names. Rows are checked and inserted together; each gets a result, and invalid
+    rows are reported without aborting the rest.
+    """
+    try:
+        raw_rows = _parse_bulk_rows(await request.body(), request.headers.get("content-type", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON list of payments or a CSV document")
+    if len(raw_rows) > MAX_BULK_PAYMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_PAYMENTS} payments per request")
+    return await database.run_db(db, _record_bulk_payments, raw_rows)
+
+@router.get(
+    "/",
+    response_model=Union[List[schemas.RentPaymentResponse], List[schemas.RentPaymentSummaryResponse]],
+    response_model_exclude_unset=True,
+)
 def read_payments(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     tenant_id: Optional[int] = None,
     status: Optional[models.PaymentStatus] = None,
+    view: schemas.ResponseView = schemas.ResponseView.FULL,
+    include: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_claims_user)
 ):
-    query = db.query(models.RentPayment)
+    # view=summary returns payment columns only; include=tenant adds the flat tenant
+    summary = view == schemas.ResponseView.SUMMARY or include is not None
+    relations = loaders.parse_include(include, loaders.PAYMENT_SUMMARY_RELATIONS)
+    if summary:
+        options = loaders.summary_options(loaders.PAYMENT_SUMMARY_RELATIONS, relations)
+    else:
+        options = loaders.payment_response_options()
+
+    query = db.query(models.RentPayment).options(*options)
     
     if current_user.role == models.UserRole.TENANT.value:
         # Tenant can only see their own
-        if not current_user.tenant:
+        if not current_user.tenant_id:
             return []
-        query = query.filter(models.RentPayment.tenant_id == current_user.tenant.id)
+        query = query.filter(models.RentPayment.tenant_id == current_user.tenant_id)
     elif tenant_id:
         # Admin can filter by tenant
         query = query.filter(models.RentPayment.tenant_id == tenant_id)
@@ -103,41 +225,128 @@ def read_payments(
     if status:
         query = query.filter(models.RentPayment.status == status.value)
         
-    payments = query.offset(skip).limit(limit).all()
-    return payments
+    # Newest first; keyset on (payment_date, id) backed by the rent_payments composite indexes
+    payments, next_cursor = paginate(
+        query, [models.RentPayment.payment_date, models.RentPayment.id],
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    set_next_cursor(response, next_cursor)
+    if summary:
+        return [schemas.build_summary(schemas.RentPaymentSummaryResponse, p, relations) for p in payments]
+    return [schemas.RentPaymentResponse.model_validate(p) for p in payments]
 
 @router.get("/{payment_id}", response_model=schemas.RentPaymentResponse)
 def read_payment(
     payment_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_claims_user)
 ):
-    payment = db.query(models.RentPayment).filter(models.RentPayment.id == payment_id).first()
+    payment = (
+        db.query(models.RentPayment)
+        .options(*loaders.payment_response_options())
+        .filter(models.RentPayment.id == payment_id)
+        .first()
+    )
     if payment is None:
         raise HTTPException(status_code=404, detail="Payment not found")
         
     if current_user.role == models.UserRole.TENANT.value:
-        if not current_user.tenant or payment.tenant_id != current_user.tenant.id:
+        if not current_user.tenant_id or payment.tenant_id != current_user.tenant_id:
             raise HTTPException(status_code=403, detail="Not authorized to view this payment")
             
     return payment
 
+@router.put("/verify-batch", response_model=List[schemas.PaymentVerificationResult])
+def verify_payments_batch(
+    verifications: List[schemas.PaymentVerification],
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(get_current_admin_user)
+):
+    """
+    Apply many verify decisions in one transaction: one SELECT for the current statuses and one
+    UPDATE ... WHERE id IN (...), with each payment's status and remarks picked by CASE on id.
+    Unknown or repeated ids are reported per item and skipped; the rest still apply.
+    """
+    if len(verifications) > MAX_VERIFY_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_VERIFY_BATCH} payments per batch")
+
+    current = {
+        row.id: row for row in
+        db.query(models.RentPayment.id, models.RentPayment.status, models.RentPayment.amount, models.RentPayment.payment_month)
+        .filter(models.RentPayment.id.in_({v.id for v in verifications}))
+    }
+    current_status = {payment_id: row.status for payment_id, row in current.items()}
+    results = []
+    applied = set()
+    new_status, new_remarks = {}, {}
+    for verification in verifications:
+        if verification.id not in current_status:
+            results.append(schemas.PaymentVerificationResult(id=verification.id, success=False, detail="Payment not found"))
+            continue
+        if verification.id in applied:
+            results.append(schemas.PaymentVerificationResult(
+                id=verification.id, success=False, detail="Payment appears more than once in the batch"
+            ))
+            continue
+        applied.add(verification.id)
+        # Same rules as verify_payment: unset fields keep their value
+        if verification.status:
+            new_status[verification.id] = verification.status.value
+        if verification.remarks:
+            new_remarks[verification.id] = verification.remarks
+        results.append(schemas.PaymentVerificationResult(
+            id=verification.id, success=True,
+            status=new_status.get(verification.id, current_status[verification.id]),
+        ))
+
+    values = {}
+    if new_status:
+        values[models.RentPayment.status] = case(new_status, value=models.RentPayment.id, else_=models.RentPayment.status)
+    if new_remarks:
+        values[models.RentPayment.remarks] = case(new_remarks, value=models.RentPayment.id, else_=models.RentPayment.remarks)
+    if values:
+        changed_ids = new_status.keys() | new_remarks.keys()
+        # Only rows still in the status read above, so the rollup moves each payment exactly once
+        updated = db.query(models.RentPayment).filter(
+            models.RentPayment.id.in_(changed_ids),
+            models.RentPayment.status == case({i: current_status[i] for i in changed_ids}, value=models.RentPayment.id),
+        ).update(values, synchronize_session=False)
+        if updated != len(changed_ids):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Payments were updated concurrently, please retry")
+        revenue.record_payment_changes(db, [
+            (current[i].payment_month, current[i].status, status_value, current[i].amount)
+            for i, status_value in new_status.items()
+        ])
+    db.commit()
+    return results
+
 @router.put("/{payment_id}/verify", response_model=schemas.RentPaymentResponse)
 def verify_payment(
     payment_id: int,
     payment_update: schemas.PaymentUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(get_current_admin_user)
 ):
     payment = db.query(models.RentPayment).filter(models.RentPayment.id == payment_id).first()
     if payment is None:
         raise HTTPException(status_code=404, detail="Payment not found")
-        
+
+    values = {}
     if payment_update.status:
-        payment.status = payment_update.status.value
+        values["status"] = payment_update.status.value
     if payment_update.remarks:
-        payment.remarks = payment_update.remarks
-        
+        values["remarks"] = payment_update.remarks
+    if values:
+        # Conditional on the status just read, so the revenue rollup moves this payment exactly once
+        updated = db.query(models.RentPayment).filter(
+            models.RentPayment.id == payment_id, models.RentPayment.status == payment.status
+        ).update(values, synchronize_session=False)
+        if not updated:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Payment was updated concurrently, please retry")
+        revenue.record_payment_changes(db, [(payment.payment_month, payment.status, values.get("status", payment.status), payment.amount)])
+
     db.commit()
     db.refresh(payment)
     return payment
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from typing import List, Optional, Dict, Any
-from datetime import date, datetime
+from sqlalchemy import case, func, extract
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime, timedelta
 
-from backend.app import database, models, schemas, dependencies
+from backend.app import database, dues, loaders, models, schemas, dependencies
 from backend.app.database import get_db
-from backend.app.routers.rooms import get_room_occupancy, is_room_available
+from backend.app.pagination import paginate, set_next_cursor
+from backend.app.report_cache import cached_report
+from backend.app.routers.rooms import query_active_rooms
 
 router = APIRouter(
     prefix="/api/reports",
@@ -16,44 +18,32 @@ router = APIRouter(
 # --- Schemas for Reports (Internal to this file or could be in schemas.py) ---
 # For simplicity, returning Dicts or specific Pydantic models if needed.
 
-@router.get("/revenue", response_model=Dict[str, Any])
-def get_revenue_report(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
-):
-    """
-    Get revenue statistics: Total collected, Pending, and Monthly breakdown.
-    Optional date range filtering affects the 'Total' and 'Pending' calculation context 
-    and the range of the monthly breakdown.
-    """
-    query = db.query(models.RentPayment)
-    
+# Tables each report reads: a committed write to any of them invalidates its cached results
+# and ETags (see report_cache.py)
+REVENUE_TABLES = ["revenue_monthly"]
+DUES_TABLES = ["tenants", "rooms", "rent_payments"]
+OCCUPANCY_TABLES = ["rooms"]
+TRENDS_TABLES = ["daily_snapshots", "daily_floor_snapshots"]
+TENANT_REPORT_TABLES = ["tenants", "users", "rooms", "rent_payments", "maintenance_requests"]
+
+def revenue_report(db: Session, start_date: Optional[date], end_date: Optional[date]) -> Dict[str, Any]:
+    query = db.query(models.RevenueMonthly).filter(models.RevenueMonthly.payment_count != 0)
+
     if start_date:
-        query = query.filter(models.RentPayment.payment_date >= start_date)
+        query = query.filter(models.RevenueMonthly.month >= start_date.replace(day=1))
     if end_date:
-        query = query.filter(models.RentPayment.payment_date <= end_date)
-        
-    payments = query.all()
-    
-    total_revenue = sum(p.amount for p in payments if p.status == models.PaymentStatus.VERIFIED.value)
-    pending_revenue = sum(p.amount for p in payments if p.status == models.PaymentStatus.PENDING.value)
-    
-    # Monthly Breakdown (Group by Year-Month)
-    # Using python for grouping to avoid complex SQL dialects differences (SQLite vs Postgres) for date extraction
-    monthly_data = {}
-    
-    for p in payments:
-        if p.status == models.PaymentStatus.VERIFIED.value:
-            # key = YYYY-MM
-            month_key = p.payment_month.strftime("%Y-%m")
-            if month_key not in monthly_data:
-                monthly_data[month_key] = 0.0
-            monthly_data[month_key] += p.amount
-            
-    # Sort by month
-    sorted_monthly = [{"month": k, "revenue": v} for k, v in sorted(monthly_data.items())]
+        query = query.filter(models.RevenueMonthly.month <= end_date)
+
+    rollup = query.order_by(models.RevenueMonthly.month).all()
+
+    total_revenue = sum(r.total_amount for r in rollup if r.status == models.PaymentStatus.VERIFIED.value)
+    pending_revenue = sum(r.total_amount for r in rollup if r.status == models.PaymentStatus.PENDING.value)
+
+    # Monthly Breakdown (verified), one rollup row per month
+    sorted_monthly = [
+        {"month": r.month.strftime("%Y-%m"), "revenue": r.total_amount, "payment_count": r.payment_count}
+        for r in rollup if r.status == models.PaymentStatus.VERIFIED.value
+    ]
 
     return {
         "total_revenue": total_revenue,
@@ -65,84 +55,221 @@ def get_revenue_report(
         }
     }
 
+@router.get("/revenue", response_model=Dict[str, Any])
+def get_revenue_report(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
+):
+    """
+    Get revenue statistics: Total collected, Pending, and Monthly breakdown.
+    Answered from the revenue_monthly rollup, so the cost grows with the number of months,
+    not payments. The optional date range selects the months paid for (payment_month).
+    """
+    return cached_report(request, response, "revenue", {"start_date": start_date, "end_date": end_date},
+                         REVENUE_TABLES, lambda: revenue_report(db, start_date, end_date))
+
+@router.get("/dues", response_model=Dict[str, Any])
+def get_dues_report(
+    request: Request,
+    response: Response,
+    as_of: Optional[date] = None,
+    tenant_id: Optional[int] = None,
+    only_outstanding: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_user)
+):
+    """
+    Outstanding rent per tenant and the aging summary (0-30, 31-60, 60+ days overdue) as of a date
+    (default today): the expected-rent schedule from check-in/check-out and room rent, joined
+    against verified payments. Admins see every tenant (or tenant_id); tenants see their own.
+    """
+    if current_user.role == models.UserRole.TENANT.value:
+        if not current_user.tenant_id:
+            raise HTTPException(status_code=400, detail="User is not associated with a tenant record")
+        tenant_id = current_user.tenant_id
+    as_of = as_of or date.today()
+    return cached_report(
+        request, response, "dues", {"as_of": as_of, "tenant_id": tenant_id, "only_outstanding": only_outstanding},
+        DUES_TABLES, lambda: dues.dues_report(db, as_of=as_of, tenant_id=tenant_id, only_outstanding=only_outstanding),
+    )
+
+def sum_if(condition, value=1):
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+OCCUPANCY_COUNTS = ["rooms", "capacity", "occupied_beds", "occupied_rooms", "vacant_rooms"]
+
+def occupancy_stats(rooms: int, capacity: int, occupied_beds: int, occupied_rooms: int, vacant_rooms: int) -> Dict[str, Any]:
+    return {
+        "total_rooms": rooms,
+        "total_capacity": capacity,
+        "total_occupied_beds": occupied_beds,
+        "occupied_rooms_count": occupied_rooms,
+        "vacant_rooms_count": vacant_rooms,
+        "occupancy_rate": round(occupied_beds / capacity * 100, 2) if capacity else 0.0,
+    }
+
+def sum_occupancy_counts(groups) -> Dict[str, int]:
+    return {name: sum(getattr(group, name) or 0 for group in groups) for name in OCCUPANCY_COUNTS}
+
+def fold_occupancy_groups(groups, key: str) -> List[Tuple[Any, Dict[str, Any]]]:
+    """Sum the (floor, room_type) groups over one of the two keys, ordered by key (None last)."""
+    by_key = {}
+    for group in groups:
+        by_key.setdefault(getattr(group, key), []).append(group)
+    return [
+        (k, occupancy_stats(**sum_occupancy_counts(by_key[k])))
+        for k in sorted(by_key, key=lambda k: (k is None, k))
+    ]
+
+TREND_COLUMNS = ["occupied_beds", "capacity", "verified_revenue", "open_maintenance"]
+DEFAULT_TREND_DAYS = 30
+
+def trend_point(snapshot) -> Dict[str, Any]:
+    point = {"day": snapshot.day, **{c: getattr(snapshot, c) for c in TREND_COLUMNS}}
+    point["occupancy_rate"] = round(snapshot.occupied_beds / snapshot.capacity * 100, 2) if snapshot.capacity else 0.0
+    return point
+
+def trends_report(db: Session, start_date: date, end_date: date, by_floor: bool) -> Dict[str, Any]:
+    snapshots = (
+        db.query(models.DailySnapshot)
+        .filter(models.DailySnapshot.day >= start_date, models.DailySnapshot.day <= end_date)
+        .order_by(models.DailySnapshot.day)
+        .all()
+    )
+    report = {"period": {"start": start_date, "end": end_date}, "days": [trend_point(s) for s in snapshots]}
+    if by_floor:
+        floor_snapshots = (
+            db.query(models.DailyFloorSnapshot)
+            .filter(models.DailyFloorSnapshot.day >= start_date, models.DailyFloorSnapshot.day <= end_date)
+            .order_by(models.DailyFloorSnapshot.day, models.DailyFloorSnapshot.floor)
+            .all()
+        )
+        report["floors"] = [{"floor": s.floor, **trend_point(s)} for s in floor_snapshots]
+    return report
+
+@router.get("/trends", response_model=Dict[str, Any])
+def get_trends_report(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    by_floor: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
+):
+    """
+    Daily occupancy, cumulative verified revenue and open maintenance for a date range
+    (default: the last 30 days), read from the daily snapshots as a primary-key range scan.
+    `by_floor` adds the per-floor series.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_TREND_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    params = {"start_date": start_date, "end_date": end_date, "by_floor": by_floor}
+    return cached_report(request, response, "trends", params, TRENDS_TABLES,
+                         lambda: trends_report(db, start_date, end_date, by_floor))
+
+def occupancy_summary(db: Session) -> Dict[str, Any]:
+    occupancy = models.Room.active_occupancy
+    groups = (
+        db.query(
+            models.Room.floor,
+            models.Room.room_type,
+            func.count(models.Room.id).label("rooms"),
+            func.sum(models.Room.capacity).label("capacity"),
+            func.sum(occupancy).label("occupied_beds"),
+            sum_if(occupancy > 0).label("occupied_rooms"),
+            sum_if(occupancy < models.Room.capacity).label("vacant_rooms"),
+        )
+        .filter(models.Room.is_active == True)
+        .group_by(models.Room.floor, models.Room.room_type)
+        .all()
+    )
+    return {
+        **occupancy_stats(**sum_occupancy_counts(groups)),
+        "by_floor": [{"floor": floor, **stats} for floor, stats in fold_occupancy_groups(groups, "floor")],
+        "by_room_type": [{"room_type": room_type, **stats} for room_type, stats in fold_occupancy_groups(groups, "room_type")],
+    }
+
 @router.get("/occupancy", response_model=Dict[str, Any])
 def get_occupancy_report(
+    request: Request,
+    response: Response,
+    rooms: Optional[schemas.OccupancyRoomList] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_active_user) # Allow tenants to see availability? Or Admin only? Plan says "cancelled" so I'll assume admin for detailed report.
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
 ):
-    # Actually, allow tenants to see general occupancy might be fine, but let's stick to Admin for detailed lists.
-    # The current_user dependency is mainly for auth check. 
-    # If explicit permission needed:
-    if current_user.role != models.UserRole.ADMIN.value:
-         pass # Maybe restrict full lists? For now, let's allow basic visibility or restrict whole endpoint.
-         # Let's restrict to Admin for the "Reports" module generally.
-         if current_user.role != models.UserRole.ADMIN.value:
-             raise HTTPException(status_code=403, detail="Not authorized")
-
-    rooms = db.query(models.Room).filter(models.Room.is_active == True).all()
-    
-    total_capacity = sum(r.capacity for r in rooms)
-    total_rooms = len(rooms)
-    
-    # Calculate occupied beds
-    # We can iterate rooms and use get_room_occupancy helper
-    occupied_beds = 0
-    vacant_rooms_list = []
-    occupied_rooms_list = []
-    
-    for room in rooms:
-        occ = get_room_occupancy(room)
-        occupied_beds += occ
-        
-        room_data = {
+    """
+    Occupancy totals with breakdowns by floor and room type, from one grouped query over the
+    active rooms' occupancy counters, so its cost does not grow with the number of rooms.
+    Room lists are opt-in: `rooms=vacant|occupied|all` adds one page of rooms (`limit`), with
+    the X-Next-Cursor response header to pass back as `cursor` for the next page. Only the
+    report without a room list is cached (with an ETag).
+    """
+    if rooms is None:
+        return cached_report(request, response, "occupancy", {}, OCCUPANCY_TABLES, lambda: occupancy_summary(db))
+
+    report = occupancy_summary(db)
+    query = query_active_rooms(
+        db,
+        available=True if rooms == schemas.OccupancyRoomList.VACANT else None,
+        occupied=True if rooms == schemas.OccupancyRoomList.OCCUPIED else None,
+        options=loaders.summary_options(loaders.ROOM_SUMMARY_RELATIONS, set()),
+    )
+    page, next_cursor = paginate(query, [models.Room.id], limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    report["rooms"] = [
+        {
             "id": room.id,
             "room_number": room.room_number,
+            "floor": room.floor,
             "type": room.room_type,
             "capacity": room.capacity,
-            "occupancy": occ
-        }
-        
-        if occ > 0:
-            occupied_rooms_list.append(room_data)
-        
-        if occ < room.capacity:
-            vacant_rooms_list.append(room_data)
-            
-    occupancy_rate = 0.0
-    if total_capacity > 0:
-        occupancy_rate = (occupied_beds / total_capacity) * 100
-        
-    return {
-        "occupancy_rate": round(occupancy_rate, 2),
-        "total_capacity": total_capacity,
-        "total_occupied_beds": occupied_beds,
-        "total_rooms": total_rooms,
-        "vacant_rooms_count": len(vacant_rooms_list),
-        "occupied_rooms_count": len(occupied_rooms_list),
-        "vacant_rooms": vacant_rooms_list,
-        "occupied_rooms": occupied_rooms_list
-    }
+            "occupancy": room.active_occupancy
+        } for room in page
+    ]
+    return report
 
-@router.get("/tenant/{tenant_id}", response_model=Dict[str, Any])
-def get_tenant_report(
-    tenant_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
-):
-    tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
+PAYMENT_HISTORY_ORDER = [models.RentPayment.payment_date, models.RentPayment.id]
+MAINTENANCE_HISTORY_ORDER = [models.MaintenanceRequest.id]
+
+def get_report_tenant(db: Session, tenant_id: int) -> models.Tenant:
+    # Tenant, user and room in one joined SELECT
+    tenant = (
+        db.query(models.Tenant)
+        .options(*loaders.summary_options(loaders.TENANT_SUMMARY_RELATIONS, {"user", "room"}))
+        .filter(models.Tenant.id == tenant_id)
+        .first()
+    )
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
-        
-    # Payments
-    payments = db.query(models.RentPayment).filter(models.RentPayment.tenant_id == tenant_id).all()
-    total_paid = sum(p.amount for p in payments if p.status == models.PaymentStatus.VERIFIED.value)
-    pending_amount = sum(p.amount for p in payments if p.status == models.PaymentStatus.PENDING.value)
-    
-    # Maintenance
-    maintenance_reqs = db.query(models.MaintenanceRequest).filter(models.MaintenanceRequest.tenant_id == tenant_id).all()
-    open_requests = len([r for r in maintenance_reqs if r.status in [models.MaintenanceStatus.OPEN.value, models.MaintenanceStatus.IN_PROGRESS.value]])
-    resolved_requests = len([r for r in maintenance_reqs if r.status in [models.MaintenanceStatus.RESOLVED.value, models.MaintenanceStatus.CLOSED.value]])
-    
+    return tenant
+
+def tenant_report(db: Session, tenant_id: int) -> Dict[str, Any]:
+    tenant = get_report_tenant(db, tenant_id)
+
+    payment_status = models.RentPayment.status
+    financials = db.query(
+        sum_if(payment_status == models.PaymentStatus.VERIFIED.value, models.RentPayment.amount),
+        sum_if(payment_status == models.PaymentStatus.PENDING.value, models.RentPayment.amount),
+        func.count(models.RentPayment.id),
+    ).filter(models.RentPayment.tenant_id == tenant_id).one()
+
+    maintenance_status = models.MaintenanceRequest.status
+    maintenance = db.query(
+        func.count(models.MaintenanceRequest.id),
+        sum_if(maintenance_status.in_([models.MaintenanceStatus.OPEN.value, models.MaintenanceStatus.IN_PROGRESS.value])),
+        sum_if(maintenance_status.in_([models.MaintenanceStatus.RESOLVED.value, models.MaintenanceStatus.CLOSED.value])),
+    ).filter(models.MaintenanceRequest.tenant_id == tenant_id).one()
+
     return {
         "tenant_details": {
             "full_name": tenant.full_name,
@@ -153,31 +280,80 @@ def get_tenant_report(
             "status": "Active" if tenant.is_active else "Inactive"
         },
         "financials": {
-            "total_rent_paid": total_paid,
-            "pending_dues": pending_amount,
-            "payment_history_count": len(payments)
+            "total_rent_paid": financials[0],
+            "pending_dues": financials[1],
+            "payment_history_count": financials[2]
         },
         "maintenance": {
-            "total_requests": len(maintenance_reqs),
-            "open": open_requests,
-            "resolved": resolved_requests
-        },
-        "history": {
-            "payments": [
-                {
-                    "date": p.payment_date,
-                    "amount": p.amount,
-                    "month": p.payment_month,
-                    "status": p.status
-                } for p in payments
-            ],
-            "maintenance": [
-                {
-                    "id": m.id,
-                    "date": m.request_date,
-                    "category": m.category,
-                    "status": m.status
-                } for m in maintenance_reqs
-            ]
+            "total_requests": maintenance[0],
+            "open": maintenance[1],
+            "resolved": maintenance[2]
         }
     }
+
+@router.get("/tenant/{tenant_id}", response_model=Dict[str, Any])
+def get_tenant_report(
+    request: Request,
+    response: Response,
+    tenant_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
+):
+    """
+    Tenant details with payment and maintenance summaries aggregated in SQL: three statements
+    however long the tenant's history. The history itself is paged separately, from
+    /tenant/{tenant_id}/payments and /tenant/{tenant_id}/maintenance.
+    """
+    return cached_report(request, response, "tenant", {"tenant_id": tenant_id}, TENANT_REPORT_TABLES,
+                         lambda: tenant_report(db, tenant_id))
+
+@router.get("/tenant/{tenant_id}/payments", response_model=List[Dict[str, Any]])
+def get_tenant_payment_history(
+    tenant_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
+):
+    """
+    A tenant's payments, newest first, one keyset page at a time.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    query = db.query(models.RentPayment).filter(models.RentPayment.tenant_id == tenant_id)
+    payments, next_cursor = paginate(query, PAYMENT_HISTORY_ORDER, limit=limit, cursor=cursor, descending=True)
+    set_next_cursor(response, next_cursor)
+    return [
+        {
+            "id": p.id,
+            "date": p.payment_date,
+            "amount": p.amount,
+            "month": p.payment_month,
+            "status": p.status
+        } for p in payments
+    ]
+
+@router.get("/tenant/{tenant_id}/maintenance", response_model=List[Dict[str, Any]])
+def get_tenant_maintenance_history(
+    tenant_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
+):
+    """
+    A tenant's maintenance requests, newest first, one keyset page at a time.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    query = db.query(models.MaintenanceRequest).filter(models.MaintenanceRequest.tenant_id == tenant_id)
+    requests, next_cursor = paginate(query, MAINTENANCE_HISTORY_ORDER, limit=limit, cursor=cursor, descending=True)
+    set_next_cursor(response, next_cursor)
+    return [
+        {
+            "id": m.id,
+            "date": m.request_date,
+            "category": m.category,
+            "status": m.status
+        } for m in requests
+    ]
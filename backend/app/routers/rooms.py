@@ -1,10 +1,11 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, update
 
-from backend.app import models, schemas, dependencies
+from backend.app import models, schemas, dependencies, loaders
 from backend.app.database import get_db
+from backend.app.pagination import paginate, set_next_cursor
 
 router = APIRouter(
     prefix="/api/rooms",
@@ -12,45 +13,107 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-# Helper function to calculate occupancy
+# Occupancy helpers. Room.active_occupancy is kept in step with the tenant write paths,
+# so availability checks are a column read instead of a relationship load.
 def get_room_occupancy(room: models.Room) -> int:
-    return len([t for t in room.tenants if t.is_active])
+    return room.active_occupancy
 
 def is_room_available(room: models.Room) -> bool:
-    occupancy = get_room_occupancy(room)
-    return occupancy < room.capacity
+    return room.active_occupancy < room.capacity
+
+def claim_room_slot(db: Session, room_id: int) -> bool:
+    """
+    Atomically take one bed in a room. The capacity check and the increment are a
+    single conditional UPDATE, so concurrent registrations cannot overfill a room.
+    Returns False if the room is full. Committed (or rolled back) with the caller's transaction.
+    """
+    result = db.execute(
+        update(models.Room)
+        .where(models.Room.id == room_id, models.Room.active_occupancy < models.Room.capacity)
+        .values(active_occupancy=models.Room.active_occupancy + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def release_room_slot(db: Session, room_id: int) -> None:
+    """Give back one bed in a room, in the caller's transaction."""
+    db.execute(
+        update(models.Room)
+        .where(models.Room.id == room_id, models.Room.active_occupancy > 0)
+        .values(active_occupancy=models.Room.active_occupancy - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def rebuild_room_occupancy(db: Session) -> None:
+    """
+    Recompute every room's active_occupancy from the tenants table in one correlated UPDATE.
+    """
+    active_count = (
+        select(func.count(models.Tenant.id))
+        .where(models.Tenant.room_id == models.Room.id, models.Tenant.is_active == True)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(models.Room)
+        .values(active_occupancy=active_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def query_active_rooms(db: Session, available: Optional[bool] = None, occupied: Optional[bool] = None, options=None):
+    """
+    Active rooms with availability/occupancy filters applied in SQL.
+    Tenants are batch-loaded for the response schema unless other loader `options` are given.
+    """
+    query = (
+        db.query(models.Room)
+        .filter(models.Room.is_active == True)
+        .options(*(options if options is not None else loaders.room_response_options()))
+    )
+    occupancy = models.Room.active_occupancy
+    if available is not None:
+        query = query.filter(occupancy < models.Room.capacity if available else occupancy >= models.Room.capacity)
+    if occupied is not None:
+        query = query.filter(occupancy > 0 if occupied else occupancy == 0)
+    return query.order_by(models.Room.id)
 
-@router.get("/", response_model=List[schemas.RoomResponse])
+@router.get(
+    "/",
+    response_model=Union[List[schemas.RoomResponse], List[schemas.RoomSummaryResponse]],
+    response_model_exclude_unset=True,
+)
 def read_rooms(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     available: Optional[bool] = None,
+    view: schemas.ResponseView = schemas.ResponseView.FULL,
+    include: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_user)
 ):
     """
     Retrieve all rooms with pagination and optional availability filter.
+    Pass the X-Next-Cursor response header back as `cursor` for keyset paging.
+    `view=summary` returns room columns only; `include=tenants` adds active tenants.
     """
-    query = db.query(models.Room).filter(models.Room.is_active == True)
-    
-    rooms = query.all() # Fetch all to filter by python logic for availability or use complex query
-    
-    # Filter by availability if requested
-    if available is not None:
-        filtered_rooms = []
-        for room in rooms:
-            if is_room_available(room) == available:
-                filtered_rooms.append(room)
-        rooms = filtered_rooms
-    
-    # Apply pagination manually if filtered, or use slice
-    return rooms[skip : skip + limit]
+    summary = view == schemas.ResponseView.SUMMARY or include is not None
+    relations = loaders.parse_include(include, loaders.ROOM_SUMMARY_RELATIONS)
+    options = loaders.summary_options(loaders.ROOM_SUMMARY_RELATIONS, relations) if summary else None
+
+    query = query_active_rooms(db, available=available, options=options)
+    rooms, next_cursor = paginate(query, [models.Room.id], skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    if summary:
+        return [schemas.build_summary(schemas.RoomSummaryResponse, room, relations) for room in rooms]
+    return [schemas.RoomResponse.model_validate(room) for room in rooms]
 
 @router.post("/", response_model=schemas.RoomResponse, status_code=status.HTTP_201_CREATED)
 def create_room(
     room: schemas.RoomCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_admin_user)
 ):
     """
     Create a new room. Admin only.
@@ -68,37 +131,33 @@ def create_room(
 @router.get("/available", response_model=List[schemas.RoomResponse])
 def read_available_rooms(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_user)
 ):
     """
     Retrieve all available rooms (capacity > current occupancy).
     """
-    all_rooms = db.query(models.Room).filter(models.Room.is_active == True).all()
-    available_rooms = [room for room in all_rooms if is_room_available(room)]
-    return available_rooms
+    return query_active_rooms(db, available=True).all()
 
 @router.get("/occupied", response_model=List[schemas.RoomResponse])
 def read_occupied_rooms(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_user)
 ):
     """
     Retrieve all occupied rooms (current occupancy > 0).
     """
-    all_rooms = db.query(models.Room).filter(models.Room.is_active == True).all()
-    occupied_rooms = [room for room in all_rooms if get_room_occupancy(room) > 0]
-    return occupied_rooms
+    return query_active_rooms(db, occupied=True).all()
 
 @router.get("/{room_id}", response_model=schemas.RoomResponse)
 def read_room(
     room_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_user)
 ):
     """
     Get a specific room by ID.
     """
-    room = db.query(models.Room).filter(models.Room.id == room_id).first()
+    room = db.query(models.Room).options(*loaders.room_response_options()).filter(models.Room.id == room_id).first()
     if room is None:
         raise HTTPException(status_code=404, detail="Room not found")
     return room
@@ -108,7 +167,7 @@ def update_room(
     room_id: int,
     room_update: schemas.RoomCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_admin_user)
 ):
     """
     Update a room. Admin only.
@@ -139,7 +198,7 @@ def update_room(
 def delete_room(
     room_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_admin_user)
 ):
     """
     Delete (soft delete) a room. Admin only.
@@ -1,12 +1,13 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 import secrets
 import string
 
-from backend.app import models, schemas, dependencies, auth
+from backend.app import models, schemas, dependencies, auth, loaders, principals
 from backend.app.database import get_db
-from backend.app.routers.rooms import is_room_available, get_room_occupancy
+from backend.app.pagination import paginate, set_next_cursor
+from backend.app.routers.rooms import claim_room_slot, release_room_slot
 
 router = APIRouter(
     prefix="/api/tenants",
@@ -34,13 +35,11 @@ def register_tenant(
     if db.query(models.User).filter(models.User.email == tenant.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # 2. Check room availability if room_id is provided
-    if tenant.room_id:
-        room = db.query(models.Room).filter(models.Room.id == tenant.room_id).first()
-        if not room:
+    # 2. Take a bed in the room if room_id is provided (atomic capacity check)
+    if tenant.room_id and not claim_room_slot(db, tenant.room_id):
+        if db.get(models.Room, tenant.room_id) is None:
             raise HTTPException(status_code=404, detail="Room not found")
-        if not is_room_available(room):
-            raise HTTPException(status_code=400, detail="Room is fully occupied")
+        raise HTTPException(status_code=400, detail="Room is fully occupied")
 
     # 3. Create User account
     hashed_password = auth.get_password_hash(tenant.password)
@@ -72,29 +71,50 @@ def register_tenant(
     
     return new_tenant
 
-@router.get("/", response_model=List[schemas.TenantResponse])
+@router.get(
+    "/",
+    response_model=Union[List[schemas.TenantResponse], List[schemas.TenantSummaryResponse]],
+    response_model_exclude_unset=True,
+)
 def read_tenants(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     active_only: bool = True,
+    view: schemas.ResponseView = schemas.ResponseView.FULL,
+    include: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_admin_user)
 ):
     """
     Retrieve all tenants. Admin only.
+    Pass the X-Next-Cursor response header back as `cursor` for keyset paging.
+    `view=summary` returns tenant columns only; `include` adds any of
+    user, room, payments, maintenance_requests (loaded only when requested).
     """
-    query = db.query(models.Tenant)
+    summary = view == schemas.ResponseView.SUMMARY or include is not None
+    relations = loaders.parse_include(include, loaders.TENANT_SUMMARY_RELATIONS)
+    if summary:
+        options = loaders.summary_options(loaders.TENANT_SUMMARY_RELATIONS, relations)
+    else:
+        options = loaders.tenant_response_options()
+
+    query = db.query(models.Tenant).options(*options)
     if active_only:
         query = query.filter(models.Tenant.is_active == True)
     
-    tenants = query.offset(skip).limit(limit).all()
-    return tenants
+    tenants, next_cursor = paginate(query, [models.Tenant.id], skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    if summary:
+        return [schemas.build_summary(schemas.TenantSummaryResponse, tenant, relations) for tenant in tenants]
+    return [schemas.TenantResponse.model_validate(tenant) for tenant in tenants]
 
 @router.post("/", response_model=schemas.TenantResponse, status_code=status.HTTP_201_CREATED)
 def create_tenant(
     tenant: schemas.TenantCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_admin_user)
 ):
     """
     Register a new tenant. Admin only.
@@ -104,13 +124,11 @@ def create_tenant(
     if db.query(models.User).filter(models.User.email == tenant.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # 2. Check room availability if room_id is provided
-    if tenant.room_id:
-        room = db.query(models.Room).filter(models.Room.id == tenant.room_id).first()
-        if not room:
+    # 2. Take a bed in the room if room_id is provided (atomic capacity check)
+    if tenant.room_id and not claim_room_slot(db, tenant.room_id):
+        if db.get(models.Room, tenant.room_id) is None:
             raise HTTPException(status_code=404, detail="Room not found")
-        if not is_room_available(room):
-            raise HTTPException(status_code=400, detail="Room is fully occupied")
+        raise HTTPException(status_code=400, detail="Room is fully occupied")
 
     # 3. Create User account
     generated_password = tenant.password if tenant.password else generate_random_password()
@@ -152,12 +170,17 @@ def create_tenant(
 def read_tenant(
     tenant_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_claims_user)
 ):
     """
     Get tenant details. Admin or the tenant themselves.
     """
-    tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
+    tenant = (
+        db.query(models.Tenant)
+        .options(*loaders.tenant_response_options())
+        .filter(models.Tenant.id == tenant_id)
+        .first()
+    )
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     
@@ -182,7 +205,7 @@ def update_tenant(
     # But FastAPI prefers typed schemas.
     # Given the complexity, I'll use TenantCreate but handle the email update carefully (or ignore it if it shouldn't be changed here).
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_admin_user)
 ):
     """
     Update tenant details. Admin only.
@@ -197,11 +220,14 @@ def update_tenant(
         if not room:
             raise HTTPException(status_code=404, detail="Room not found")
         
-        # Check availability only if moving into a NEW room (or if needed, checks logic)
-        # Assuming moving to a new room requires availability check
-        if not is_room_available(room):
+        # Moving an active tenant takes a bed in the new room (atomic capacity check)
+        if db_tenant.is_active and not claim_room_slot(db, tenant_update.room_id):
              raise HTTPException(status_code=400, detail="New room is fully occupied")
 
+    # Moving (or unassigning) an active tenant frees their old bed
+    if db_tenant.is_active and db_tenant.room_id is not None and tenant_update.room_id != db_tenant.room_id:
+        release_room_slot(db, db_tenant.room_id)
+
     # Update User email if changed
     if tenant_update.email != db_tenant.user.email:
         # Check if new email is taken
@@ -222,7 +248,7 @@ def update_tenant(
 def checkout_tenant(
     tenant_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(dependencies.get_current_admin_user)
+    current_user: schemas.UserPrincipal = Depends(dependencies.get_current_admin_user)
 ):
     """
     Checkout a tenant. Admin only.
@@ -239,6 +265,8 @@ def checkout_tenant(
         raise HTTPException(status_code=400, detail="Tenant is already checked out/inactive")
 
     tenant.is_active = False
+    if tenant.room_id is not None:
+        release_room_slot(db, tenant.room_id)
     if not tenant.check_out_date:
         tenant.check_out_date = date.today()
     
@@ -249,4 +277,6 @@ def checkout_tenant(
     
     db.commit()
     db.refresh(tenant)
+    # User columns didn't change, so the commit hook won't drop the cached principal; do it here
+    principals.invalidate_principal(tenant.user.email)
     return tenant
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Optional, List, ClassVar, Tuple, Iterable
+import enum
 from backend.app.models import UserRole, RoomType, PaymentStatus, MaintenancePriority, MaintenanceStatus, MaintenanceCategory
 
 # Base Schemas (common attributes)
@@ -27,13 +28,16 @@ class PaymentBase(BaseModel):
     payment_date: date
     payment_method: str = "Bank Transfer"
     transaction_id: str
-    payment_month: date
+    payment_month: date # Any day of the month being paid on input; stored as its first day
     proof_image_path: Optional[str] = None
 
 class PaymentUpdate(BaseModel):
     status: Optional[PaymentStatus] = None
     remarks: Optional[str] = None
 
+class PaymentVerification(PaymentUpdate):
+    id: int
+
 class MaintenanceUpdate(BaseModel):
     status: Optional[MaintenanceStatus] = None
     resolution_notes: Optional[str] = None
@@ -78,6 +82,7 @@ class UserResponse(UserBase):
 class RoomResponse(RoomBase):
     id: int
     is_active: bool
+    active_occupancy: int = 0
     tenants: List["TenantResponseWithoutRelations"] = [] # Forward reference
 
     class Config:
@@ -102,6 +107,9 @@ class RentPaymentResponse(PaymentBase):
     tenant_id: int
     status: PaymentStatus
     proof_image_path: Optional[str] = None
+    # Variants made by the image worker; None until processing finishes
+    proof_thumbnail_path: Optional[str] = None
+    proof_display_path: Optional[str] = None
     remarks: Optional[str] = None
 
     tenant: "TenantResponseWithoutRelations" # Nested tenant response
@@ -116,16 +124,56 @@ class MaintenanceRequestResponse(MaintenanceBase):
     request_date: datetime
     resolved_date: Optional[datetime] = None
     resolution_notes: Optional[str] = None
+    # Variants of image_path made by the image worker; None until processing finishes
+    image_thumbnail_path: Optional[str] = None
+    image_display_path: Optional[str] = None
 
     tenant: "TenantResponseWithoutRelations" # Nested tenant response
 
     class Config:
         from_attributes = True
 
+class BulkPaymentRow(BaseModel):
+    """One admin-recorded payment; the column names of the bulk CSV format."""
+    tenant_id: int
+    amount: float = Field(gt=0)
+    month: date # Month being paid: YYYY-MM or any date within it
+    method: str = "Cash"
+    txn: Optional[str] = None
+    payment_date: Optional[date] = None # Defaults to today
+
+    @field_validator("month", mode="before")
+    @classmethod
+    def parse_month(cls, value):
+        if isinstance(value, str) and len(value.strip()) == 7:
+            value = f"{value.strip()}-01"
+        return value
+
+    @field_validator("month")
+    @classmethod
+    def first_of_month(cls, value: date) -> date:
+        return value.replace(day=1)
+
+class BulkPaymentResult(BaseModel):
+    row: int # Position in the submitted list / CSV data row, from 1
+    success: bool
+    payment_id: Optional[int] = None
+    detail: Optional[str] = None # Why this row was not recorded
+
+class PaymentVerificationResult(BaseModel):
+    id: int
+    success: bool
+    status: Optional[PaymentStatus] = None # The payment's status after the batch
+    detail: Optional[str] = None # Why this item was not applied
+
 # Authentication Schemas
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -134,6 +182,14 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class UserPrincipal(BaseModel):
+    """The authenticated user as seen by route dependencies; cheap to cache, no relationships."""
+    id: int
+    email: str
+    role: str
+    is_active: bool
+    tenant_id: Optional[int] = None
+
 # Helper schemas to avoid circular dependencies and overly verbose nested responses
 class TenantResponseWithoutRelations(TenantBase):
     id: int
@@ -148,6 +204,9 @@ class PaymentResponseWithoutRelations(PaymentBase):
     tenant_id: int
     status: PaymentStatus
     proof_image_path: Optional[str] = None
+    # Variants made by the image worker; None until processing finishes
+    proof_thumbnail_path: Optional[str] = None
+    proof_display_path: Optional[str] = None
     remarks: Optional[str] = None
     class Config:
         from_attributes = True
@@ -159,9 +218,69 @@ class MaintenanceResponseWithoutRelations(MaintenanceBase):
     request_date: datetime
     resolved_date: Optional[datetime] = None
     resolution_notes: Optional[str] = None
+    # Variants of image_path made by the image worker; None until processing finishes
+    image_thumbnail_path: Optional[str] = None
+    image_display_path: Optional[str] = None
     class Config:
         from_attributes = True
 
+# Lightweight list views (?view=summary&include=...)
+# Summaries carry only columns; nested relations are serialized only when requested via `include`
+# and are read from already-loaded attributes (see build_summary).
+class ResponseView(str, enum.Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+class OccupancyRoomList(str, enum.Enum):
+    VACANT = "vacant"
+    OCCUPIED = "occupied"
+    ALL = "all"
+
+class UserSummary(UserBase):
+    id: int
+    role: UserRole
+    is_active: bool
+    class Config:
+        from_attributes = True
+
+class RoomSummary(RoomBase):
+    id: int
+    is_active: bool
+    active_occupancy: int = 0
+    class Config:
+        from_attributes = True
+
+class RoomSummaryResponse(RoomSummary):
+    relations: ClassVar[Tuple[str, ...]] = ("tenants",)
+    tenants: Optional[List[TenantResponseWithoutRelations]] = None # Active tenants only
+
+class TenantSummaryResponse(TenantResponseWithoutRelations):
+    relations: ClassVar[Tuple[str, ...]] = ("user", "room", "payments", "maintenance_requests")
+    user: Optional[UserSummary] = None
+    room: Optional[RoomSummary] = None
+    payments: Optional[List[PaymentResponseWithoutRelations]] = None
+    maintenance_requests: Optional[List[MaintenanceResponseWithoutRelations]] = None
+
+class RentPaymentSummaryResponse(PaymentResponseWithoutRelations):
+    relations: ClassVar[Tuple[str, ...]] = ("tenant",)
+    tenant: Optional[TenantResponseWithoutRelations] = None
+
+class MaintenanceSummaryResponse(MaintenanceResponseWithoutRelations):
+    relations: ClassVar[Tuple[str, ...]] = ("tenant",)
+    tenant: Optional[TenantResponseWithoutRelations] = None
+
+def build_summary(schema, obj, include: Iterable[str] = ()):
+    """
+    Validate an ORM object into a summary schema, reading its columns and only the
+    relations named in `include`, so unrequested relations are never touched.
+    """
+    data = {
+        name: getattr(obj, name)
+        for name in schema.model_fields
+        if name not in schema.relations or name in include
+    }
+    return schema.model_validate(data)
+
 # Update Forward Refs for nested models
 UserResponse.model_rebuild()
 RoomResponse.model_rebuild()
@@ -0,0 +1,247 @@
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.app import models
+from backend.app.database import conflict_insert
+
+# Daily snapshots of occupancy, revenue and open maintenance, for trend reports over any range.
+# A scheduled in-process job upserts today's row from the live tables (so the last run of a day
+# leaves its end-of-day figures); history is backfilled by replaying check-ins/check-outs,
+# verified payments and maintenance openings/resolutions as one date-ordered event stream.
+# Capacity has no history: backfilled days use the current active rooms.
+# Figures are per property and per floor; rooms without a floor count in the property only.
+
+BATCH_SIZE = 1000
+OPEN_MAINTENANCE = [models.MaintenanceStatus.OPEN.value, models.MaintenanceStatus.IN_PROGRESS.value]
+RESOLVED_MAINTENANCE = [models.MaintenanceStatus.RESOLVED.value, models.MaintenanceStatus.CLOSED.value]
+
+logger = logging.getLogger(__name__)
+
+# floor -> [occupied_beds, capacity, verified_revenue, open_maintenance]; None is "no floor"
+Figures = Dict[Optional[int], List]
+
+
+def _new_figures() -> Figures:
+    return defaultdict(lambda: [0, 0, 0.0, 0])
+
+
+def _capacity_by_floor(db: Session) -> Dict[Optional[int], int]:
+    rows = (
+        db.query(models.Room.floor, func.coalesce(func.sum(models.Room.capacity), 0))
+        .filter(models.Room.is_active == True)
+        .group_by(models.Room.floor)
+    )
+    return {floor: capacity for floor, capacity in rows}
+
+
+def _snapshot_rows(day: date, figures: Figures) -> Tuple[dict, List[dict]]:
+    property_row = {"day": day, "occupied_beds": 0, "capacity": 0, "verified_revenue": 0.0, "open_maintenance": 0}
+    floor_rows = []
+    for floor, (beds, capacity, revenue, maintenance) in figures.items():
+        property_row["occupied_beds"] += beds
+        property_row["capacity"] += capacity
+        property_row["verified_revenue"] += revenue
+        property_row["open_maintenance"] += maintenance
+        if floor is not None:
+            floor_rows.append({"day": day, "floor": floor, "occupied_beds": beds, "capacity": capacity,
+                               "verified_revenue": revenue, "open_maintenance": maintenance})
+    return property_row, floor_rows
+
+
+def _upsert(db: Session, model, index_elements: List[str], rows: List[dict]) -> None:
+    if not rows:
+        return
+    insert = conflict_insert(db, model)
+    columns = ["occupied_beds", "capacity", "verified_revenue", "open_maintenance"]
+    db.execute(
+        insert.on_conflict_do_update(
+            index_elements=index_elements, set_={c: getattr(insert.excluded, c) for c in columns}
+        ),
+        rows,
+    )
+
+
+def _save(db: Session, property_rows: List[dict], floor_rows: List[dict]) -> None:
+    _upsert(db, models.DailySnapshot, ["day"], property_rows)
+    _upsert(db, models.DailyFloorSnapshot, ["day", "floor"], floor_rows)
+
+
+def live_figures(db: Session) -> Figures:
+    """Current figures by floor, from the occupancy counters and grouped payment/maintenance scans."""
+    figures = _new_figures()
+    rooms = (
+        db.query(models.Room.floor, func.sum(models.Room.active_occupancy), func.sum(models.Room.capacity))
+        .filter(models.Room.is_active == True)
+        .group_by(models.Room.floor)
+    )
+    for floor, beds, capacity in rooms:
+        figures[floor][0] += beds or 0
+        figures[floor][1] += capacity or 0
+    revenue = (
+        db.query(models.Room.floor, func.sum(models.RentPayment.amount))
+        .select_from(models.RentPayment)
+        .outerjoin(models.Tenant, models.RentPayment.tenant_id == models.Tenant.id)
+        .outerjoin(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(models.RentPayment.status == models.PaymentStatus.VERIFIED.value)
+        .group_by(models.Room.floor)
+    )
+    for floor, amount in revenue:
+        figures[floor][2] += amount or 0.0
+    maintenance = (
+        db.query(models.Room.floor, func.count(models.MaintenanceRequest.id))
+        .select_from(models.MaintenanceRequest)
+        .outerjoin(models.Tenant, models.MaintenanceRequest.tenant_id == models.Tenant.id)
+        .outerjoin(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(models.MaintenanceRequest.status.in_(OPEN_MAINTENANCE))
+        .group_by(models.Room.floor)
+    )
+    for floor, count in maintenance:
+        figures[floor][3] += count
+    return figures
+
+
+def record_snapshot(db: Session, day: Optional[date] = None) -> None:
+    """Upsert the snapshot for day (default today) from the live tables."""
+    property_row, floor_rows = _snapshot_rows(day or date.today(), live_figures(db))
+    _save(db, [property_row], floor_rows)
+    db.commit()
+
+
+def _events(db: Session) -> Iterator[Tuple[date, Optional[int], int, float, int]]:
+    """
+    (day, floor, beds delta, revenue delta, open maintenance delta) for the whole history,
+    in date order: each source is read sorted by its date column, streamed and merged.
+    """
+    def stream(query, delta):
+        # Rows are (date or datetime, floor[, amount])
+        for row in query.yield_per(BATCH_SIZE):
+            day = row[0].date() if isinstance(row[0], datetime) else row[0]
+            yield (day, row[1], *delta(row))
+
+    check_ins = (
+        db.query(models.Tenant.check_in_date, models.Room.floor)
+        .join(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(models.Tenant.check_in_date.isnot(None))
+        .order_by(models.Tenant.check_in_date)
+    )
+    check_outs = (
+        db.query(models.Tenant.check_out_date, models.Room.floor)
+        .join(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(models.Tenant.check_in_date.isnot(None), models.Tenant.check_out_date.isnot(None))
+        .order_by(models.Tenant.check_out_date)
+    )
+    payments = (
+        db.query(models.RentPayment.payment_date, models.Room.floor, models.RentPayment.amount)
+        .outerjoin(models.Tenant, models.RentPayment.tenant_id == models.Tenant.id)
+        .outerjoin(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(models.RentPayment.status == models.PaymentStatus.VERIFIED.value,
+                models.RentPayment.payment_date.isnot(None))
+        .order_by(models.RentPayment.payment_date)
+    )
+    maintenance = lambda date_column: (
+        db.query(date_column, models.Room.floor)
+        .select_from(models.MaintenanceRequest)
+        .outerjoin(models.Tenant, models.MaintenanceRequest.tenant_id == models.Tenant.id)
+        .outerjoin(models.Room, models.Tenant.room_id == models.Room.id)
+        .filter(date_column.isnot(None))
+        .order_by(date_column)
+    )
+    openings = maintenance(models.MaintenanceRequest.request_date)
+    resolutions = maintenance(models.MaintenanceRequest.resolved_date).filter(
+        models.MaintenanceRequest.status.in_(RESOLVED_MAINTENANCE)
+    )
+
+    return heapq.merge(
+        stream(check_ins, lambda _: (1, 0.0, 0)),
+        stream(check_outs, lambda _: (-1, 0.0, 0)),
+        stream(payments, lambda row: (0, row[2] or 0.0, 0)),
+        stream(openings, lambda _: (0, 0.0, 1)),
+        stream(resolutions, lambda _: (0, 0.0, -1)),
+        key=lambda event: event[0],
+    )
+
+
+def backfill_snapshots(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """
+    Rebuild the snapshots for start..end (default: from the first recorded event to today) in one
+    pass over the merged event stream, upserting a batch of days at a time. Returns days written.
+    """
+    end = end or date.today()
+    figures = _new_figures()
+    for floor, capacity in _capacity_by_floor(db).items():
+        figures[floor][1] = capacity
+
+    property_rows, floor_rows = [], []
+    day = None
+    written = 0
+
+    def emit_until(until: date):
+        # Write every day from `day` up to (not including) `until`, within start..end
+        nonlocal day, written
+        while day < until and day <= end:
+            if start is None or day >= start:
+                property_row, rows = _snapshot_rows(day, figures)
+                property_rows.append(property_row)
+                floor_rows.extend(rows)
+                written += 1
+                if len(property_rows) >= BATCH_SIZE:
+                    _save(db, property_rows, floor_rows)
+                    property_rows.clear()
+                    floor_rows.clear()
+            day += timedelta(days=1)
+
+    for event_day, floor, beds, revenue, maintenance in _events(db):
+        if event_day > end:
+            break
+        if day is None:
+            day = min(event_day, start) if start else event_day
+        emit_until(event_day)
+        figures[floor][0] += beds
+        figures[floor][2] += revenue
+        figures[floor][3] += maintenance
+    if day is None:
+        day = start or end
+    emit_until(end + timedelta(days=1))
+    _save(db, property_rows, floor_rows)
+    db.commit()
+    return written
+
+
+class SnapshotScheduler:
+    """Records today's snapshot every `interval` seconds on a daemon thread, until stopped."""
+
+    def __init__(self, bind, interval: float):
+        self.bind = bind
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        # Once at startup, then every interval until stopped
+        while True:
+            try:
+                db = sessionmaker(bind=self.bind)()
+                try:
+                    record_snapshot(db)
+                finally:
+                    db.close()
+            except Exception:
+                logger.exception("Daily snapshot failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="snapshot-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,146 @@
+import io
+import os
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from backend.app.config import settings
+
+# Blob storage for uploads. Keys are the relative paths stored in the database and returned
+# to clients (e.g. "uploads/3f/a9/3fa9...e1.jpg"); content_key() builds them from the file's
+# SHA-256, so identical content always lands on the same key and is stored once. The two
+# hex-pair fan-out levels keep every directory (or S3 prefix) small: 65,536 leaf directories.
+
+
+def content_key(namespace: str, sha256: str, extension: str) -> str:
+    return f"{namespace}/{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+
+class LocalStorage:
+    """Files on the local filesystem, under root."""
+
+    def __init__(self, root: str = ""):
+        self.root = root
+
+    def local_path(self, key: str) -> Optional[str]:
+        return os.path.join(self.root, key) if self.root else key
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.local_path(key))
+
+    def put_file(self, key: str, source_path: str):
+        """Move source_path into place (atomic rename; keep the source on the same filesystem)."""
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def put_bytes(self, key: str, data: bytes):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.local_path(key), "rb")
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_files(self, prefix: str) -> Iterator[Tuple[str, int, float]]:
+        """(key, size, modified timestamp) of every file under prefix, streamed directory by directory."""
+        pending = [prefix.rstrip("/")]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = os.scandir(self.local_path(directory))
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    key = f"{directory}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(key)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat_result = entry.stat(follow_symlinks=False)
+                        yield key, stat_result.st_size, stat_result.st_mtime
+
+
+class S3Storage:
+    """
+    Objects in an S3-compatible bucket (AWS, MinIO, ...). `client` is any object with the
+    boto3 S3 client methods used here; by default one is built with boto3 from the settings.
+    """
+
+    def __init__(self, bucket: str, client=None, endpoint_url: Optional[str] = None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("STORAGE_BACKEND=s3 requires the 'boto3' package")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.client = client
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def put_file(self, key: str, source_path: str):
+        with open(source_path, "rb") as f:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=f)
+        os.remove(source_path)
+
+    def put_bytes(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def open(self, key: str) -> BinaryIO:
+        body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        return io.BytesIO(body.read())
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def iter_files(self, prefix: str) -> Iterator[Tuple[str, int, float]]:
+        """(key, size, modified timestamp) of every object under prefix, one listing page at a time."""
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        while True:
+            page = self.client.list_objects_v2(**kwargs)
+            for item in page.get("Contents", []):
+                yield item["Key"], item["Size"], item["LastModified"].timestamp()
+            if not page.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = page["NextContinuationToken"]
+
+
+def _is_not_found(error: Exception) -> bool:
+    # botocore's ClientError carries the HTTP status; anything else is a real failure
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code")) in ("404", "NoSuchKey", "NotFound")
+
+
+def create_storage():
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(settings.S3_BUCKET, endpoint_url=settings.S3_ENDPOINT_URL)
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage()
+    raise ValueError(f"Unsupported STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+storage = create_storage()
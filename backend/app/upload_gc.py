@@ -0,0 +1,128 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.app import models
+from backend.app.storage import LocalStorage, storage
+from backend.app.uploads import STAGING_DIR
+
+# Garbage collection of uploads that no record points at: a proof uploaded for a payment that
+# was then rejected ("Payment for this month already exists"), an abandoned maintenance form,
+# staging files left by interrupted uploads. The referenced paths are loaded into a set in
+# batches, the upload tree is streamed against it, and candidates older than the grace period
+# are re-checked against the database batch by batch right before they are deleted.
+
+UPLOADS_PREFIX = "uploads"
+BATCH_SIZE = 1000
+DEFAULT_GRACE_PERIOD = timedelta(hours=24)
+
+REFERENCE_COLUMNS = (models.RentPayment.proof_image_path, models.MaintenanceRequest.image_path)
+
+
+def referenced_paths(db: Session) -> Set[str]:
+    """Every stored path a record uses: proof/request images and the variants derived from them."""
+    referenced = set()
+    for column in REFERENCE_COLUMNS:
+        query = db.query(column).filter(column.isnot(None)).yield_per(BATCH_SIZE)
+        referenced.update(path for (path,) in query)
+    variants = db.query(
+        models.UploadedFile.path, models.UploadedFile.thumbnail_path, models.UploadedFile.display_path
+    ).yield_per(BATCH_SIZE)
+    for path, thumbnail_path, display_path in variants:
+        if path in referenced:
+            referenced.update(p for p in (thumbnail_path, display_path) if p)
+    return referenced
+
+
+def storage_for(key: str):
+    # Staging always lives on the local disk, whatever the storage backend
+    return LocalStorage() if key.startswith(STAGING_DIR + "/") else storage
+
+
+def _still_unreferenced(db: Session, keys: List[str], cutoff: datetime) -> List[str]:
+    """The keys in this batch that are still orphaned now, resolving variants to their originals."""
+    candidates = set(keys)
+    original_of = {}
+    rows = db.query(
+        models.UploadedFile.path, models.UploadedFile.thumbnail_path, models.UploadedFile.display_path
+    ).filter(or_(
+        models.UploadedFile.path.in_(keys),
+        models.UploadedFile.thumbnail_path.in_(keys),
+        models.UploadedFile.display_path.in_(keys),
+    ))
+    for row in rows:
+        for key in row:
+            if key in candidates:
+                original_of[key] = row.path
+    # Files without an uploaded_files row (stored before dedup, staging) are their own original
+    originals = {original_of.get(key, key) for key in keys}
+
+    keep = {
+        path for (path,) in db.query(models.UploadedFile.path).filter(
+            models.UploadedFile.path.in_(originals), models.UploadedFile.last_uploaded_at > cutoff
+        )
+    }
+    for column in REFERENCE_COLUMNS:
+        keep.update(path for (path,) in db.query(column).filter(column.in_(originals)))
+    return [key for key in keys if original_of.get(key, key) not in keep]
+
+
+def _delete(db: Session, batch: List[Tuple[str, int]], cutoff: datetime, dry_run: bool,
+            on_orphan: Optional[Callable[[str, int], None]]) -> Tuple[int, int]:
+    sizes = dict(batch)
+    orphans = _still_unreferenced(db, list(sizes), cutoff)
+    for key in orphans:
+        if on_orphan:
+            on_orphan(key, sizes[key])
+        if not dry_run:
+            storage_for(key).delete(key)
+    if orphans and not dry_run:
+        db.query(models.UploadedFile).filter(models.UploadedFile.path.in_(orphans)).delete(synchronize_session=False)
+        db.commit()
+    return len(orphans), sum(sizes[key] for key in orphans)
+
+
+def _stored_files():
+    yield from storage.iter_files(UPLOADS_PREFIX)
+    if storage.local_path(STAGING_DIR) is None:
+        yield from LocalStorage().iter_files(STAGING_DIR)
+
+
+def collect_orphaned_uploads(
+    db: Session,
+    grace_period: timedelta = DEFAULT_GRACE_PERIOD,
+    dry_run: bool = False,
+    on_orphan: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Delete stored uploads no payment or maintenance request references, once they are older than
+    grace_period (recent uploads may still be waiting for their record). With dry_run, only report.
+    on_orphan(key, size) is called for each orphan found. Returns the scan totals.
+    """
+    started = time.time()
+    cutoff_timestamp = started - grace_period.total_seconds()
+    # uploaded_files timestamps are stored as naive UTC
+    cutoff = datetime.fromtimestamp(cutoff_timestamp, timezone.utc).replace(tzinfo=None)
+    referenced = referenced_paths(db)
+
+    report = {"scanned": 0, "scanned_bytes": 0, "orphaned": 0, "bytes_reclaimed": 0}
+    batch = []
+    for key, size, modified in _stored_files():
+        report["scanned"] += 1
+        report["scanned_bytes"] += size
+        if key in referenced or modified > cutoff_timestamp:
+            continue
+        batch.append((key, size))
+        if len(batch) == BATCH_SIZE:
+            orphaned, reclaimed = _delete(db, batch, cutoff, dry_run, on_orphan)
+            report["orphaned"] += orphaned
+            report["bytes_reclaimed"] += reclaimed
+            batch = []
+    if batch:
+        orphaned, reclaimed = _delete(db, batch, cutoff, dry_run, on_orphan)
+        report["orphaned"] += orphaned
+        report["bytes_reclaimed"] += reclaimed
+    return report
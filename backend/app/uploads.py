@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import uuid
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.app import models, image_processing
+from backend.app.config import settings
+from backend.app.database import run_db
+from backend.app.storage import storage, content_key
+
+# Shared upload service for payment proofs and maintenance images: the file type is
+# sniffed from the first bytes, and the body is copied in chunks through anyio's
+# thread-backed file API so the event loop never blocks on disk I/O. Files are stored
+# content-addressed (see storage.py): re-uploading the same image reuses the stored copy.
+# Stored content no record points at is reclaimed by the orphan collector (upload_gc.py).
+
+# Incoming bodies are staged here while being hashed; same filesystem as the local store
+STAGING_DIR = "uploads/.staging"
+
+CHUNK_SIZE = 256 * 1024
+
+# Leading bytes of each accepted image format, with the extension stored files get
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+}
+
+# Multipart framing (boundaries, part headers) on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    for signature, extension in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+def too_large_exception():
+    return HTTPException(
+        status_code=413,
+        detail=f"File exceeds the maximum size of {settings.MAX_FILE_SIZE} bytes",
+    )
+
+
+def _touch_upload(db: Session, key: str) -> int:
+    # Restarts the orphan collector's grace period for content uploaded again
+    return db.query(models.UploadedFile).filter(models.UploadedFile.path == key).update(
+        {"last_uploaded_at": func.now()}, synchronize_session=False
+    )
+
+
+def _record_upload(db: Session, key: str, sha256: str, size: int) -> Optional[int]:
+    """Record an upload of the stored content; returns the new row's id, or None if it was already known."""
+    if not _touch_upload(db, key):
+        upload = models.UploadedFile(path=key, sha256=sha256, size=size)
+        db.add(upload)
+        try:
+            db.commit()
+            return upload.id
+        except IntegrityError:
+            # A concurrent upload of the same content inserted it first
+            db.rollback()
+            _touch_upload(db, key)
+    db.commit()
+    return None
+
+
+def _forget_upload(db: Session, upload_id: int):
+    db.query(models.UploadedFile).filter(models.UploadedFile.id == upload_id).delete(synchronize_session=False)
+    db.commit()
+
+
+def _store(staging_path: str, key: str):
+    if storage.exists(key):
+        # Identical content is already stored: drop the duplicate
+        os.remove(staging_path)
+    else:
+        storage.put_file(key, staging_path)
+
+
+async def save_upload(file: UploadFile, namespace: str, db: Session) -> dict:
+    """
+    Validate an uploaded image, store it under namespace keyed by its SHA-256, record the
+    reference, and queue new content for thumbnail/display processing.
+    Raises 415 for anything that isn't a JPEG/PNG and 413 past MAX_FILE_SIZE,
+    leaving no partial file behind.
+    """
+    head = await file.read(CHUNK_SIZE)
+    extension = sniff_image_type(head)
+    if extension is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Only JPEG and PNG images are accepted",
+        )
+    # Starlette knows the spooled size up front; bail out before writing anything
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise too_large_exception()
+
+    await anyio.Path(STAGING_DIR).mkdir(parents=True, exist_ok=True)
+    staging_path = os.path.join(STAGING_DIR, uuid.uuid4().hex)
+
+    digest = hashlib.sha256()
+    written = 0
+    upload_id = None
+    try:
+        async with await anyio.open_file(staging_path, "wb") as buffer:
+            chunk = head
+            while chunk:
+                written += len(chunk)
+                if written > settings.MAX_FILE_SIZE:
+                    raise too_large_exception()
+                digest.update(chunk)
+                await buffer.write(chunk)
+                chunk = await file.read(CHUNK_SIZE)
+        sha256 = digest.hexdigest()
+        # The extension comes from the sniffed content, never from the client's filename
+        key = content_key(namespace, sha256, extension)
+        # Recorded before the stored copy is reused: from here on the orphan collector sees the
+        # content as just uploaded and keeps it, so it can't delete it under this upload
+        upload_id = await run_db(db, _record_upload, key, sha256, written)
+        await anyio.to_thread.run_sync(_store, staging_path, key)
+    except BaseException:
+        await anyio.Path(staging_path).unlink(missing_ok=True)
+        if upload_id is not None:
+            # Never stored; the next upload of this content records it again
+            await run_db(db, _forget_upload, upload_id)
+        raise
+
+    if upload_id is not None:
+        image_processing.enqueue(upload_id, db.get_bind())
+    return {"filename": os.path.basename(key), "path": key}
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects multipart bodies larger than MAX_FILE_SIZE (plus framing) with 413 while they
+    are still arriving, instead of spooling the whole body before the route sees it.
+    A declared Content-Length over the limit is refused before anything is read, a malformed
+    one with 400.
+    """
+
+    def __init__(self, app, max_body_size: Optional[int] = None):
+        self.app = app
+        self.max_body_size = max_body_size or settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                await self._send_error(send, 400, "Invalid Content-Length header")
+                return
+            if declared > self.max_body_size:
+                await self._send_too_large(send)
+                return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    # Stop reading; the app sees a disconnect and its parse error becomes our 413
+                    return {"type": "http.disconnect"}
+            return message
+
+        response_started = False
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                if not response_started:
+                    response_started = True
+                    await self._send_too_large(send)
+                return
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+            if not response_started:
+                await self._send_too_large(send)
+
+    @staticmethod
+    def _is_multipart(scope) -> bool:
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        return content_type.startswith(b"multipart/form-data")
+
+    @classmethod
+    async def _send_too_large(cls, send):
+        await cls._send_error(send, 413, too_large_exception().detail)
+
+    @staticmethod
+    async def _send_error(send, status: int, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
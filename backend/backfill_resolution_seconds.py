@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Get the directory of the current script (backend/backfill_resolution_seconds.py)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the project root directory (one level up from 'backend')
+project_root = os.path.dirname(script_dir)
+# Add the project root to the Python path
+sys.path.insert(0, project_root)
+
+from backend.app.database import SessionLocal
+from backend.app.routers.maintenance import backfill_resolution_seconds
+
+def backfill():
+    db = SessionLocal()
+    try:
+        print("Filling resolution_seconds for resolved maintenance requests...")
+        count = backfill_resolution_seconds(db)
+        print(f"Updated {count} requests.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill()
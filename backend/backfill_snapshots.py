@@ -0,0 +1,30 @@
+import sys
+import os
+import argparse
+from datetime import date
+
+# Get the directory of the current script (backend/backfill_snapshots.py)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the project root directory (one level up from 'backend')
+project_root = os.path.dirname(script_dir)
+# Add the project root to the Python path
+sys.path.insert(0, project_root)
+
+from backend.app.database import SessionLocal
+from backend.app.snapshots import backfill_snapshots
+
+def backfill(start=None, end=None):
+    db = SessionLocal()
+    try:
+        print("Rebuilding daily snapshots from tenant, payment and maintenance history...")
+        days = backfill_snapshots(db, start=start, end=end)
+        print(f"Wrote {days} daily snapshots.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the daily occupancy/revenue snapshots.")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to write (default: first recorded event)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to write (default: today)")
+    args = parser.parse_args()
+    backfill(args.start, args.end)
@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+from datetime import timedelta
+
+# Get the directory of the current script (backend/collect_orphaned_uploads.py)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the project root directory (one level up from 'backend')
+project_root = os.path.dirname(script_dir)
+# Add the project root to the Python path
+sys.path.insert(0, project_root)
+
+from backend.app.database import SessionLocal
+from backend.app.upload_gc import collect_orphaned_uploads, DEFAULT_GRACE_PERIOD
+
+def collect(grace_hours: float, dry_run: bool):
+    db = SessionLocal()
+    try:
+        print(f"Collecting uploads unreferenced for more than {grace_hours:g} hours{' (dry run)' if dry_run else ''}...")
+        report = collect_orphaned_uploads(
+            db,
+            grace_period=timedelta(hours=grace_hours),
+            dry_run=dry_run,
+            on_orphan=lambda key, size: print(f"  {'would delete' if dry_run else 'deleted'} {key} ({size} bytes)"),
+        )
+        print(f"Scanned {report['scanned']} files ({report['scanned_bytes']} bytes), "
+              f"{report['orphaned']} orphaned, {report['bytes_reclaimed']} bytes "
+              f"{'reclaimable' if dry_run else 'reclaimed'}.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete uploaded files no payment or maintenance request references.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    parser.add_argument("--grace-hours", type=float, default=DEFAULT_GRACE_PERIOD.total_seconds() / 3600,
+                        help="Keep unreferenced files younger than this (default: %(default)s)")
+    args = parser.parse_args()
+    collect(args.grace_hours, args.dry_run)
@@ -10,10 +10,13 @@ sys.path.insert(0, project_root)
 
 from backend.app.database import engine, Base
 from backend.app import models # noqa: F401 for importing models to be registered with Base
+from backend.app.migrations import upgrade_schema
 
 def create_db_tables():
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    print("Upgrading existing tables (new columns and indexes)...")
+    upgrade_schema(engine)
     print("Database tables created.")
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Get the directory of the current script (backend/rebuild_occupancy.py)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the project root directory (one level up from 'backend')
+project_root = os.path.dirname(script_dir)
+# Add the project root to the Python path
+sys.path.insert(0, project_root)
+
+from backend.app.database import SessionLocal
+from backend.app.routers.rooms import rebuild_room_occupancy
+
+def rebuild_occupancy():
+    db = SessionLocal()
+    try:
+        print("Rebuilding room occupancy counters from tenants...")
+        rebuild_room_occupancy(db)
+        print("Room occupancy counters rebuilt.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_occupancy()
@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Get the directory of the current script (backend/rebuild_revenue.py)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the project root directory (one level up from 'backend')
+project_root = os.path.dirname(script_dir)
+# Add the project root to the Python path
+sys.path.insert(0, project_root)
+
+from backend.app.database import SessionLocal
+from backend.app.revenue import rebuild_revenue_monthly
+
+def rebuild_revenue():
+    db = SessionLocal()
+    try:
+        print("Rebuilding the revenue_monthly rollup from rent_payments...")
+        rebuild_revenue_monthly(db)
+        print("Revenue rollup rebuilt.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_revenue()
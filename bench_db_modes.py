@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import subprocess
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import Base
+from backend.app.models import User, UserRole
+from backend.app.auth import create_access_token
+
+# Load test: authenticated requests/sec against a real uvicorn server with DATABASE_URL
+# on the sync driver vs the async driver (aiosqlite). GET /api/auth/me is pure auth
+# dependency + user lookup, the path that used to run blocking queries on the event loop.
+
+REQUESTS = 2000
+CONCURRENCY = 50
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+EMAIL = "bench@example.com"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_database(db_file):
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(email=EMAIL, hashed_password="x", role=UserRole.TENANT.value, is_active=True))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+async def storm(base_url, headers):
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=120, limits=limits) as client:
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        latencies = []
+
+        async def me():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/api/auth/me")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        # Warm up connections and pools before timing
+        await asyncio.gather(*[me() for _ in range(CONCURRENCY)])
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*[me() for _ in range(REQUESTS)])
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        return REQUESTS / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def run(driver):
+    db_file = os.path.join(tempfile.mkdtemp(), "bench_db_modes.db")
+    seed_database(db_file)
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"{driver}:///{db_file}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+        return asyncio.run(storm(base_url, headers))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    print(f"{REQUESTS} GET /api/auth/me, {CONCURRENCY} concurrent")
+    print(f"{'DATABASE_URL driver':<20} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for driver in ["sqlite", "sqlite+aiosqlite"]:
+        throughput, p50, p99 = run(driver)
+        print(f"{driver:<20} {throughput:>8.1f} {p50:>8.1f} {p99:>8.1f}")
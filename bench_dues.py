@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import tempfile
+from datetime import date
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import Base
+from backend.app.models import Room, Tenant, RentPayment, PaymentStatus
+from backend.app.dues import dues_report
+
+# Benchmark: property-wide dues and aging report over many tenant-months.
+# Usage: python bench_dues.py [tenants]   (default 2,000 tenants x 50 months = 100,000 tenant-months)
+
+TENANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+MONTHS = 50
+AS_OF = date(2024, 3, 15)
+REPEAT = 5
+
+
+def month(index):
+    return date(2020 + index // 12, index % 12 + 1, 1)
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Room), [
+            {"id": i + 1, "room_number": str(i + 1), "floor": 1, "room_type": "Single", "capacity": 1,
+             "monthly_rent": 5000.0}
+            for i in range(TENANTS)
+        ])
+        conn.execute(insert(Tenant), [
+            {"id": i + 1, "user_id": i + 1, "room_id": i + 1, "full_name": f"Tenant {i}", "phone": "1",
+             "emergency_contact": "2", "check_in_date": date(2020, 1, 10), "is_active": True}
+            for i in range(TENANTS)
+        ])
+        # Every tenant pays every month except a few recent ones, so the aging buckets fill
+        payments = [
+            {"tenant_id": t + 1, "amount": 5000.0, "payment_date": month(m), "payment_method": "UPI",
+             "payment_month": month(m), "status": PaymentStatus.VERIFIED.value}
+            for t in range(TENANTS) for m in range(MONTHS) if (t + m) % 7 or m < MONTHS - 6
+        ]
+        for start in range(0, len(payments), 50_000):
+            conn.execute(insert(RentPayment), payments[start:start + 50_000])
+
+
+def main():
+    db_file = os.path.join(tempfile.mkdtemp(), "bench_dues.db")
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    print(f"Seeding {TENANTS:,} tenants x {MONTHS} months...")
+    seed(engine)
+    db = sessionmaker(bind=engine)()
+
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        report = dues_report(db, as_of=AS_OF)
+        best = min(best, time.perf_counter() - start)
+
+    totals = report["totals"]
+    print(f"{totals['tenant_months']:,} tenant-months, {totals['tenants_with_dues']:,} tenants with dues, "
+          f"outstanding {totals['outstanding']:,.2f}")
+    print(f"aging: {report['aging']}")
+    print(f"dues_report: {best * 1000:.1f} ms (best of {REPEAT})")
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import subprocess
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import Base
+from backend.app.models import User, UserRole
+from backend.app.auth import get_password_hash
+
+# Load test: concurrent login throughput against a real uvicorn server for several
+# PASSWORD_HASH_WORKERS sizes, plus the worst latency of GET / while logins are in flight.
+# bcrypt releases the GIL, so throughput should scale with workers up to the core count,
+# and the probe latency should stay low because hashing no longer runs on the event loop.
+
+LOGINS = 64
+CONCURRENCY = 16
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_database(db_file):
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(email="bench@example.com", hashed_password=get_password_hash("bench123"),
+                role=UserRole.TENANT.value, is_active=True))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+async def storm(base_url):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        done = asyncio.Event()
+        probe_latencies = []
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/api/auth/login", json={"email": "bench@example.com", "password": "bench123"})
+                assert response.status_code == 200, response.text
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(LOGINS)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+        return LOGINS / elapsed, max(probe_latencies) * 1000
+
+
+def run(workers):
+    db_file = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+    seed_database(db_file)
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_file}", PASSWORD_HASH_WORKERS=str(workers))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        return asyncio.run(storm(base_url))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores})
+    print(f"{LOGINS} logins, {CONCURRENCY} concurrent, {cores} cores")
+    print(f"{'workers':>7} {'logins/s':>9} {'max GET / ms':>13}")
+    for workers in worker_counts:
+        throughput, probe_ms = run(workers)
+        print(f"{workers:>7} {throughput:>9.1f} {probe_ms:>13.1f}")
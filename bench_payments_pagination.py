@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import tempfile
+from datetime import date, timedelta
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import Base
+from backend.app.models import RentPayment, PaymentStatus
+from backend.app.pagination import paginate
+
+# Benchmark: offset vs keyset paging of rent_payments (newest first, 100 rows per page).
+# Usage: python bench_payments_pagination.py [rows]   (default 1,000,000)
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+PAGE_SIZE = 100
+TENANTS = 2000
+REPEAT = 5
+ORDER = [RentPayment.payment_date, RentPayment.id]
+
+
+def seed(engine):
+    start_day = date(2015, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(ROWS):
+            paid_on = start_day + timedelta(days=i * 3650 // ROWS)
+            batch.append({
+                "tenant_id": i % TENANTS + 1,
+                "amount": 5000.0,
+                "payment_date": paid_on,
+                "payment_method": "UPI",
+                "transaction_id": f"TXN{i}",
+                # One payment per tenant per month (rent_payments is unique on tenant_id, payment_month)
+                "payment_month": date(1980 + i // TENANTS // 12, i // TENANTS % 12 + 1, 1),
+                "status": PaymentStatus.VERIFIED.value,
+            })
+            if len(batch) == 50_000:
+                conn.execute(insert(RentPayment), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(RentPayment), batch)
+
+
+def timed(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    db_file = os.path.join(tempfile.mkdtemp(), "bench_payments.db")
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    print(f"Seeding {ROWS:,} rent_payments...")
+    seed(engine)
+    db = sessionmaker(bind=engine)()
+
+    def offset_page(page, tenant_id=None):
+        query = db.query(RentPayment)
+        if tenant_id:
+            query = query.filter(RentPayment.tenant_id == tenant_id)
+        return paginate(query, ORDER, skip=(page - 1) * PAGE_SIZE, limit=PAGE_SIZE, descending=True)
+
+    def cursor_for(page, tenant_id=None):
+        # Cursor a client would hold after reading page-1 pages: the key of the last row before `page`
+        if page == 1:
+            return None
+        _, cursor = offset_page(page - 1, tenant_id)
+        return cursor
+
+    def keyset_page(cursor, tenant_id=None):
+        query = db.query(RentPayment)
+        if tenant_id:
+            query = query.filter(RentPayment.tenant_id == tenant_id)
+        return paginate(query, ORDER, limit=PAGE_SIZE, cursor=cursor, descending=True)
+
+    print(f"{'query':<34} {'page':>5} {'offset ms':>10} {'cursor ms':>10}")
+    pages = [1, 10, 100, 1000]
+    for page in pages:
+        if (page - 1) * PAGE_SIZE >= ROWS:
+            continue
+        cursor = cursor_for(page)
+        offset_ms, (offset_rows, _) = timed(lambda: offset_page(page))
+        keyset_ms, (keyset_rows, _) = timed(lambda: keyset_page(cursor))
+        assert [r.id for r in offset_rows] == [r.id for r in keyset_rows]
+        print(f"{'all payments':<34} {page:>5} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+    tenant_pages = ROWS // TENANTS // PAGE_SIZE
+    for page in [1, max(tenant_pages, 1)]:
+        cursor = cursor_for(page, tenant_id=7)
+        offset_ms, _ = timed(lambda: offset_page(page, tenant_id=7))
+        keyset_ms, _ = timed(lambda: keyset_page(cursor, tenant_id=7))
+        print(f"{'one tenant (tenant_id=7)':<34} {page:>5} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import tempfile
+from datetime import date
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from backend.app.main import app
+from backend.app.database import Base, get_db
+from backend.app.models import User, UserRole, RoomType, Room, Tenant
+from backend.app.auth import create_access_token
+from backend.app.routers.rooms import rebuild_room_occupancy
+
+# Benchmark: SQL statements and latency per room listing as the number of rooms grows.
+# Before pushing availability/pagination into SQL this grew with one lazy load per room.
+
+ROOM_COUNTS = [10, 100, 1000, 5000]
+ENDPOINTS = ["/api/rooms/?limit=50", "/api/rooms/?available=true&limit=50", "/api/rooms/available", "/api/rooms/occupied"]
+
+
+def seed(session_factory, room_count):
+    db = session_factory()
+    db.add(User(email="admin@example.com", hashed_password="x", role=UserRole.ADMIN.value, is_active=True))
+    rooms = [
+        Room(room_number=str(i), floor=i % 10, room_type=RoomType.DOUBLE.value, capacity=2, monthly_rent=500.0)
+        for i in range(room_count)
+    ]
+    db.add_all(rooms)
+    db.flush()
+    users = [
+        User(email=f"t{i}@example.com", hashed_password="x", role=UserRole.TENANT.value, is_active=True)
+        for i in range(room_count)
+    ]
+    db.add_all(users)
+    db.flush()
+    # Every other room has one of its two beds taken, the rest are empty
+    tenants = []
+    for i, room in enumerate(rooms):
+        if i % 2 == 0:
+            tenants.append(Tenant(user_id=users[i].id, room_id=room.id, full_name=f"T{i}", phone="1",
+                                  emergency_contact="2", check_in_date=date.today(), is_active=True))
+    db.add_all(tenants)
+    db.commit()
+    rebuild_room_occupancy(db)
+    db.close()
+
+
+def run(room_count):
+    db_file = os.path.join(tempfile.mkdtemp(), "bench_rooms.db")
+    engine = create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(session_factory, room_count)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    results = []
+    for endpoint in ENDPOINTS:
+        statements.clear()
+        start = time.perf_counter()
+        response = client.get(endpoint, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert response.status_code == 200, response.text
+        results.append((endpoint, len(statements), elapsed))
+    engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    # Unpaginated endpoints (/available, /occupied) add one selectin batch per 500 rooms.
+    print(f"{'rooms':>6}  {'endpoint':<38} {'queries':>7} {'ms':>9}")
+    for room_count in ROOM_COUNTS:
+        for endpoint, queries, elapsed in run(room_count):
+            print(f"{room_count:>6}  {endpoint:<38} {queries:>7} {elapsed:>9.1f}")
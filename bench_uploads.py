@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import subprocess
+import multiprocessing
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import Base
+from backend.app.models import User, UserRole
+from backend.app.auth import create_principal_token
+from backend.app.schemas import UserPrincipal
+
+# Load test: 100 concurrent 5 MB payment-proof uploads against a real uvicorn server,
+# while a probe measures GET / latency. With chunked, thread-backed writes the probe
+# should stay in the low milliseconds; blocking copies on the event loop show up as
+# probe stalls of hundreds of milliseconds.
+
+UPLOADS = 100
+UPLOAD_SIZE = 5 * 1000 * 1000
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_database(db_file):
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", hashed_password="x", role=UserRole.TENANT.value, is_active=True)
+    db.add(user)
+    db.commit()
+    principal = UserPrincipal(id=user.id, email=user.email, role=user.role, is_active=True)
+    db.close()
+    engine.dispose()
+    return principal
+
+
+def probe(base_url, done, results):
+    # Separate process, so the uploading client's own CPU work doesn't skew the measurement
+    latencies = []
+    with httpx.Client(base_url=base_url) as client:
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/")
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+    results.put(latencies)
+
+
+async def storm(base_url, headers):
+    payload = b"\xff\xd8\xff\xe0" + os.urandom(UPLOAD_SIZE - 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=httpx.Limits(max_connections=UPLOADS)) as client:
+        async def upload():
+            response = await client.post("/api/payments/upload-proof", headers=headers,
+                                         files={"file": ("proof.jpg", payload, "image/jpeg")})
+            assert response.status_code == 200, response.text
+
+        done, results = multiprocessing.Event(), multiprocessing.Queue()
+        prober = multiprocessing.Process(target=probe, args=(base_url, done, results))
+        prober.start()
+        start = time.perf_counter()
+        await asyncio.gather(*[upload() for _ in range(UPLOADS)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        probe_latencies = sorted(results.get())
+        prober.join()
+        return (elapsed, UPLOADS * UPLOAD_SIZE / elapsed / 1e6,
+                probe_latencies[len(probe_latencies) // 2] * 1000, probe_latencies[-1] * 1000)
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    db_file = os.path.join(workdir, "bench_uploads.db")
+    principal = seed_database(db_file)
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_file}")
+    # Run from a scratch directory so the relative uploads/ folder lands there
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning",
+         "--app-dir", PROJECT_ROOT],
+        cwd=workdir, env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        headers = {"Authorization": f"Bearer {create_principal_token(principal)}"}
+        elapsed, mb_per_s, probe_p50, probe_max = asyncio.run(storm(base_url, headers))
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"{UPLOADS} concurrent uploads of {UPLOAD_SIZE / 1e6:.0f} MB")
+    print(f"total {elapsed:.2f}s, {mb_per_s:.1f} MB/s")
+    print(f"GET / probe latency: p50 {probe_p50:.1f} ms, max {probe_max:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 def render_financial_dashboard(api_client):
     st.subheader("Financial Overview")
@@ -10,40 +10,31 @@ def render_financial_dashboard(api_client):
     # Fetch Data
     try:
         with st.spinner("Loading financial data..."):
-            payments_data = api_client.get("payments/?limit=1000") 
-            rooms_data = api_client.get("rooms/?limit=1000")
-            tenants_data = api_client.get("tenants/?active_only=true&limit=1000")
+            # Totals and the monthly trend come pre-aggregated; only pending payments are listed
+            revenue_report = api_client.get("reports/revenue")
+            payments_data = api_client.get("payments/", params={"status": "Pending", "include": "tenant", "limit": 1000})
+            occupancy_report = api_client.get("reports/occupancy")
+            trends_report = api_client.get("reports/trends", params={"start_date": (date.today() - timedelta(days=89)).isoformat()})
+            tenants_data = api_client.get("tenants/?active_only=true&limit=1000&view=summary")
+            dues_report = api_client.get("reports/dues", params={"only_outstanding": True})
     except Exception as e:
         st.error(f"Error fetching data: {e}")
         return
 
     if not payments_data:
         payments_data = []
-    if not rooms_data:
-        rooms_data = []
     if not tenants_data:
         tenants_data = []
 
     # Convert to DataFrames
     df_payments = pd.DataFrame(payments_data)
-    df_rooms = pd.DataFrame(rooms_data)
     df_tenants = pd.DataFrame(tenants_data)
 
     # --- Metrics ---
     
     # 1. Total Revenue (Verified Payments)
-    total_revenue = 0.0
-    pending_amount = 0.0
-    
-    if not df_payments.empty:
-        # Ensure correct types
-        df_payments['amount'] = pd.to_numeric(df_payments['amount'], errors='coerce').fillna(0)
-        
-        verified_payments = df_payments[df_payments['status'] == 'Verified']
-        total_revenue = verified_payments['amount'].sum()
-        
-        pending_payments = df_payments[df_payments['status'] == 'Pending']
-        pending_amount = pending_payments['amount'].sum()
+    total_revenue = (revenue_report or {}).get('total_revenue', 0.0)
+    pending_amount = (revenue_report or {}).get('pending_revenue', 0.0)
 
     # 2. Deposit Summary (Active Tenants)
     total_deposit = 0.0
@@ -51,20 +42,10 @@ def render_financial_dashboard(api_client):
         df_tenants['deposit_amount'] = pd.to_numeric(df_tenants['deposit_amount'], errors='coerce').fillna(0)
         total_deposit = df_tenants['deposit_amount'].sum()
 
-    # 3. Occupancy Rate
-    total_capacity = 0
-    total_occupied = 0
-    occupancy_rate = 0.0
-    
-    if not df_rooms.empty:
-        df_rooms['capacity'] = pd.to_numeric(df_rooms['capacity'], errors='coerce').fillna(0)
-        total_capacity = df_rooms['capacity'].sum()
-        
-    if not df_tenants.empty:
-        total_occupied = len(df_tenants) # Assuming 1 tenant = 1 bed/capacity unit
-        
-    if total_capacity > 0:
-        occupancy_rate = (total_occupied / total_capacity) * 100
+    # 3. Occupancy Rate (beds, from the occupancy report totals)
+    total_capacity = (occupancy_report or {}).get('total_capacity', 0)
+    total_occupied = (occupancy_report or {}).get('total_occupied_beds', 0)
+    occupancy_rate = (occupancy_report or {}).get('occupancy_rate', 0.0)
 
     # Display Metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -80,20 +61,13 @@ def render_financial_dashboard(api_client):
 
     with c1:
         st.write("#### Revenue Trend (Monthly)")
-        if not df_payments.empty and 'payment_month' in df_payments.columns:
-            # Group by month
-            df_verified = df_payments[df_payments['status'] == 'Verified'].copy()
-            if not df_verified.empty:
-                df_verified['payment_month'] = pd.to_datetime(df_verified['payment_month'])
-                df_verified['Month'] = df_verified['payment_month'].dt.strftime('%Y-%m')
-                monthly_revenue = df_verified.groupby('Month')['amount'].sum().reset_index()
-                
-                fig_rev = px.bar(monthly_revenue, x='Month', y='amount', title="Monthly Revenue", labels={'amount': 'Revenue ($)'})
-                st.plotly_chart(fig_rev, use_container_width=True)
-            else:
-                st.info("No verified payments to show revenue trend.")
+        monthly_breakdown = (revenue_report or {}).get('monthly_breakdown', [])
+        if monthly_breakdown:
+            monthly_revenue = pd.DataFrame(monthly_breakdown).rename(columns={'month': 'Month', 'revenue': 'amount'})
+            fig_rev = px.bar(monthly_revenue, x='Month', y='amount', title="Monthly Revenue", labels={'amount': 'Revenue ($)'})
+            st.plotly_chart(fig_rev, use_container_width=True)
         else:
-            st.info("No payment data available.")
+            st.info("No verified payments to show revenue trend.")
 
     with c2:
         st.write("#### Occupancy Status")
@@ -104,13 +78,29 @@ def render_financial_dashboard(api_client):
             fig_occ = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.3)])
             fig_occ.update_layout(title_text="Overall Occupancy")
             st.plotly_chart(fig_occ, use_container_width=True)
+
+            by_floor = pd.DataFrame(occupancy_report.get('by_floor', []))
+            if not by_floor.empty:
+                st.dataframe(by_floor[['floor', 'total_rooms', 'total_capacity', 'total_occupied_beds', 'occupancy_rate']],
+                             use_container_width=True, hide_index=True)
         else:
             st.info("No room capacity data defined.")
 
+    # --- Trends (daily snapshots) ---
+    st.write("#### Occupancy & Open Maintenance (Last 90 Days)")
+    trend_days = (trends_report or {}).get('days', [])
+    if trend_days:
+        df_trends = pd.DataFrame(trend_days)
+        fig_trend = px.line(df_trends, x='day', y=['occupancy_rate', 'open_maintenance'],
+                            labels={'day': 'Day', 'value': 'Value', 'variable': 'Metric'})
+        st.plotly_chart(fig_trend, use_container_width=True)
+    else:
+        st.info("No daily snapshots recorded yet.")
+
     # --- Pending Payments Table ---
     st.write("#### Pending Payments")
     if not df_payments.empty:
-        pending_df = df_payments[df_payments['status'] == 'Pending'].copy()
+        pending_df = df_payments.copy()
         if not pending_df.empty:
             # Enrich with Tenant Name
             if 'tenant' in pending_df.columns:
@@ -124,3 +114,19 @@ def render_financial_dashboard(api_client):
             st.success("No pending payments.")
     else:
         st.info("No payments recorded.")
+
+    # --- Outstanding Dues ---
+    st.write("#### Outstanding Dues")
+    if dues_report and dues_report.get('tenants'):
+        aging = dues_report['aging']
+        a1, a2, a3, a4 = st.columns(4)
+        a1.metric("Total Outstanding", f"${dues_report['totals']['outstanding']:,.2f}")
+        a2.metric("0-30 days", f"${aging['0-30']:,.2f}")
+        a3.metric("31-60 days", f"${aging['31-60']:,.2f}")
+        a4.metric("60+ days", f"${aging['60+']:,.2f}")
+
+        dues_df = pd.DataFrame(dues_report['tenants'])
+        display_cols = ['full_name', 'room_number', 'outstanding', 'pending', 'oldest_unpaid_month']
+        st.dataframe(dues_df.sort_values('outstanding', ascending=False)[display_cols], use_container_width=True, hide_index=True)
+    else:
+        st.success("No outstanding dues.")
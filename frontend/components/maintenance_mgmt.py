@@ -6,7 +6,7 @@ def render_maintenance_mgmt(api_client):
 
     # Fetch all requests
     try:
-        requests_data = api_client.get("maintenance/")
+        requests_data = api_client.get("maintenance/", params={"include": "tenant"})
         if not requests_data:
             st.info("No maintenance requests found.")
             return
@@ -82,9 +82,14 @@ def render_maintenance_mgmt(api_client):
                     st.write(f"**Description:** {req['description']}")
                     
                     if req.get('image_path'):
-                        root_url = api_client.base_url.replace("/api", "")
+                        # Thumbnail by default (falls back to the original while it's still being processed).
+                        # Missing values are NaN in the dataframe row, hence the isinstance checks.
+                        thumb_path = req.get('image_thumbnail_path')
+                        display_path = req.get('image_display_path')
                         try:
-                            st.image(f"{root_url}/{req['image_path']}", caption="Request Image", width=300)
+                            st.image(api_client.get_file(thumb_path if isinstance(thumb_path, str) else req['image_path']), caption="Request Image", width=300)
+                            if st.checkbox("Show full image", key=f"full_image_{req['id']}"):
+                                st.image(api_client.get_file(display_path if isinstance(display_path, str) else req['image_path']), use_container_width=True)
                         except:
                             st.error("Could not load image.")
                     
@@ -51,7 +51,7 @@ def render_maintenance_request(api_client, user):
     with tab2:
         # List requests
         try:
-            reqs = api_client.get("maintenance/")
+            reqs = api_client.get("maintenance/", params={"view": "summary"})
             if reqs:
                 df = pd.DataFrame(reqs)
                 # Ensure columns exist
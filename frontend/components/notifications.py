@@ -16,7 +16,7 @@ def render_notifications(api_client, user):
     month_display = this_month.strftime('%B %Y')
     
     try:
-        payments = api_client.get("payments/")
+        payments = api_client.get("payments/", params={"view": "summary"})
         paid = False
         status = "Unpaid"
         if payments:
@@ -33,15 +33,30 @@ def render_notifications(api_client, user):
             st.warning(f"⚠️ Rent for {month_display} is Pending/Unpaid!")
             if st.button("Pay Now"):
                 st.info("Go to 'Pay Rent' tab to submit payment.")
-            
+
     except Exception as e:
         st.error(f"Error checking rent status: {e}")
 
+    # Outstanding balance across all months since check-in
+    try:
+        dues = api_client.get("reports/dues")
+        if dues and dues.get('tenants'):
+            balance = dues['tenants'][0]
+            if balance['outstanding'] > 0:
+                st.error(f"💰 Outstanding rent: ${balance['outstanding']:,.2f} (oldest unpaid: {balance['oldest_unpaid_month']})")
+                overdue = balance['aging']['31-60'] + balance['aging']['60+']
+                if overdue > 0:
+                    st.caption(f"${overdue:,.2f} is more than 30 days overdue.")
+            else:
+                st.caption("No outstanding rent.")
+    except Exception as e:
+        st.error(f"Error checking outstanding rent: {e}")
+
     st.divider()
     st.subheader("Recent Updates")
     # 2. Maintenance Updates
     try:
-        reqs = api_client.get("maintenance/")
+        reqs = api_client.get("maintenance/", params={"view": "summary"})
         if reqs:
             active_reqs = [r for r in reqs if r['status'] in ['In Progress', 'Resolved', 'Closed']]
             if active_reqs:
@@ -75,7 +75,7 @@ def render_payment_submission(api_client, user):
         st.subheader("History")
         try:
             # Fetch my payments. The endpoint "payments/" filters by current user if tenant.
-            payments = api_client.get("payments/")
+            payments = api_client.get("payments/", params={"view": "summary"})
             if payments:
                 df = pd.DataFrame(payments)
                 display_cols = ['payment_month', 'amount', 'status', 'payment_date', 'transaction_id']
@@ -5,15 +5,46 @@ import os
 def render_rent_collection(api_client):
     st.subheader("Rent Collection & Payments")
 
-    tab1, tab2 = st.tabs(["Pending Verifications", "Payment History"])
+    tab1, tab2, tab3 = st.tabs(["Pending Verifications", "Payment History", "Bulk Cash Entry"])
 
     with tab1:
         st.write("### Pending Payments")
         try:
             # Fetch pending payments
-            pending_payments = api_client.get("payments/", params={"status": "Pending"})
+            pending_payments = api_client.get("payments/", params={"status": "Pending", "include": "tenant"})
             
             if pending_payments:
+                # Bulk review: one request verifies every selected payment
+                with st.form(key="verify_selected_form"):
+                    labels = {
+                        p['id']: f"#{p['id']} - ${p['amount']} for {p['payment_month']} ({p.get('tenant', {}).get('full_name', 'Unknown')})"
+                        for p in pending_payments
+                    }
+                    selected_ids = st.multiselect("Select payments", options=list(labels), format_func=labels.get)
+                    bulk_remarks = st.text_input("Remarks for selected (Optional)")
+                    col_approve_all, col_reject_all = st.columns(2)
+                    with col_approve_all:
+                        approve_all_btn = st.form_submit_button("Approve All Selected", type="primary", use_container_width=True)
+                    with col_reject_all:
+                        reject_all_btn = st.form_submit_button("Reject All Selected", use_container_width=True)
+
+                    if approve_all_btn or reject_all_btn:
+                        if not selected_ids:
+                            st.warning("Select at least one payment.")
+                        else:
+                            new_status = "Verified" if approve_all_btn else "Rejected"
+                            data = [{"id": payment_id, "status": new_status, "remarks": bulk_remarks} for payment_id in selected_ids]
+                            try:
+                                results = api_client.put("payments/verify-batch", data)
+                                failed = [r for r in results if not r['success']]
+                                for r in failed:
+                                    st.error(f"Payment {r['id']}: {r['detail']}")
+                                if not failed:
+                                    st.success(f"{len(results)} payment(s) {new_status.lower()}.")
+                                    st.rerun()
+                            except Exception as e:
+                                st.error(f"Error: {e}")
+
                 for payment in pending_payments:
                     tenant_name = payment.get('tenant', {}).get('full_name', 'Unknown')
                     with st.expander(f"Payment ID: {payment['id']} - ${payment['amount']} (Tenant: {tenant_name})", expanded=True):
@@ -26,13 +57,14 @@ def render_rent_collection(api_client):
                         with col2:
                             proof_path = payment.get('proof_image_path')
                             if proof_path:
-                                # Construct image URL. Assuming backend serves static files at root
-                                # If proof_path is "uploads/payments/..."
-                                # Base URL: http://localhost:8000
-                                root_url = api_client.base_url.replace("/api", "")
-                                image_url = f"{root_url}/{proof_path}"
+                                # Images come from the authenticated /api/files endpoint (ETag-cached by the client)
+                                # Thumbnail by default (falls back to the original while it's still being processed)
+                                thumb_path = payment.get('proof_thumbnail_path') or proof_path
                                 try:
-                                    st.image(image_url, caption="Payment Proof", width=300)
+                                    st.image(api_client.get_file(thumb_path), caption="Payment Proof", width=300)
+                                    if st.checkbox("Show full image", key=f"full_proof_{payment['id']}"):
+                                        full_path = payment.get('proof_display_path') or proof_path
+                                        st.image(api_client.get_file(full_path), use_container_width=True)
                                 except:
                                     st.error("Could not load image.")
                             else:
@@ -76,7 +108,7 @@ def render_rent_collection(api_client):
         st.write("### Payment History")
         try:
             # Fetch all payments
-            all_payments = api_client.get("payments/")
+            all_payments = api_client.get("payments/", params={"include": "tenant"})
             if all_payments:
                 df = pd.DataFrame(all_payments)
                 
@@ -109,3 +141,20 @@ def render_rent_collection(api_client):
                 st.info("No payment history found.")
         except Exception as e:
             st.error(f"Error fetching history: {e}")
+
+    with tab3:
+        st.write("### Record Payments in Bulk")
+        st.caption("Upload a CSV with the columns tenant_id, amount, month (YYYY-MM), method, txn. "
+                   "Payments are recorded as verified; rows with problems are listed and skipped.")
+        csv_file = st.file_uploader("Payments CSV", type=["csv"], key="bulk_payments_csv")
+        if csv_file is not None and st.button("Record Payments", type="primary"):
+            try:
+                results = api_client.post_csv("payments/bulk", csv_file.getvalue())
+                recorded = [r for r in results if r['success']]
+                failed = [r for r in results if not r['success']]
+                st.success(f"{len(recorded)} payment(s) recorded.")
+                if failed:
+                    st.warning(f"{len(failed)} row(s) skipped:")
+                    st.dataframe(pd.DataFrame(failed)[['row', 'detail']], use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(f"Error recording payments: {e}")
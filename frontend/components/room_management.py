@@ -9,12 +9,15 @@ def render_room_management(api_client):
     with tab1:
         # Fetch rooms
         try:
-            rooms_data = api_client.get("rooms/")
+            rooms_data = api_client.get("rooms/", params={"view": "summary"})
             if rooms_data:
                 df = pd.DataFrame(rooms_data)
                 
                 # Pre-process data
-                if 'tenants' in df.columns:
+                if 'active_occupancy' in df.columns:
+                    df['current_occupants'] = df['active_occupancy']
+                    df['availability'] = df.apply(lambda row: "Available" if row['current_occupants'] < row['capacity'] else "Full", axis=1)
+                elif 'tenants' in df.columns:
                     df['current_occupants'] = df['tenants'].apply(lambda x: len(x) if isinstance(x, list) else 0)
                     df['availability'] = df.apply(lambda row: "Available" if row['current_occupants'] < row['capacity'] else "Full", axis=1)
                 else:
@@ -10,7 +10,7 @@ def render_tenant_management(api_client):
     with tab1:
         # Fetch tenants
         try:
-            tenants_data = api_client.get("tenants/")
+            tenants_data = api_client.get("tenants/", params={"include": "user"})
             if tenants_data:
                 df = pd.DataFrame(tenants_data)
                 
@@ -84,14 +84,8 @@ def render_tenant_management(api_client):
         
         # Fetch available rooms
         try:
-            rooms_data = api_client.get("rooms/")
-            # Filter available rooms
-            available_rooms = []
-            if rooms_data:
-                for r in rooms_data:
-                    current_len = len(r.get('tenants', [])) if isinstance(r.get('tenants'), list) else 0
-                    if current_len < r.get('capacity', 0) and r.get('is_active'):
-                        available_rooms.append(r)
+            rooms_data = api_client.get("rooms/", params={"available": "true", "view": "summary"})
+            available_rooms = rooms_data or []
         except:
             available_rooms = []
             st.warning("Could not fetch rooms.")
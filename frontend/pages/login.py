@@ -45,11 +45,11 @@ def show_login_page():
                     with st.spinner("Logging in..."):
                         token_data = api_client.login(email, password)
                         if token_data:
-                            api_client.set_token(token_data['access_token'])
+                            api_client.set_token(token_data['access_token'], token_data.get('refresh_token'))
                             try:
                                 user_info = api_client.get("auth/me")
                                 if user_info:
-                                    login_user(token_data['access_token'], user_info)
+                                    login_user(token_data['access_token'], user_info, token_data.get('refresh_token'))
                                     st.success("Login successful!")
                                     
                                     # Redirect based on role
@@ -6,7 +6,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from streamlit_option_menu import option_menu
-from utils.session import logout_user, init_session, is_authenticated, get_token
+from utils.session import logout_user, init_session, is_authenticated, get_token, get_refresh_token, store_tokens
 from utils.api_client import APIClient
 from utils.ui import hide_sidebar_nav
 from components.room_management import render_room_management
@@ -37,10 +37,10 @@ def show_dashboard():
 
     # Initialize API Client
     api_base_url = os.getenv("API_BASE_URL", "http://localhost:8000/api")
-    client = APIClient(base_url=api_base_url)
+    client = APIClient(base_url=api_base_url, on_tokens_refreshed=store_tokens)
     token = get_token()
     if token:
-        client.set_token(token)
+        client.set_token(token, get_refresh_token())
 
     # Sidebar Navigation
     with st.sidebar:
@@ -61,6 +61,7 @@ def show_dashboard():
         
         st.divider()
         if st.button("Logout", type="primary", use_container_width=True):
+            client.logout()
             logout_user()
             st.switch_page("pages/login.py")
 
@@ -1,16 +1,37 @@
 import requests
 import json
-from typing import Optional, Dict, Any, Union
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Union, Callable
+
+# Uploaded images already fetched in this process, by URL: (etag, content). Streamlit re-runs
+# pages on every interaction; revalidating with If-None-Match turns repeat fetches into 304s.
+FILE_CACHE_SIZE = 256
+_file_cache: "OrderedDict[str, tuple]" = OrderedDict()
+# JSON responses that carry an ETag (the reports), by URL and params: (etag, data). Revalidated
+# the same way; the server answers 304 only for the caller's own scope, so entries can be shared.
+RESPONSE_CACHE_SIZE = 64
+_response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+def _remember(cache: OrderedDict, key: str, entry: tuple, size: int):
+    cache[key] = entry
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)
 
 class APIClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, on_tokens_refreshed: Optional[Callable[[str, str], None]] = None):
         self.base_url = base_url.rstrip('/')
         self.token = None
+        self.refresh_token = None
+        # Called with (access_token, refresh_token) after a transparent refresh, e.g. to persist them
+        self.on_tokens_refreshed = on_tokens_refreshed
         # User info can be stored here if needed
         self.user = None
 
-    def set_token(self, token: str):
+    def set_token(self, token: str, refresh_token: Optional[str] = None):
         self.token = token
+        if refresh_token:
+            self.refresh_token = refresh_token
 
     def get_headers(self, content_type: Optional[str] = "application/json") -> Dict[str, str]:
         headers = {}
@@ -37,7 +58,7 @@ class APIClient:
             response = requests.post(url, json=data, headers={"Content-Type": "application/json"})
             if response.status_code == 200:
                 token_data = response.json()
-                self.set_token(token_data.get("access_token"))
+                self.set_token(token_data.get("access_token"), token_data.get("refresh_token"))
                 return token_data
             else:
                 # Log or handle login failure
@@ -45,6 +66,48 @@ class APIClient:
         except requests.RequestException:
             return None
 
+    def logout(self):
+        """Revokes the access token and this login's refresh tokens on the server (best effort)."""
+        if self.token:
+            data = {"refresh_token": self.refresh_token} if self.refresh_token else None
+            try:
+                requests.post(f"{self.base_url}/auth/logout", json=data, headers=self.get_headers())
+            except requests.RequestException:
+                pass
+        self.token = None
+        self.refresh_token = None
+
+    def refresh(self) -> bool:
+        """Exchanges the refresh token for new tokens (no password, no re-login). Returns success."""
+        if not self.refresh_token:
+            return False
+        url = f"{self.base_url}/auth/refresh"
+        try:
+            response = requests.post(url, json={"refresh_token": self.refresh_token}, headers={"Content-Type": "application/json"})
+        except requests.RequestException:
+            return False
+        if response.status_code != 200:
+            # Expired or revoked: the user has to log in again
+            self.refresh_token = None
+            return False
+        token_data = response.json()
+        self.set_token(token_data.get("access_token"), token_data.get("refresh_token"))
+        if self.on_tokens_refreshed:
+            self.on_tokens_refreshed(self.token, self.refresh_token)
+        return True
+
+    def _send(self, method: str, url: str, content_type: Optional[str] = "application/json",
+              headers_extra: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """Sends a request; if the access token has expired, refreshes it once and retries."""
+        headers_extra = headers_extra or {}
+        response = requests.request(method, url, headers={**self.get_headers(content_type), **headers_extra}, **kwargs)
+        if response.status_code == 401 and self.refresh():
+            file_obj = kwargs.get("files", {}).get("file")
+            if hasattr(file_obj, "seek"):
+                file_obj.seek(0)
+            response = requests.request(method, url, headers={**self.get_headers(content_type), **headers_extra}, **kwargs)
+        return response
+
     def _handle_response(self, response: requests.Response) -> Any:
         """
         Handles API response, raising exceptions for errors and returning JSON for success.
@@ -69,9 +132,19 @@ class APIClient:
 
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        key = f"{url}?{json.dumps(params, sort_keys=True, default=str)}"
+        cached = _response_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
         try:
-            response = requests.get(url, params=params, headers=self.get_headers())
-            return self._handle_response(response)
+            response = self._send("GET", url, headers_extra=headers, params=params)
+            if response.status_code == 304 and cached:
+                _response_cache.move_to_end(key)
+                return cached[1]
+            data = self._handle_response(response)
+            etag = response.headers.get("ETag")
+            if etag:
+                _remember(_response_cache, key, (etag, data), RESPONSE_CACHE_SIZE)
+            return data
         except Exception as e:
             # In a real app, might want to re-raise or return an error object
             raise e
@@ -79,15 +152,15 @@ class APIClient:
     def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.post(url, json=data, headers=self.get_headers())
+            response = self._send("POST", url, json=data)
             return self._handle_response(response)
         except Exception as e:
             raise e
 
-    def put(self, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Any:
+    def put(self, endpoint: str, data: Optional[Union[Dict[str, Any], list]] = None) -> Any:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.put(url, json=data, headers=self.get_headers())
+            response = self._send("PUT", url, json=data)
             return self._handle_response(response)
         except Exception as e:
             raise e
@@ -95,7 +168,15 @@ class APIClient:
     def delete(self, endpoint: str) -> Any:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.delete(url, headers=self.get_headers())
+            response = self._send("DELETE", url)
+            return self._handle_response(response)
+        except Exception as e:
+            raise e
+
+    def post_csv(self, endpoint: str, csv_content: Union[str, bytes]) -> Any:
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        try:
+            response = self._send("POST", url, content_type="text/csv", data=csv_content)
             return self._handle_response(response)
         except Exception as e:
             raise e
@@ -103,10 +184,24 @@ class APIClient:
     def upload_file(self, endpoint: str, file_obj, extra_data: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         # For file upload, Content-Type header should not be set manually (requests does it)
-        headers = self.get_headers(content_type=None)
         files = {"file": file_obj}
         try:
-            response = requests.post(url, files=files, data=extra_data, headers=headers)
+            response = self._send("POST", url, content_type=None, files=files, data=extra_data)
             return self._handle_response(response)
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+
+    def get_file(self, path: str) -> bytes:
+        """Returns the content of an uploaded file (e.g. a proof_image_path), reusing the cached copy while unchanged."""
+        url = f"{self.base_url}/files/{path.lstrip('/')}"
+        cached = _file_cache.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self._send("GET", url, content_type=None, headers_extra=headers)
+        if response.status_code == 304 and cached:
+            _file_cache.move_to_end(url)
+            return cached[1]
+        response.raise_for_status()
+        etag = response.headers.get("ETag")
+        if etag:
+            _remember(_file_cache, url, (etag, response.content), FILE_CACHE_SIZE)
+        return response.content
@@ -7,15 +7,18 @@ def init_session():
         st.session_state['authentication_status'] = None
     if 'token' not in st.session_state:
         st.session_state['token'] = None
+    if 'refresh_token' not in st.session_state:
+        st.session_state['refresh_token'] = None
     if 'user' not in st.session_state:
         st.session_state['user'] = {}
     if 'role' not in st.session_state:
         st.session_state['role'] = None
 
-def login_user(token: str, user_data: Dict[str, Any]):
+def login_user(token: str, user_data: Dict[str, Any], refresh_token: Optional[str] = None):
     """Sets the session state for a logged-in user."""
     st.session_state['authentication_status'] = True
     st.session_state['token'] = token
+    st.session_state['refresh_token'] = refresh_token
     st.session_state['user'] = user_data
     # Assuming user_data has 'role' field.
     st.session_state['role'] = user_data.get('role')
@@ -24,6 +27,7 @@ def logout_user():
     """Clears the session state to log out the user."""
     st.session_state['authentication_status'] = None
     st.session_state['token'] = None
+    st.session_state['refresh_token'] = None
     st.session_state['user'] = {}
     st.session_state['role'] = None
     
@@ -34,6 +38,15 @@ def get_token() -> Optional[str]:
     """Returns the current access token."""
     return st.session_state.get('token')
 
+def get_refresh_token() -> Optional[str]:
+    """Returns the current refresh token."""
+    return st.session_state.get('refresh_token')
+
+def store_tokens(token: str, refresh_token: str):
+    """Keeps tokens renewed by APIClient's transparent refresh for the next page run."""
+    st.session_state['token'] = token
+    st.session_state['refresh_token'] = refresh_token
+
 def get_user_role() -> Optional[str]:
     """Returns the current user's role."""
     return st.session_state.get('role')
@@ -0,0 +1,95 @@
+import os
+import sys
+import asyncio
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.main import app
+from backend.app.database import Base, get_db, get_async_db, run_db, is_async_url, to_sync_url
+from backend.app.dependencies import get_user_by_email
+
+# Setup test database, shared by a sync engine (threadpool routers) and an aiosqlite
+# engine (async auth routes and dependencies), as in async mode
+db_file = "./test_async_db.db"
+if os.path.exists(db_file):
+    os.remove(db_file)
+
+engine = create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+client = TestClient(app)
+
+def test_database_url_mode():
+    assert is_async_url("sqlite+aiosqlite:///./database/pg.db")
+    assert is_async_url("postgresql+asyncpg://u:p@localhost/pg")
+    assert not is_async_url("sqlite:///./database/pg.db")
+    assert to_sync_url("sqlite+aiosqlite:///./database/pg.db") == "sqlite:///./database/pg.db"
+    assert to_sync_url("postgresql+asyncpg://u:p@localhost/pg") == "postgresql://u:p@localhost/pg"
+
+def test_auth_flow_on_async_session():
+    response = client.post("/api/auth/register-admin", json={"email": "async@example.com", "password": "secret123"})
+    assert response.status_code == 201, response.text
+    assert response.json()["tenant"] is None
+
+    response = client.post("/api/auth/register-admin", json={"email": "async@example.com", "password": "secret123"})
+    assert response.status_code == 400
+
+    response = client.post("/api/auth/login", json={"email": "async@example.com", "password": "wrong"})
+    assert response.status_code == 401
+
+    response = client.post("/api/auth/login", json={"email": "async@example.com", "password": "secret123"})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "async@example.com"
+
+    # Sync routers still work behind the async-session auth dependency
+    response = client.get("/api/rooms/", headers=headers)
+    assert response.status_code == 200
+
+def test_run_db_uses_async_session():
+    async def lookup():
+        async with TestingAsyncSessionLocal() as db:
+            assert isinstance(db, AsyncSession)
+            return await run_db(db, get_user_by_email, "async@example.com")
+
+    user = asyncio.run(lookup())
+    # Tenant was eager-loaded, so reading it after the session closed doesn't query
+    assert user.email == "async@example.com" and user.tenant is None
+
+if __name__ == "__main__":
+    try:
+        test_database_url_mode()
+        test_auth_flow_on_async_session()
+        test_run_db_uses_async_session()
+        print("\nAll ASYNC DB tests passed successfully!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
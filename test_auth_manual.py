@@ -10,8 +10,11 @@ from sqlalchemy.orm import sessionmaker
 from backend.app.main import app
 from backend.app.dependencies import get_db
 from backend.app.database import Base
-from backend.app.models import User, UserRole
+from backend.app.models import User, UserRole, RefreshToken
 from backend.app.auth import get_password_hash
+from backend.app.config import settings
+from passlib.context import CryptContext
+from jose import jwt
 
 # Setup test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_auth.db"
@@ -73,6 +76,86 @@ def test_me(token):
     assert data["role"] == "admin"
     print("User retrieved successfully:", data)
 
+def test_login_rehashes_outdated_cost():
+    # Store a hash with a cheaper cost factor than BCRYPT_ROUNDS
+    db = TestingSessionLocal()
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("oldcost123")
+    user = db.query(User).filter(User.email == "oldcost@example.com").first()
+    if not user:
+        user = User(email="oldcost@example.com", role=UserRole.TENANT.value, is_active=True)
+        db.add(user)
+    user.hashed_password = old_hash
+    db.commit()
+    db.close()
+
+    response = client.post("/api/auth/login", json={"email": "oldcost@example.com", "password": "oldcost123"})
+    assert response.status_code == 200
+
+    db = TestingSessionLocal()
+    new_hash = db.query(User).filter(User.email == "oldcost@example.com").first().hashed_password
+    db.close()
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+    # The upgraded hash still verifies, and wrong passwords are still rejected
+    response = client.post("/api/auth/login", json={"email": "oldcost@example.com", "password": "oldcost123"})
+    assert response.status_code == 200
+    response = client.post("/api/auth/login", json={"email": "oldcost@example.com", "password": "wrong"})
+    assert response.status_code == 401
+    print("Rehash on login passed.")
+
+def test_token_claims_and_logout():
+    setup_test_user()
+    response = client.post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+    token = response.json()["access_token"]
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert claims["sub"] == "test@example.com" and claims["role"] == "admin"
+    assert claims["uid"] and claims["jti"] and "tenant_id" in claims
+
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/rooms/", headers=headers).status_code == 200
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    # The revoked token is rejected on both the claims fast path and the full lookup
+    assert client.get("/api/rooms/", headers=headers).status_code == 401
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    print("Token claims and logout passed.")
+
+def test_refresh_token_rotation():
+    setup_test_user()
+    response = client.post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+    first_refresh = response.json()["refresh_token"]
+    assert first_refresh
+
+    # Rotation: a fresh access token and a new refresh token, no password needed
+    response = client.post("/api/auth/refresh", json={"refresh_token": first_refresh})
+    assert response.status_code == 200
+    second_refresh = response.json()["refresh_token"]
+    assert second_refresh != first_refresh
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/auth/me", headers=headers).json()["email"] == "test@example.com"
+
+    # Replaying the rotated token is reuse: it fails and revokes the whole family
+    response = client.post("/api/auth/refresh", json={"refresh_token": first_refresh})
+    assert response.status_code == 401
+    response = client.post("/api/auth/refresh", json={"refresh_token": second_refresh})
+    assert response.status_code == 401
+
+    # Only hashes are stored
+    db = TestingSessionLocal()
+    stored = [t.token_hash for t in db.query(RefreshToken).all()]
+    db.close()
+    assert first_refresh not in stored and second_refresh not in stored
+
+    # Logout with the refresh token ends that login's family
+    response = client.post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+    tokens = response.json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    response = client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 200
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    print("Refresh token rotation passed.")
+
 if __name__ == "__main__":
     try:
         print("Testing Login...")
@@ -81,6 +164,15 @@ if __name__ == "__main__":
         
         print("Testing /me endpoint...")
         test_me(token)
+
+        print("Testing rehash on login...")
+        test_login_rehashes_outdated_cost()
+
+        print("Testing token claims and logout...")
+        test_token_claims_and_logout()
+
+        print("Testing refresh token rotation...")
+        test_refresh_token_rotation()
         print("All tests passed!")
     except Exception as e:
         print(f"Test failed: {e}")
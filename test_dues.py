@@ -0,0 +1,136 @@
+import os
+import sys
+from datetime import date
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.main import app
+from backend.app.database import Base, get_db
+from backend.app.models import User, UserRole, RoomType, Room, Tenant, RentPayment, PaymentStatus
+from backend.app.auth import create_access_token
+
+# Setup test database
+db_file = "./test_dues.db"
+if os.path.exists(db_file):
+    os.remove(db_file)
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_file}"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+AS_OF = date(2024, 4, 15)
+
+def auth_headers(email):
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+def add_tenant(db, name, rent, check_in, check_out=None):
+    room = Room(room_number=name, floor=1, room_type=RoomType.SINGLE.value, capacity=1, monthly_rent=rent)
+    user = User(email=f"{name.lower()}@example.com", hashed_password="x", role=UserRole.TENANT.value, is_active=True)
+    db.add_all([room, user])
+    db.flush()
+    tenant = Tenant(user_id=user.id, room_id=room.id, full_name=name, phone="1", emergency_contact="2",
+                    check_in_date=check_in, check_out_date=check_out, is_active=check_out is None)
+    db.add(tenant)
+    db.flush()
+    return tenant
+
+def add_payment(db, tenant, month, amount, status=PaymentStatus.VERIFIED):
+    db.add(RentPayment(tenant_id=tenant.id, amount=amount, payment_date=month, payment_method="Cash",
+                       payment_month=month, status=status.value))
+
+def seed_data():
+    db = TestingSessionLocal()
+    db.add(User(email="admin@example.com", hashed_password="x", role=UserRole.ADMIN.value, is_active=True))
+    # Jan-Apr owed; Jan and Feb paid, Mar partly, Apr pending
+    alice = add_tenant(db, "Alice", 500.0, date(2024, 1, 20))
+    add_payment(db, alice, date(2024, 1, 1), 500.0)
+    add_payment(db, alice, date(2024, 2, 1), 500.0)
+    add_payment(db, alice, date(2024, 3, 1), 200.0)
+    add_payment(db, alice, date(2024, 4, 1), 500.0, PaymentStatus.PENDING)
+    # Checked out in February: owes Jan and Feb only, paid nothing
+    bob = add_tenant(db, "Bob", 300.0, date(2023, 12, 5), check_out=date(2024, 1, 10))
+    add_payment(db, bob, date(2023, 12, 1), 300.0, PaymentStatus.REJECTED)
+    # Fully paid, plus a prepaid month after the as-of date that must not count
+    carol = add_tenant(db, "Carol", 400.0, date(2024, 3, 1))
+    for month in [date(2024, 3, 1), date(2024, 4, 1), date(2024, 5, 1)]:
+        add_payment(db, carol, month, 400.0)
+    db.commit()
+    db.close()
+
+def test_dues_schedule_and_aging():
+    seed_data()
+    response = client.get("/api/reports/dues", params={"as_of": AS_OF.isoformat()}, headers=auth_headers("admin@example.com"))
+    assert response.status_code == 200, response.text
+    report = response.json()
+    tenants = {t["full_name"]: t for t in report["tenants"]}
+
+    alice = tenants["Alice"]
+    assert alice["expected"] == 2000.0 and alice["paid"] == 1200.0 and alice["pending"] == 500.0
+    assert alice["outstanding"] == 800.0
+    assert alice["oldest_unpaid_month"] == "2024-03-01"
+    # March is 45 days overdue, April 14
+    assert alice["aging"] == {"0-30": 500.0, "31-60": 300.0, "60+": 0.0}
+
+    bob = tenants["Bob"]
+    assert bob["expected"] == 600.0 and bob["paid"] == 0.0 and bob["outstanding"] == 600.0
+    assert bob["aging"] == {"0-30": 0.0, "31-60": 0.0, "60+": 600.0}
+
+    carol = tenants["Carol"]
+    assert carol["expected"] == 800.0 and carol["paid"] == 800.0 and carol["outstanding"] == 0.0
+    assert carol["oldest_unpaid_month"] is None
+
+    assert report["totals"]["tenant_months"] == 8
+    assert report["totals"]["outstanding"] == 1400.0
+    assert report["totals"]["tenants_with_dues"] == 2
+    assert report["aging"] == {"0-30": 500.0, "31-60": 300.0, "60+": 600.0}
+
+    response = client.get("/api/reports/dues", params={"as_of": AS_OF.isoformat(), "only_outstanding": True},
+                          headers=auth_headers("admin@example.com"))
+    assert {t["full_name"] for t in response.json()["tenants"]} == {"Alice", "Bob"}
+
+def test_tenant_sees_only_own_dues():
+    db = TestingSessionLocal()
+    bob = db.query(Tenant).filter(Tenant.full_name == "Bob").first()
+    db.close()
+    response = client.get("/api/reports/dues", params={"as_of": AS_OF.isoformat(), "tenant_id": bob.id},
+                          headers=auth_headers("alice@example.com"))
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert [t["full_name"] for t in report["tenants"]] == ["Alice"]
+    assert report["totals"]["outstanding"] == 800.0
+
+def test_dues_before_any_tenancy():
+    response = client.get("/api/reports/dues", params={"as_of": "2020-01-01"}, headers=auth_headers("admin@example.com"))
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["totals"]["tenant_months"] == 0 and report["totals"]["outstanding"] == 0.0
+    assert all(t["outstanding"] == 0.0 for t in report["tenants"])
+
+if __name__ == "__main__":
+    try:
+        test_dues_schedule_and_aging()
+        test_tenant_sees_only_own_dues()
+        test_dues_before_any_tenancy()
+        print("\nAll DUES tests passed successfully!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
@@ -0,0 +1,102 @@
+import os
+import sys
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from datetime import date
+from backend.app.database import Base
+from backend.app.migrations import upgrade_schema
+from backend.app.models import UserRole, RoomType, Room, MaintenanceRequest, MaintenanceStatus, RentPayment, PaymentStatus
+
+db_file = "./test_migrations.db"
+
+def old_database():
+    """A database as created by an earlier version: current tables minus the later additions."""
+    if os.path.exists(db_file):
+        os.remove(db_file)
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.exec_driver_sql(f"DROP INDEX {index.name}")
+        conn.exec_driver_sql("ALTER TABLE rooms DROP COLUMN active_occupancy")
+        conn.exec_driver_sql("ALTER TABLE maintenance_requests DROP COLUMN resolution_seconds")
+    return engine
+
+def indexes(engine):
+    return {index["name"] for table in Base.metadata.sorted_tables for index in inspect(engine).get_indexes(table.name)}
+
+def add_tenant(conn):
+    conn.exec_driver_sql("INSERT INTO rooms (id, room_number, floor, room_type, capacity, monthly_rent, is_active) "
+                         f"VALUES (1, '101', 1, '{RoomType.DOUBLE.value}', 2, 500.0, 1)")
+    conn.exec_driver_sql(f"INSERT INTO users (id, email, hashed_password, role, is_active) VALUES (1, 'm@example.com', 'x', '{UserRole.TENANT.value}', 1)")
+    conn.exec_driver_sql("INSERT INTO tenants (id, user_id, room_id, full_name, phone, emergency_contact, check_in_date, is_active) "
+                         "VALUES (1, 1, 1, 'Old Tenant', '1', '2', '2023-01-01', 1)")
+
+def add_payment(conn, id, payment_month):
+    conn.exec_driver_sql("INSERT INTO rent_payments (id, tenant_id, amount, payment_date, payment_method, transaction_id, payment_month, status) "
+                         f"VALUES ({id}, 1, 500.0, '{payment_month}', 'Cash', 'T{id}', '{payment_month}', '{PaymentStatus.VERIFIED.value}')")
+
+def test_upgrade_adds_columns_and_indexes():
+    engine = old_database()
+    with engine.begin() as conn:
+        add_tenant(conn)
+        conn.exec_driver_sql("INSERT INTO maintenance_requests (id, tenant_id, category, priority, description, status, request_date, resolved_date) "
+                             f"VALUES (1, 1, 'Plumbing', 'Low', 'Leak', '{MaintenanceStatus.RESOLVED.value}', "
+                             "'2023-01-01 10:00:00', '2023-01-01 12:30:00')")
+        # Stored before payment_month was normalized to the first of the month
+        add_payment(conn, 1, "2023-01-15")
+    assert "ix_tenants_is_active_id" not in indexes(engine)
+
+    upgrade_schema(engine)
+    assert {index.name for table in Base.metadata.sorted_tables for index in table.indexes} <= indexes(engine)
+    db = sessionmaker(bind=engine)()
+    # The new columns are filled in from the existing rows
+    assert db.get(Room, 1).active_occupancy == 1
+    # Requests resolved before resolution_seconds existed are backfilled
+    assert db.get(MaintenanceRequest, 1).resolution_seconds == 2.5 * 3600
+    # Existing months are moved to the first of the month before the unique index is created
+    assert db.get(RentPayment, 1).payment_month == date(2023, 1, 1)
+    db.close()
+
+    # Nothing left to do the second time
+    upgrade_schema(engine)
+    engine.dispose()
+    os.remove(db_file)
+
+def test_upgrade_refuses_duplicate_payment_months():
+    engine = old_database()
+    with engine.begin() as conn:
+        add_tenant(conn)
+        add_payment(conn, 1, "2023-03-05")
+        add_payment(conn, 2, "2023-03-20")
+
+    try:
+        upgrade_schema(engine)
+        assert False, "upgrade should refuse two payments for the same month"
+    except RuntimeError as e:
+        assert "tenant 1 for 2023-03" in str(e)
+    assert "uq_rent_payments_tenant_payment_month" not in indexes(engine)
+
+    # Once the extra payment is gone the upgrade goes through
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM rent_payments WHERE id = 2")
+    upgrade_schema(engine)
+    assert "uq_rent_payments_tenant_payment_month" in indexes(engine)
+    engine.dispose()
+    os.remove(db_file)
+
+if __name__ == "__main__":
+    try:
+        test_upgrade_adds_columns_and_indexes()
+        test_upgrade_refuses_duplicate_payment_months()
+        print("\nAll MIGRATION tests passed successfully!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
@@ -0,0 +1,307 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from backend.app.main import app
+from backend.app.database import Base, get_db
+from backend.app.models import User, UserRole, RoomType, Room, Tenant, RentPayment, MaintenanceRequest
+from backend.app.auth import create_access_token, create_principal_token
+from backend.app.config import settings
+from backend.app.schemas import UserPrincipal
+from backend.app.principals import principal_cache
+from backend.app.report_cache import table_versions, version_key
+from backend.app.routers.rooms import rebuild_room_occupancy
+
+# Setup test database
+db_file = "./test_query_counts.db"
+if os.path.exists(db_file):
+    os.remove(db_file)
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_file}"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+TENANT_COUNT = 40
+# Upper bound on statements for any single list/detail request, whatever the page size
+MAX_QUERIES_PER_REQUEST = 10
+
+@contextmanager
+def count_queries():
+    """Counts SQL statements executed against the test engine within the block."""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+def seed_data():
+    db = TestingSessionLocal()
+    db.add(User(email="admin@example.com", hashed_password="x", role=UserRole.ADMIN.value, is_active=True))
+    for i in range(TENANT_COUNT):
+        room = Room(room_number=str(100 + i), floor=1, room_type=RoomType.DOUBLE.value, capacity=2, monthly_rent=500.0)
+        user = User(email=f"tenant{i}@example.com", hashed_password="x", role=UserRole.TENANT.value, is_active=True)
+        db.add_all([room, user])
+        db.flush()
+        tenant = Tenant(user_id=user.id, room_id=room.id, full_name=f"Tenant {i}", phone="1", emergency_contact="2",
+                        check_in_date=date(2023, 1, 1), is_active=True)
+        db.add(tenant)
+        db.flush()
+        for month in range(1, 4):
+            db.add(RentPayment(tenant_id=tenant.id, amount=500.0, payment_date=date(2023, month, 3), payment_method="UPI",
+                               transaction_id=f"T{i}-{month}", payment_month=date(2023, month, 1)))
+        for category in ["Plumbing", "Electrical"]:
+            db.add(MaintenanceRequest(tenant_id=tenant.id, category=category, priority="Low", description="Broken"))
+    db.commit()
+    rebuild_room_occupancy(db)
+    db.close()
+
+def request_query_count(url, headers):
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return len(statements), response.json()
+
+def test_list_endpoints_query_count_is_constant():
+    seed_data()
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+    # Warm the principal cache so every measured request skips the auth lookup
+    client.get("/api/auth/me", headers=admin_headers)
+
+    for endpoint in ["/api/rooms/", "/api/tenants/", "/api/payments/", "/api/maintenance/"]:
+        small, small_page = request_query_count(f"{endpoint}?limit=2", admin_headers)
+        large, large_page = request_query_count(f"{endpoint}?limit={TENANT_COUNT}", admin_headers)
+        print(f"{endpoint}: {small} queries for 2 rows, {large} queries for {len(large_page)} rows")
+        assert len(small_page) == 2 and len(large_page) == TENANT_COUNT
+        assert small == large
+        assert large <= MAX_QUERIES_PER_REQUEST
+
+    # Nested relations are actually serialized, not just skipped
+    _, tenants = request_query_count(f"/api/tenants/?limit={TENANT_COUNT}", admin_headers)
+    assert all(len(t["payments"]) == 3 and len(t["maintenance_requests"]) == 2 for t in tenants)
+    assert all(t["user"]["tenant"]["id"] == t["id"] and t["room"]["tenants"] for t in tenants)
+
+def test_detail_endpoints_query_count_is_bounded():
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+    db = TestingSessionLocal()
+    tenant = db.query(Tenant).first()
+    payment = db.query(RentPayment).first()
+    request = db.query(MaintenanceRequest).first()
+    db.close()
+
+    for url in [f"/api/rooms/{tenant.room_id}", f"/api/tenants/{tenant.id}",
+                f"/api/payments/{payment.id}", f"/api/maintenance/{request.id}"]:
+        count, _ = request_query_count(url, admin_headers)
+        print(f"{url}: {count} queries")
+        assert count <= MAX_QUERIES_PER_REQUEST
+
+def test_summary_views_load_only_requested_relations():
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+
+    # Summary: columns only, a single SELECT for the page (the principal is cached)
+    full_count, _ = request_query_count("/api/tenants/?limit=10", admin_headers)
+    count, tenants = request_query_count("/api/tenants/?view=summary&limit=10", admin_headers)
+    assert count == 1 and count < full_count
+    assert set(tenants[0]) >= {"id", "full_name", "room_id", "is_active"}
+    assert not {"user", "room", "payments", "maintenance_requests"} & set(tenants[0])
+
+    # Include: only the requested relations are loaded and serialized
+    count, tenants = request_query_count("/api/tenants/?include=user,payments&limit=10", admin_headers)
+    assert count == 2
+    assert tenants[0]["user"]["email"].endswith("@example.com")
+    assert len(tenants[0]["payments"]) == 3
+    assert "room" not in tenants[0] and "maintenance_requests" not in tenants[0]
+
+    # Room summaries embed only active tenants when asked
+    db = TestingSessionLocal()
+    tenant = db.query(Tenant).filter(Tenant.full_name == "Tenant 0").first()
+    tenant.is_active = False
+    room_id = tenant.room_id
+    db.commit()
+    db.close()
+    _, rooms = request_query_count("/api/rooms/?view=summary", admin_headers)
+    assert "tenants" not in rooms[0]
+    _, rooms = request_query_count("/api/rooms/?include=tenants", admin_headers)
+    assert next(r for r in rooms if r["id"] == room_id)["tenants"] == []
+    _, rooms = request_query_count("/api/rooms/", admin_headers)
+    assert len(next(r for r in rooms if r["id"] == room_id)["tenants"]) == 1
+
+    for endpoint in ["/api/payments/", "/api/maintenance/"]:
+        count, items = request_query_count(f"{endpoint}?view=summary&limit=10", admin_headers)
+        assert count == 1 and "tenant" not in items[0]
+        count, items = request_query_count(f"{endpoint}?include=tenant&limit=10", admin_headers)
+        assert count == 1 and items[0]["tenant"]["full_name"].startswith("Tenant")
+
+    response = client.get("/api/tenants/?include=passwords", headers=admin_headers)
+    assert response.status_code == 400
+
+def test_claims_token_reads_need_no_auth_query():
+    db = TestingSessionLocal()
+    admin = db.query(User).filter(User.email == "admin@example.com").first()
+    tenant = db.query(Tenant).filter(Tenant.is_active == True).first()
+    principal = UserPrincipal(id=admin.id, email=admin.email, role=admin.role, is_active=True)
+    db.close()
+    headers = {"Authorization": f"Bearer {create_principal_token(principal)}"}
+    principal_cache.clear()
+
+    # Authorized from the token alone, even with a cold principal cache: only the page query itself hits the database
+    count, _ = request_query_count("/api/tenants/?view=summary&limit=10", headers)
+    assert count == 1
+    count, _ = request_query_count(f"/api/tenants/{tenant.id}", headers)
+    assert count <= MAX_QUERIES_PER_REQUEST
+    count, _ = request_query_count("/api/maintenance/?view=summary&limit=10", headers)
+    assert count == 1
+
+def test_occupancy_report_is_one_grouped_query():
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+    db = TestingSessionLocal()
+    for i, occupancy in enumerate([0, 1, 0]):
+        db.add(Room(room_number=f"2{i:02d}", floor=2, room_type=RoomType.SINGLE.value, capacity=1,
+                    monthly_rent=400.0, active_occupancy=occupancy))
+    db.commit()
+    rooms = db.query(Room).filter(Room.is_active == True).all()
+    db.close()
+    client.get("/api/auth/me", headers=admin_headers)
+
+    count, report = request_query_count("/api/reports/occupancy", admin_headers)
+    assert count == 1 and "rooms" not in report
+    assert report["total_rooms"] == len(rooms)
+    assert report["total_capacity"] == sum(r.capacity for r in rooms)
+    assert report["total_occupied_beds"] == sum(r.active_occupancy for r in rooms)
+    assert report["vacant_rooms_count"] == sum(r.active_occupancy < r.capacity for r in rooms)
+    floor_2 = next(f for f in report["by_floor"] if f["floor"] == 2)
+    assert floor_2["total_rooms"] == 3 and floor_2["total_occupied_beds"] == 1 and floor_2["vacant_rooms_count"] == 2
+    single = next(t for t in report["by_room_type"] if t["room_type"] == RoomType.SINGLE.value)
+    assert single["occupancy_rate"] == round(100 / 3, 2)
+
+    # Room lists are opt-in, one keyset page at a time
+    vacant = [r.id for r in sorted(rooms, key=lambda r: r.id) if r.active_occupancy < r.capacity]
+    response = client.get("/api/reports/occupancy", params={"rooms": "vacant", "limit": 2}, headers=admin_headers)
+    assert [r["id"] for r in response.json()["rooms"]] == vacant[:2]
+    cursor = response.headers.get("X-Next-Cursor")
+    count, report = request_query_count(f"/api/reports/occupancy?rooms=vacant&limit=100&cursor={cursor}", admin_headers)
+    assert count == 2 and [r["id"] for r in report["rooms"]] == vacant[2:]
+
+def test_tenant_report_aggregates_in_sql():
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+    client.get("/api/auth/me", headers=admin_headers)
+    db = TestingSessionLocal()
+    tenant = db.query(Tenant).filter(Tenant.full_name == "Tenant 1").first()
+    payments = db.query(RentPayment).filter(RentPayment.tenant_id == tenant.id).all()
+    payments[0].status = "Verified"
+    db.commit()
+    payment_ids = [p.id for p in sorted(payments, key=lambda p: (p.payment_date, p.id), reverse=True)]
+    request_ids = sorted((r.id for r in db.query(MaintenanceRequest).filter(MaintenanceRequest.tenant_id == tenant.id)), reverse=True)
+    db.close()
+
+    # Tenant + user + room joined, then one aggregate per summary
+    count, report = request_query_count(f"/api/reports/tenant/{tenant.id}", admin_headers)
+    assert count == 3 and "history" not in report
+    assert report["tenant_details"]["email"] == "tenant1@example.com" and report["tenant_details"]["room"] == "101"
+    assert report["financials"] == {"total_rent_paid": 500.0, "pending_dues": 1000.0, "payment_history_count": 3}
+    assert report["maintenance"] == {"total_requests": 2, "open": 2, "resolved": 0}
+
+    response = client.get(f"/api/reports/tenant/{tenant.id}/payments?limit=2", headers=admin_headers)
+    first_page = [p["id"] for p in response.json()]
+    cursor = response.headers["X-Next-Cursor"]
+    count, second_page = request_query_count(f"/api/reports/tenant/{tenant.id}/payments?limit=2&cursor={cursor}", admin_headers)
+    assert count == 1 and first_page + [p["id"] for p in second_page] == payment_ids
+
+    _, history = request_query_count(f"/api/reports/tenant/{tenant.id}/maintenance", admin_headers)
+    assert [m["id"] for m in history] == request_ids
+
+    assert client.get("/api/reports/tenant/999999", headers=admin_headers).status_code == 404
+
+def test_reports_revalidate_without_queries():
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+    client.get("/api/auth/me", headers=admin_headers)
+    db = TestingSessionLocal()
+    tenant_id = db.query(Tenant).filter(Tenant.full_name == "Tenant 2").first().id
+    db.close()
+
+    for url in ["/api/reports/occupancy", f"/api/reports/tenant/{tenant_id}", "/api/maintenance/stats"]:
+        response = client.get(url, headers=admin_headers)
+        etag = response.headers["ETag"]
+        # Unchanged: 304 on revalidation, the cached result otherwise, without touching the database
+        with count_queries() as statements:
+            not_modified = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+            cached = client.get(url, headers=admin_headers)
+        assert not_modified.status_code == 304 and not_modified.headers["ETag"] == etag
+        assert cached.json() == response.json() and cached.headers["ETag"] == etag
+        assert statements == []
+
+    # A committed write to a table a report reads changes its ETag and result
+    url = f"/api/reports/tenant/{tenant_id}"
+    before = client.get(url, headers=admin_headers)
+    request = client.post("/api/maintenance/", json={"category": "Plumbing", "priority": "Low", "description": "Leak"},
+                          headers={"Authorization": f"Bearer {create_access_token({'sub': 'tenant2@example.com'})}"})
+    assert request.status_code == 200, request.text
+    after = client.get(url, headers={**admin_headers, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200 and after.headers["ETag"] != before.headers["ETag"]
+    assert after.json()["maintenance"]["total_requests"] == before.json()["maintenance"]["total_requests"] + 1
+
+    # Other reports keep their ETags until a table they read changes
+    stats_etag = client.get("/api/maintenance/stats", headers=admin_headers).headers["ETag"]
+    occupancy_etag = client.get("/api/reports/occupancy", headers=admin_headers).headers["ETag"]
+    db = TestingSessionLocal()
+    db.query(Room).filter(Room.room_number == "200").update({"monthly_rent": 450.0})
+    db.commit()
+    db.close()
+    assert client.get("/api/maintenance/stats", headers={**admin_headers, "If-None-Match": stats_etag}).status_code == 304
+    assert client.get("/api/reports/occupancy", headers={**admin_headers, "If-None-Match": occupancy_etag}).status_code == 200
+
+    # A write no Session here saw (another process) shows once the table's version expires,
+    # within REPORT_CACHE_TTL, whether the client revalidates or not
+    before = client.get("/api/reports/occupancy", headers=admin_headers)
+    with engine.begin() as conn:
+        conn.execute(Room.__table__.update().where(Room.room_number == "200").values(active_occupancy=1))
+    assert client.get("/api/reports/occupancy", headers={**admin_headers, "If-None-Match": before.headers["ETag"]}).status_code == 304
+    assert table_versions.ttl == settings.REPORT_CACHE_TTL
+    table_versions.delete(version_key("rooms"))
+    after = client.get("/api/reports/occupancy", headers={**admin_headers, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()["total_occupied_beds"] == before.json()["total_occupied_beds"] + 1
+
+    # The maintenance scripts' rebuilds commit through a Session, so they bump what they rewrite
+    version = table_versions.get(version_key("rooms"))
+    db = TestingSessionLocal()
+    rebuild_room_occupancy(db)
+    db.close()
+    assert table_versions.get(version_key("rooms")) not in (None, version)
+
+if __name__ == "__main__":
+    try:
+        test_list_endpoints_query_count_is_constant()
+        test_detail_endpoints_query_count_is_bounded()
+        test_summary_views_load_only_requested_relations()
+        test_claims_token_reads_need_no_auth_query()
+        test_occupancy_report_is_one_grouped_query()
+        test_tenant_report_aggregates_in_sql()
+        test_reports_revalidate_without_queries()
+        print("\nAll QUERY COUNT tests passed successfully!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
@@ -0,0 +1,148 @@
+import os
+import sys
+from datetime import date, datetime
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.main import app
+from backend.app.database import Base, get_db
+from backend.app.models import (
+    User, UserRole, RoomType, Room, Tenant, RentPayment, PaymentStatus, MaintenanceRequest, MaintenanceStatus,
+    DailySnapshot,
+)
+from backend.app.auth import create_access_token
+from backend.app.routers.rooms import rebuild_room_occupancy
+from backend.app.snapshots import SnapshotScheduler, backfill_snapshots, record_snapshot
+
+# Setup test database
+db_file = "./test_snapshots.db"
+if os.path.exists(db_file):
+    os.remove(db_file)
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_file}"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+
+def add_tenant(db, name, room, check_in, check_out=None):
+    user = User(email=f"{name}@example.com", hashed_password="x", role=UserRole.TENANT.value, is_active=True)
+    db.add(user)
+    db.flush()
+    tenant = Tenant(user_id=user.id, room_id=room.id, full_name=name, phone="1", emergency_contact="2",
+                    check_in_date=check_in, check_out_date=check_out, is_active=check_out is None)
+    db.add(tenant)
+    db.flush()
+    return tenant
+
+def seed_data():
+    db = TestingSessionLocal()
+    db.add(User(email="admin@example.com", hashed_password="x", role=UserRole.ADMIN.value, is_active=True))
+    first = Room(room_number="101", floor=1, room_type=RoomType.DOUBLE.value, capacity=2, monthly_rent=500.0)
+    second = Room(room_number="201", floor=2, room_type=RoomType.SINGLE.value, capacity=1, monthly_rent=300.0)
+    db.add_all([first, second])
+    db.flush()
+    # Asha stays Jan 1-5 on floor 1; Ben moves in on Jan 3 on floor 2
+    asha = add_tenant(db, "asha", first, date(2024, 1, 1), check_out=date(2024, 1, 5))
+    ben = add_tenant(db, "ben", second, date(2024, 1, 3))
+    db.add_all([
+        RentPayment(tenant_id=asha.id, amount=500.0, payment_date=date(2024, 1, 2), payment_method="Cash",
+                    payment_month=date(2024, 1, 1), status=PaymentStatus.VERIFIED.value),
+        RentPayment(tenant_id=ben.id, amount=300.0, payment_date=date(2024, 1, 4), payment_method="Cash",
+                    payment_month=date(2024, 1, 1), status=PaymentStatus.VERIFIED.value),
+        RentPayment(tenant_id=ben.id, amount=300.0, payment_date=date(2024, 1, 4), payment_method="Cash",
+                    payment_month=date(2024, 2, 1), status=PaymentStatus.PENDING.value),
+        MaintenanceRequest(tenant_id=asha.id, category="Plumbing", priority="Low", description="Leak",
+                           request_date=datetime(2024, 1, 2, 9, 0)),
+        MaintenanceRequest(tenant_id=ben.id, category="Electrical", priority="High", description="Fuse",
+                           status=MaintenanceStatus.RESOLVED.value, request_date=datetime(2024, 1, 3, 10, 0),
+                           resolved_date=datetime(2024, 1, 4, 18, 0)),
+    ])
+    db.commit()
+    rebuild_room_occupancy(db)
+    db.close()
+
+def test_backfill_replays_history():
+    seed_data()
+    db = TestingSessionLocal()
+    assert backfill_snapshots(db, end=date(2024, 1, 6)) == 6
+    days = {s.day: (s.occupied_beds, s.capacity, s.verified_revenue, s.open_maintenance)
+            for s in db.query(DailySnapshot).order_by(DailySnapshot.day)}
+    db.close()
+    assert days == {
+        date(2024, 1, 1): (1, 3, 0.0, 0),
+        date(2024, 1, 2): (1, 3, 500.0, 1),
+        date(2024, 1, 3): (2, 3, 500.0, 2),
+        date(2024, 1, 4): (2, 3, 800.0, 1),
+        date(2024, 1, 5): (1, 3, 800.0, 1),
+        date(2024, 1, 6): (1, 3, 800.0, 1),
+    }
+
+def test_trends_range_and_floors():
+    response = client.get("/api/reports/trends", params={"start_date": "2024-01-02", "end_date": "2024-01-04", "by_floor": True},
+                          headers=admin_headers)
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert [d["day"] for d in report["days"]] == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    assert report["days"][1]["occupancy_rate"] == round(2 / 3 * 100, 2)
+    floor_2 = [f for f in report["floors"] if f["floor"] == 2]
+    assert [(f["day"], f["occupied_beds"], f["verified_revenue"], f["open_maintenance"]) for f in floor_2] == [
+        ("2024-01-02", 0, 0.0, 0), ("2024-01-03", 1, 0.0, 1), ("2024-01-04", 1, 300.0, 0),
+    ]
+
+    response = client.get("/api/reports/trends", params={"start_date": "2024-01-05", "end_date": "2024-01-01"},
+                          headers=admin_headers)
+    assert response.status_code == 400
+
+def test_live_snapshot_matches_backfill():
+    db = TestingSessionLocal()
+    backfilled = db.get(DailySnapshot, date(2024, 1, 6))
+    expected = (backfilled.occupied_beds, backfilled.capacity, backfilled.verified_revenue, backfilled.open_maintenance)
+    db.query(DailySnapshot).filter(DailySnapshot.day == date(2024, 1, 6)).delete()
+    db.commit()
+
+    record_snapshot(db, day=date(2024, 1, 6))
+    live = db.get(DailySnapshot, date(2024, 1, 6))
+    assert (live.occupied_beds, live.capacity, live.verified_revenue, live.open_maintenance) == expected
+    # Re-running for the same day updates the row rather than adding one
+    record_snapshot(db, day=date(2024, 1, 6))
+    assert db.query(DailySnapshot).filter(DailySnapshot.day == date(2024, 1, 6)).count() == 1
+    db.close()
+
+def test_scheduler_records_today():
+    scheduler = SnapshotScheduler(engine, interval=3600)
+    scheduler.start()
+    scheduler.stop()
+    db = TestingSessionLocal()
+    assert db.get(DailySnapshot, date.today()) is not None
+    db.close()
+
+if __name__ == "__main__":
+    try:
+        test_backfill_replays_history()
+        test_trends_range_and_floors()
+        test_live_snapshot_matches_backfill()
+        test_scheduler_records_today()
+        print("\nAll SNAPSHOT tests passed successfully!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
@@ -0,0 +1,316 @@
+import io
+import os
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Add project root to sys.path so we can import backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from PIL import Image
+from backend.app.main import app
+from backend.app import uploads, image_processing, upload_gc
+from backend.app.routers import files
+from backend.app.database import Base, get_db
+from backend.app.models import User, UserRole, UploadedFile, RentPayment, MaintenanceRequest
+from backend.app.auth import create_principal_token
+from backend.app.schemas import UserPrincipal
+from backend.app.storage import S3Storage
+
+# Setup test database
+db_file = "./test_storage.db"
+if os.path.exists(db_file):
+    os.remove(db_file)
+
+engine = create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+class FakeS3Client:
+    """Local stand-in for an S3 bucket: the subset of the boto3 client API S3Storage uses."""
+
+    class NotFound(Exception):
+        response = {"Error": {"Code": "404"}}
+
+    def __init__(self):
+        self.objects = {}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NotFound()
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body if isinstance(Body, bytes) else Body.read()
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NotFound()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        # Pages of two, to exercise continuation
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = [{"Key": key, "Size": len(self.objects[(Bucket, key)]), "LastModified": datetime.now()}
+                for key in keys[start:start + 2]]
+        truncated = start + 2 < len(keys)
+        return {"Contents": page, "IsTruncated": truncated, **({"NextContinuationToken": str(start + 2)} if truncated else {})}
+
+def tenant_headers():
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.email == "storage@example.com").first()
+    if not user:
+        user = User(email="storage@example.com", hashed_password="x", role=UserRole.TENANT.value, is_active=True)
+        db.add(user)
+        db.commit()
+    principal = UserPrincipal(id=user.id, email=user.email, role=user.role, is_active=True)
+    db.close()
+    return {"Authorization": f"Bearer {create_principal_token(principal)}"}
+
+def jpeg_bytes(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def upload(content, headers):
+    response = client.post("/api/payments/upload-proof", files={"file": ("proof.jpg", content, "image/jpeg")}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["path"]
+
+def get_upload(path):
+    db = TestingSessionLocal()
+    row = db.query(UploadedFile).filter(UploadedFile.path == path).first()
+    db.close()
+    return row
+
+def test_identical_uploads_are_stored_once():
+    headers = tenant_headers()
+    content = jpeg_bytes("blue")
+
+    first = upload(content, headers)
+    second = upload(content, headers)
+    # Content-addressed, two-level fan-out: <namespace>/<h[:2]>/<h[2:4]>/<sha256>.<ext>
+    assert first == second
+    assert re.fullmatch(r"uploads/payments/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg", first)
+    assert open(first, "rb").read() == content
+
+    image_processing.wait_until_idle()
+    stored = get_upload(first)
+    assert stored.size == len(content)
+    assert os.path.exists(stored.thumbnail_path) and os.path.exists(stored.display_path)
+    db = TestingSessionLocal()
+    assert db.query(UploadedFile).filter(UploadedFile.sha256 == stored.sha256).count() == 1
+    db.close()
+
+    different = upload(jpeg_bytes("green"), headers)
+    assert different != first
+    image_processing.wait_until_idle()
+
+def test_file_serving_caching_headers():
+    headers = tenant_headers()
+    content = jpeg_bytes("red")
+    path = upload(content, headers)
+    sha256 = os.path.basename(path).split(".")[0]
+    image_processing.wait_until_idle()
+
+    response = client.get(f"/api/files/{path}")
+    assert response.status_code == 401
+
+    response = client.get(f"/api/files/{path}", headers=headers)
+    assert response.status_code == 200 and response.content == content
+    assert response.headers["etag"] == f'"{sha256}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-type"] == "image/jpeg"
+
+    # Revalidation: unchanged content is not re-transferred
+    response = client.get(f"/api/files/{path}", headers={**headers, "If-None-Match": f'"{sha256}"'})
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["etag"] == f'"{sha256}"'
+
+    response = client.get(f"/api/files/{path}", headers={**headers, "Range": "bytes=0-9"})
+    assert response.status_code == 206 and response.content == content[:10]
+    assert response.headers["content-range"] == f"bytes 0-9/{len(content)}"
+    response = client.get(f"/api/files/{path}", headers={**headers, "Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200 and response.content == content
+
+    # Derived images get their own strong ETag
+    thumbnail_path = get_upload(path).thumbnail_path
+    response = client.get(f"/api/files/{thumbnail_path}", headers=headers)
+    assert response.status_code == 200 and response.headers["etag"] == f'"{sha256}-thumb"'
+
+    # Files stored before content addressing are still served, but revalidated every time
+    legacy_path = "uploads/payments/legacy-proof.jpg"
+    with open(legacy_path, "wb") as f:
+        f.write(content)
+    response = client.get(f"/api/files/{legacy_path}", headers=headers)
+    assert response.status_code == 200 and "immutable" not in response.headers["cache-control"]
+    response = client.get(f"/api/files/{legacy_path}", headers={**headers, "If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+
+    for missing in ["uploads/payments/missing.jpg", "uploads/.staging/upload.part", "test_storage.db"]:
+        assert client.get(f"/api/files/{missing}", headers=headers).status_code == 404
+
+def age(*paths, hours=48):
+    # Backdate files and their uploaded_files rows past the collector's grace period
+    old = time.time() - hours * 3600
+    for path in paths:
+        os.utime(path, (old, old))
+    db = TestingSessionLocal()
+    db.query(UploadedFile).filter(UploadedFile.path.in_(paths)).update(
+        {"last_uploaded_at": datetime.utcnow() - timedelta(hours=hours)}, synchronize_session=False
+    )
+    db.commit()
+    db.close()
+
+def test_orphaned_upload_collection():
+    headers = tenant_headers()
+    kept_proof = upload(jpeg_bytes("purple"), headers)
+    kept_image = client.post("/api/maintenance/upload-image", files={"file": ("leak.jpg", jpeg_bytes("olive"), "image/jpeg")},
+                             headers=headers).json()["path"]
+    orphan = upload(jpeg_bytes("orange"), headers)
+    reuploaded = upload(jpeg_bytes("pink"), headers)
+    recent = upload(jpeg_bytes("teal"), headers)
+    image_processing.wait_until_idle()
+
+    db = TestingSessionLocal()
+    db.add(RentPayment(tenant_id=1, amount=1.0, payment_date=date(2024, 1, 1), payment_method="UPI",
+                       transaction_id="GC1", payment_month=date(2024, 1, 1), proof_image_path=kept_proof))
+    db.add(MaintenanceRequest(tenant_id=1, category="Plumbing", priority="Low", description="Leak", image_path=kept_image))
+    db.commit()
+    stored = {path: get_upload(path) for path in (kept_proof, kept_image, orphan, reuploaded, recent)}
+    db.close()
+
+    legacy = "uploads/payments/0b1d3c52-legacy.jpg"
+    stale_staging = os.path.join(uploads.STAGING_DIR, "interrupted")
+    os.makedirs(uploads.STAGING_DIR, exist_ok=True)
+    for path, size in [(legacy, 10), (stale_staging, 5)]:
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    everything = [legacy, stale_staging]
+    for path in (kept_proof, kept_image, orphan, reuploaded):
+        everything += [path, stored[path].thumbnail_path, stored[path].display_path]
+    age(*everything)
+    # Same content uploaded again after it was first stored: its grace period restarts
+    assert upload(jpeg_bytes("pink"), headers) == reuploaded
+
+    orphan_files = [orphan, stored[orphan].thumbnail_path, stored[orphan].display_path, legacy, stale_staging]
+    orphan_bytes = sum(os.path.getsize(path) for path in orphan_files)
+
+    found = []
+    db = TestingSessionLocal()
+    report = upload_gc.collect_orphaned_uploads(db, dry_run=True, on_orphan=lambda key, size: found.append(key))
+    assert sorted(found) == sorted(orphan_files)
+    assert report["orphaned"] == 5 and report["bytes_reclaimed"] == orphan_bytes
+    assert all(os.path.exists(path) for path in orphan_files)
+
+    # Small batches: candidates are re-checked and deleted a few at a time
+    batch_size, upload_gc.BATCH_SIZE = upload_gc.BATCH_SIZE, 2
+    try:
+        report = upload_gc.collect_orphaned_uploads(db)
+    finally:
+        upload_gc.BATCH_SIZE = batch_size
+    db.close()
+    assert report["orphaned"] == 5 and report["bytes_reclaimed"] == orphan_bytes
+    assert not any(os.path.exists(path) for path in orphan_files)
+    assert get_upload(orphan) is None
+
+    for path in (kept_proof, kept_image, reuploaded, recent):
+        assert os.path.exists(path) and get_upload(path) is not None
+    assert os.path.exists(stored[kept_proof].thumbnail_path) and os.path.exists(stored[kept_image].display_path)
+
+    # Nothing left to collect
+    db = TestingSessionLocal()
+    assert upload_gc.collect_orphaned_uploads(db)["orphaned"] == 0
+    db.close()
+
+def test_upload_interleaved_with_collection():
+    headers = tenant_headers()
+    content = jpeg_bytes("navy")
+    path = upload(content, headers)
+    image_processing.wait_until_idle()
+    stored = get_upload(path)
+    age(path, stored.thumbnail_path, stored.display_path)
+
+    # A collector pass runs while the same content is uploaded again, right after the upload
+    # found the stored copy and dropped its own
+    store = uploads._store
+    def store_then_collect(staging_path, key):
+        store(staging_path, key)
+        db = TestingSessionLocal()
+        upload_gc.collect_orphaned_uploads(db)
+        db.close()
+    uploads._store = store_then_collect
+    try:
+        assert upload(content, headers) == path
+    finally:
+        uploads._store = store
+    assert open(path, "rb").read() == content
+    assert os.path.exists(stored.thumbnail_path) and get_upload(path) is not None
+
+def test_s3_backend_with_local_stand_in():
+    headers = tenant_headers()
+    s3 = S3Storage("test-bucket", client=FakeS3Client())
+    original_storage = uploads.storage, image_processing.storage, files.storage
+    uploads.storage = image_processing.storage = files.storage = s3
+    try:
+        path = upload(jpeg_bytes("yellow"), headers)
+        assert upload(jpeg_bytes("yellow"), headers) == path
+        image_processing.wait_until_idle()
+        stored = get_upload(path)
+        keys = {key for _, key in s3.client.objects}
+        assert keys == {path, stored.thumbnail_path, stored.display_path}
+        # Nothing landed on the local filesystem, staging included
+        assert not os.path.exists(path) and not os.listdir(uploads.STAGING_DIR)
+        with Image.open(s3.open(stored.thumbnail_path)) as thumbnail:
+            assert max(thumbnail.size) <= image_processing.THUMBNAIL_SIZE[0]
+
+        assert {key for key, _, _ in s3.iter_files("uploads/")} == keys
+
+        # Served from the bucket with the same caching headers
+        response = client.get(f"/api/files/{path}", headers=headers)
+        assert response.status_code == 200 and response.content == jpeg_bytes("yellow")
+        etag = response.headers["etag"]
+        assert client.get(f"/api/files/{path}", headers={**headers, "If-None-Match": etag}).status_code == 304
+        response = client.get(f"/api/files/{path}", headers={**headers, "Range": "bytes=-4"})
+        assert response.status_code == 206 and response.content == jpeg_bytes("yellow")[-4:]
+
+        for key in keys:
+            s3.delete(key)
+        assert not s3.client.objects
+    finally:
+        uploads.storage, image_processing.storage, files.storage = original_storage
+
+if __name__ == "__main__":
+    try:
+        test_identical_uploads_are_stored_once()
+        test_file_serving_caching_headers()
+        test_orphaned_upload_collection()
+        test_upload_interleaved_with_collection()
+        test_s3_backend_with_local_stand_in()
+        print("\nAll STORAGE tests passed successfully!")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
@@ -12,6 +12,7 @@ from backend.app.main import app
 from backend.app.database import Base, get_db
 from backend.app.models import User, UserRole, RoomType, Room, Tenant
 from backend.app.auth import get_password_hash
+from backend.app import principals
 
 # Setup test database
 db_file = "./test_tenants.db"
@@ -163,9 +164,111 @@ def test_tenants_flow():
     assert tenant_a_id in ids
     assert tenant_b_id in ids
 
+def test_room_occupancy_counter():
+    token = get_admin_token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def occupancy(room_id):
+        return client.get(f"/api/rooms/{room_id}", headers=headers).json()["active_occupancy"]
+
+    print("Creating Rooms 301 and 302...")
+    room_x = client.post("/api/rooms/", json={"room_number": "301", "floor": 3, "room_type": RoomType.DOUBLE.value,
+                                               "capacity": 2, "monthly_rent": 400.0}, headers=headers).json()["id"]
+    room_y = client.post("/api/rooms/", json={"room_number": "302", "floor": 3, "room_type": RoomType.SINGLE.value,
+                                               "capacity": 1, "monthly_rent": 500.0}, headers=headers).json()["id"]
+    assert occupancy(room_x) == 0
+
+    print("Registering Tenant C in Room 301...")
+    tenant_c_data = {
+        "full_name": "Tenant C",
+        "email": "tenantC@example.com",
+        "phone": "1231231234",
+        "emergency_contact": "3213214321",
+        "check_in_date": str(date.today()),
+        "room_id": room_x
+    }
+    response = client.post("/api/tenants/", json=tenant_c_data, headers=headers)
+    assert response.status_code == 201
+    tenant_c_id = response.json()["id"]
+    assert occupancy(room_x) == 1
+
+    print("Moving Tenant C to Room 302...")
+    move_data = dict(tenant_c_data, room_id=room_y)
+    response = client.put(f"/api/tenants/{tenant_c_id}", json=move_data, headers=headers)
+    assert response.status_code == 200
+    assert occupancy(room_x) == 0
+    assert occupancy(room_y) == 1
+
+    print("Moving another tenant into full Room 302 (Should Fail)...")
+    tenant_d_data = dict(tenant_c_data, full_name="Tenant D", email="tenantD@example.com", room_id=room_x)
+    tenant_d_id = client.post("/api/tenants/", json=tenant_d_data, headers=headers).json()["id"]
+    response = client.put(f"/api/tenants/{tenant_d_id}", json=dict(tenant_d_data, room_id=room_y), headers=headers)
+    assert response.status_code == 400
+    assert occupancy(room_x) == 1
+
+    print("Checking out Tenant C...")
+    response = client.post(f"/api/tenants/{tenant_c_id}/checkout", headers=headers)
+    assert response.status_code == 200
+    assert occupancy(room_y) == 0
+    print("Occupancy counter passed.")
+
+def test_principal_cache_invalidation():
+    token = get_admin_token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    tenant_e_data = {
+        "full_name": "Tenant E",
+        "email": "tenantE@example.com",
+        "password": "tenantE123",
+        "phone": "1231231234",
+        "emergency_contact": "3213214321",
+        "check_in_date": str(date.today()),
+    }
+    response = client.post("/api/tenants/", json=tenant_e_data, headers=headers)
+    assert response.status_code == 201
+    tenant_e_id = response.json()["id"]
+
+    def login(email):
+        response = client.post("/api/auth/login", json={"email": email, "password": "tenantE123"})
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    print("Caching Tenant E's principal...")
+    tenant_headers = login("tenantE@example.com")
+    assert client.get("/api/payments/", headers=tenant_headers).status_code == 200
+    principal = principals.get_cached_principal("tenantE@example.com")
+    assert principal.tenant_id == tenant_e_id and principal.role == UserRole.TENANT.value
+
+    print("Changing Tenant E's email drops the cached principal...")
+    response = client.put(f"/api/tenants/{tenant_e_id}", json=dict(tenant_e_data, email="tenantE2@example.com"), headers=headers)
+    assert response.status_code == 200
+    assert principals.get_cached_principal("tenantE@example.com") is None
+    assert client.get("/api/payments/", headers=tenant_headers).status_code == 401
+
+    print("Deactivating Tenant E's user revokes their tokens on the next request...")
+    tenant_headers = login("tenantE2@example.com")
+    assert client.get("/api/payments/", headers=tenant_headers).status_code == 200
+    db = TestingSessionLocal()
+    db.query(User).filter(User.email == "tenantE2@example.com").first().is_active = False
+    db.commit()
+    db.close()
+    assert principals.get_cached_principal("tenantE2@example.com") is None
+    assert client.get("/api/payments/", headers=tenant_headers).status_code == 401
+    response = client.post("/api/auth/login", json={"email": "tenantE2@example.com", "password": "tenantE123"})
+    assert response.status_code == 400
+
+    print("Checking out Tenant E drops the cached principal...")
+    principals.cache_principal(principal.model_copy(update={"email": "tenantE2@example.com"}))
+    response = client.post(f"/api/tenants/{tenant_e_id}/checkout", headers=headers)
+    assert response.status_code == 200
+    assert principals.get_cached_principal("tenantE2@example.com") is None
+    print("Principal cache invalidation passed.")
+
 if __name__ == "__main__":
     try:
         test_tenants_flow()
+        test_room_occupancy_counter()
+        test_principal_cache_invalidation()
         print("\nAll TENANTS tests passed successfully!")
     except Exception as e:
         print(f"\nTest failed: {e}")